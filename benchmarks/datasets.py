@@ -0,0 +1,80 @@
+"""
+synthetic benchmark datasets, generated locally and reused between runs
+
+the same rows are written as csv, parquet and arrow at every scale. values are
+derived from hash(id), so regenerating a scale always gives identical files
+"""
+import os
+from pathlib import Path
+from typing import Dict
+
+import duckdb
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+SCALES = {
+    "100k": 100_000,  # for quick checks of the suite itself
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+    "100m": 100_000_000,
+}
+FORMATS = ("csv", "parquet", "arrow")
+ARROW_BATCH_ROWS = 1_000_000
+
+#sales-like rows: a time axis, low and mid cardinality categories and a few measures
+ROWS_SQL = """
+    SELECT
+        i AS id,
+        TIMESTAMP '2024-01-01' + to_seconds((i * 7919) % 31536000) AS ts,
+        'category_' || lpad((hash(i) % 100)::VARCHAR, 2, '0') AS category,
+        ['north', 'south', 'east', 'west', 'central'][(1 + hash(i * 7) % 5)::BIGINT] AS region,
+        round((hash(i * 13) % 100000) / 100.0, 2) AS amount,
+        (hash(i * 17) % 50)::INTEGER AS quantity,
+        hash(i * 19) % 2 = 0 AS flag
+    FROM range({rows}) t(i)
+"""
+
+def dataset_path(scale: str, file_format: str) -> Path:
+    """where the dataset of a scale and format is stored"""
+    return DATA_DIR / scale / f"sales.{file_format}"
+
+def generate(scale: str, force: bool = False) -> Dict[str, Path]:
+    """
+    write the csv, parquet and arrow files of a scale, skipping existing ones
+
+    args:
+        scale: one of SCALES
+        force: rewrite files that already exist
+    returns:
+        dict of format -> path
+    """
+    rows_sql = ROWS_SQL.format(rows=SCALES[scale])
+    paths = {file_format: dataset_path(scale, file_format) for file_format in FORMATS}
+    paths["csv"].parent.mkdir(parents=True, exist_ok=True)
+
+    conn = duckdb.connect()
+    try:
+        for file_format, path in paths.items():
+            if path.exists() and not force:
+                continue
+            #write to a temporary name so an interrupted run never leaves a truncated dataset
+            partial = path.with_name(path.name + ".partial")
+            if file_format == "csv":
+                conn.execute(f"COPY ({rows_sql}) TO '{partial}' (FORMAT CSV, HEADER)")
+            elif file_format == "parquet":
+                conn.execute(f"COPY ({rows_sql}) TO '{partial}' (FORMAT PARQUET)")
+            else:
+                _write_arrow(conn, rows_sql, partial)
+            os.replace(partial, path)
+    finally:
+        conn.close()
+    return paths
+
+def _write_arrow(conn: duckdb.DuckDBPyConnection, rows_sql: str, path: Path):
+    """stream rows into an arrow ipc file, duckdb can only write arrow through an extension"""
+    import pyarrow as pa
+
+    reader = conn.execute(rows_sql).to_arrow_reader(ARROW_BATCH_ROWS)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
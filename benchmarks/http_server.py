@@ -0,0 +1,162 @@
+"""
+local stand-in for a remote object store: a static http server with range requests
+
+    python benchmarks/http_server.py --dir benchmarks/data --port 8000
+
+serves single byte ranges (206 responses) the way s3 and most cdns do, and
+counts the requests and body bytes it sends, so benchmarks can check that
+remote queries only read what they need and that cached reads send nothing
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+COPY_CHUNK_BYTES = 64 * 1024
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_range(header, size: int):
+    """
+    the byte range a Range header asks for
+
+    returns:
+        (first, last) inclusive, None to send the whole file, or False if it can't be satisfied
+    """
+    if not header:
+        return None
+    match = RANGE_HEADER.match(header.strip())
+    if match is None:
+        #multiple ranges aren't supported, the whole file is a valid answer
+        return None
+    first, last = match.groups()
+    if not first:
+        #suffix range, the last n bytes
+        if not last or int(last) == 0:
+            return False
+        return max(0, size - int(last)), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or first > last:
+        return False
+    return first, last
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """serves files with byte range support and counts what it sends"""
+    protocol_version = "HTTP/1.1"  # keep-alive, clients issue many small range requests
+
+    def send_head(self):
+        #one handler serves every request on a kept-alive connection
+        self.remaining = None
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            return super().send_head()
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        st = os.fstat(f.fileno())
+        byte_range = parse_range(self.headers.get("Range"), st.st_size)
+        if byte_range is False:
+            f.close()
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{st.st_size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        first, last = byte_range or (0, st.st_size - 1)
+        if byte_range:
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {first}-{last}/{st.st_size}")
+        else:
+            self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(last - first + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+        self.send_header("ETag", f'"{st.st_mtime_ns:x}-{st.st_size:x}"')
+        self.end_headers()
+
+        f.seek(first)
+        self.remaining = last - first + 1
+        self.server.count(self.command, 0)
+        return f
+
+    def copyfile(self, source, outputfile):
+        """send only the requested range"""
+        if self.remaining is None:
+            super().copyfile(source, outputfile)
+            return
+        while self.remaining > 0:
+            chunk = source.read(min(COPY_CHUNK_BYTES, self.remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            self.remaining -= len(chunk)
+            self.server.count(None, len(chunk))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class RangeServer(ThreadingHTTPServer):
+    """threaded http server with request and byte counters"""
+    daemon_threads = True
+
+    def __init__(self, directory: str, port: int = 0, verbose: bool = False):
+        super().__init__(("127.0.0.1", port), partial(RangeRequestHandler, directory=directory))
+        self.verbose = verbose
+        self.stats = {"requests": 0, "head": 0, "bytes": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """base url of the served directory"""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, command, sent: int):
+        """record a response (command set) or body bytes sent"""
+        with self._stats_lock:
+            if command is not None:
+                self.stats["requests"] += 1
+                if command == "HEAD":
+                    self.stats["head"] += 1
+            self.stats["bytes"] += sent
+
+    def reset_stats(self):
+        """zero the counters, e.g. between benchmark passes"""
+        with self._stats_lock:
+            self.stats = {"requests": 0, "head": 0, "bytes": 0}
+
+    def start(self) -> "RangeServer":
+        """serve on a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def main(argv=None) -> int:
+    """serve a directory until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=".", help="directory to serve")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    server = RangeServer(os.path.abspath(args.dir), args.port, verbose=True)
+    print(f"serving {os.path.abspath(args.dir)} at {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"sent {server.stats['bytes']:,} bytes in {server.stats['requests']:,} responses", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+remote parquet benchmark against a local range-request server
+
+    python benchmarks/remote.py                 # 1m rows
+    python benchmarks/remote.py --scale 10m --cache-dir /tmp/duckboard-blocks
+
+serves the suite's parquet dataset over http (see http_server.py), loads it
+as a remote view and runs the standard queries three times: cold, warm in the
+same session, and in a new session sharing the block cache. for each pass it
+reports the time, requests and body bytes the server sent, and for the cold
+pass the bytes of each query, which range-read only the columns it needs.
+exits 1 if a warm pass downloaded anything, or a new session did with an
+on-disk cache
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS.parent))
+
+from benchmarks.datasets import SCALES, dataset_path, generate
+from benchmarks.http_server import RangeServer
+from benchmarks.suite import QUERIES
+from src.database.duckdb_manager import DuckDBManager
+from src.database.remote import cache_size
+
+def run_pass(manager: DuckDBManager, server: RangeServer, url: str, load: bool):
+    """
+    run every query once, loading the remote view first if asked
+
+    returns:
+        dict with seconds, requests and bytes the server sent, in total and per query
+    """
+    server.reset_stats()
+    start = time.perf_counter()
+    if load:
+        manager.load_file(url, "sales")
+    per_query = {}
+    for name, query in QUERIES.items():
+        sent = server.stats["bytes"]
+        manager.execute_query(query).read_all()
+        per_query[name] = server.stats["bytes"] - sent
+    return {"seconds": time.perf_counter() - start, **server.stats, "query_bytes": per_query}
+
+def main(argv=None) -> int:
+    """run the passes and check the cached ones stayed off the network"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="1m", choices=list(SCALES))
+    parser.add_argument("--cache-dir", help="block cache folder (a fresh temporary one by default)")
+    parser.add_argument("--disk-cache", action="store_true", help="cache blocks on disk with cache_httpfs")
+    parser.add_argument("--output", type=Path, help="also write the results as json")
+    args = parser.parse_args(argv)
+
+    generate(args.scale)
+    path = dataset_path(args.scale, "parquet")
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="duckboard-blocks-")
+    server = RangeServer(str(path.parent)).start()
+    url = f"{server.url}/{path.name}"
+
+    results = {"file_bytes": os.path.getsize(path)}
+    try:
+        #no result cache, repeated queries must really read the file again
+        manager = DuckDBManager(cache_bytes=0, block_cache_dir=cache_dir, disk_block_cache=args.disk_cache)
+        try:
+            results["cold"] = run_pass(manager, server, url, load=True)
+            results["warm"] = run_pass(manager, server, url, load=False)
+            results["block_cache"] = manager.remote_cache
+        finally:
+            manager.close()
+
+        manager = DuckDBManager(cache_bytes=0, block_cache_dir=cache_dir, disk_block_cache=args.disk_cache)
+        try:
+            results["new_session"] = run_pass(manager, server, url, load=True)
+        finally:
+            manager.close()
+        results["cache_dir_bytes"] = cache_size(cache_dir)
+    finally:
+        server.shutdown()
+        server.server_close()
+        if args.cache_dir is None:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"{url}: {results['file_bytes']:,} bytes, block cache in {results['block_cache']}")
+    for name in ("cold", "warm", "new_session"):
+        run = results[name]
+        print(f"{name:12} {run['seconds']:8.3f}s {run['requests']:6,} requests {run['bytes']:14,} bytes")
+    #range reads: queries touching few columns fetch only those column chunks
+    for name, sent in results["cold"]["query_bytes"].items():
+        print(f"  cold {name:14} {sent:14,} bytes")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    failures = []
+    if results["warm"]["bytes"]:
+        failures.append("the warm pass downloaded data")
+    if results["block_cache"] == "disk" and results["new_session"]["bytes"]:
+        failures.append("the new session downloaded data despite the on-disk cache")
+    for failure in failures:
+        print(f"regressed: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+startup benchmark, time from launching the app to the main window's first paint
+
+    python benchmarks/startup.py                    # compare against the baseline
+    python benchmarks/startup.py --update-baseline  # record this machine's baseline
+
+each run is a fresh interpreter, so imports are measured cold like a real launch.
+exits 1 when the median time to first paint regresses past the baseline's tolerance
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "startup.json"
+DEFAULT_RUNS = 5
+DEFAULT_TOLERANCE = 0.25  # allowed slowdown over the baseline, as a fraction
+
+def child():
+    """launch the app like main.py and report when the window first paints"""
+    start = time.perf_counter()
+    from PySide6.QtCore import QEvent, QObject, QStandardPaths, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    #keep the benchmark away from the user's settings, workspace and query history
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication(sys.argv[:1])
+    app.setApplicationName("DuckboardStartupBenchmark")
+    app.setOrganizationName("DuckboardStartupBenchmark")
+
+    from src.gui.main_window import MainWindow
+    imported = time.perf_counter()
+    window = MainWindow()
+    built = time.perf_counter()
+
+    class FirstPaint(QObject):
+        """reports the first paint event of any widget, then quits"""
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and not hasattr(self, "painted"):
+                self.painted = time.perf_counter()
+                print(json.dumps({
+                    "imports_s": imported - start,
+                    "window_s": built - imported,
+                    "paint_s": self.painted - start,
+                }), flush=True)
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    first_paint = FirstPaint()
+    app.installEventFilter(first_paint)
+    window.show()
+    app.exec()
+    window.db_manager.close()
+
+def measure(runs: int, platform: str):
+    """
+    launch the app `runs` times
+
+    returns:
+        list of dicts with launch_s (process start to first paint, as seen from
+        outside) and the child's own imports_s, window_s and paint_s
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    if platform:
+        env["QT_QPA_PLATFORM"] = platform
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, __file__, "--child"], cwd=ROOT, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        line = proc.stdout.readline()
+        launch = time.perf_counter() - start
+        proc.wait()
+        if not line:
+            raise RuntimeError(f"the app exited with code {proc.returncode} before painting")
+        samples.append(dict(json.loads(line), launch_s=launch))
+    return samples
+
+def main(argv=None) -> int:
+    """run the benchmark and compare it with the baseline"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="launches to take the median of")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline json file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown over the baseline, e.g. 0.25 for 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--platform", help="qt platform plugin, e.g. offscreen (offscreen on linux without a display)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child()
+        return 0
+
+    platform = args.platform
+    if platform is None and sys.platform.startswith("linux") and not (
+            os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY") or os.environ.get("QT_QPA_PLATFORM")):
+        platform = "offscreen"
+
+    samples = measure(args.runs, platform)
+    result = {key: statistics.median(sample[key] for sample in samples)
+              for key in ("launch_s", "imports_s", "window_s", "paint_s")}
+    print(f"first paint {result['launch_s']:.3f}s median of {args.runs} "
+          f"(imports {result['imports_s']:.3f}s, window {result['window_s']:.3f}s)")
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    limit = baseline["launch_s"] * (1 + args.tolerance)
+    change = result["launch_s"] / baseline["launch_s"] - 1
+    print(f"baseline {baseline['launch_s']:.3f}s, {change:+.0%} (limit {limit:.3f}s)")
+    if result["launch_s"] > limit:
+        print("startup regressed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
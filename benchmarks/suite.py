@@ -0,0 +1,276 @@
+"""
+benchmark suite for the load, query, render and export paths
+
+    python benchmarks/suite.py                        # 1m rows, compared with the baseline
+    python benchmarks/suite.py --scales 1m,10m,100m
+    python benchmarks/suite.py --update-baseline      # record this machine's baseline
+
+datasets are generated under benchmarks/data on first use (see datasets.py).
+every case runs in a fresh interpreter so its peak rss is its own. results are
+written as json, and the run exits 1 when a case got slower or bigger than the
+baseline allows
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.datasets import FORMATS, SCALES, dataset_path, generate
+
+DEFAULT_BASELINE = BENCHMARKS / "baselines" / "suite.json"
+RESULTS_DIR = BENCHMARKS / "results"
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25  # allowed slowdown over the baseline, as a fraction
+DEFAULT_RSS_TOLERANCE = 0.25  # allowed peak rss growth over the baseline
+MIN_REGRESSION_SECONDS = 0.05  # slowdowns smaller than this are timer noise
+
+#the standard analytic query set, run against each query source
+QUERIES = {
+    "count": "SELECT count(*) FROM sales",
+    "group_by": "SELECT category, sum(amount), avg(quantity) FROM sales GROUP BY category",
+    "filter_top_n": "SELECT * FROM sales WHERE region = 'north' AND amount > 900 ORDER BY amount DESC LIMIT 100",
+    "time_series": "SELECT date_trunc('day', ts) AS day, sum(amount) FROM sales GROUP BY day ORDER BY day",
+    "distinct": "SELECT count(DISTINCT category), approx_count_distinct(id) FROM sales",
+    "window": """
+        SELECT category, ts, amount, sum(amount) OVER (PARTITION BY category ORDER BY ts ROWS 10 PRECEDING)
+        FROM sales WHERE quantity = 1
+    """,
+    "self_join": """
+        WITH averages AS (SELECT category, avg(amount) AS average FROM sales GROUP BY category)
+        SELECT region, count(*) FROM sales JOIN averages USING (category)
+        WHERE amount > average GROUP BY region
+    """,
+}
+#(format, load mode) the queries read, a parquet view and an in-memory table
+QUERY_SOURCES = {"parquet_view": ("parquet", "view"), "table": ("parquet", "table")}
+DISPLAY_QUERY = "SELECT * FROM sales"
+
+def cases():
+    """every case id of one scale, in run order"""
+    ids = [f"load/{file_format}/{mode}" for file_format in FORMATS for mode in ("view", "table")]
+    ids += [f"query/{source}/{name}" for source in QUERY_SOURCES for name in QUERIES]
+    ids.append("display/table")
+    ids += [f"export/{file_format}" for file_format in FORMATS]
+    return ids
+
+def peak_rss_mb():
+    """peak resident memory of this process in MB, None where it can't be read"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #kilobytes on linux, bytes on macos
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+def timed(fn, repeat: int):
+    """
+    time `repeat` calls of fn after an untimed warm-up call
+
+    returns:
+        (seconds per call, fn's last return value)
+    """
+    value = fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        runs.append(time.perf_counter() - start)
+    return runs, value
+
+def run_case(case: str, scale: str, repeat: int):
+    """
+    time one case, in a fresh process started by measure()
+
+    returns:
+        dict with seconds (median), runs, rows and peak_rss_mb
+    """
+    from src.database.duckdb_manager import DuckDBManager
+
+    kind, *rest = case.split("/")
+    #no result cache, repeated queries must really run
+    manager = DuckDBManager(cache_bytes=0)
+    rows = None
+    try:
+        if kind == "load":
+            file_format, mode = rest
+            path = str(dataset_path(scale, file_format))
+            runs, _ = timed(lambda: manager.load_file(path, "sales", mode), repeat)
+
+        elif kind == "query":
+            source, name = rest
+            file_format, mode = QUERY_SOURCES[source]
+            manager.load_file(str(dataset_path(scale, file_format)), "sales", mode)
+            runs, rows = timed(lambda: manager.execute_query(QUERIES[name]).read_all().num_rows, repeat)
+
+        elif kind == "display":
+            runs = _time_display(manager, scale, repeat)
+
+        elif kind == "export":
+            file_format, = rest
+            manager.load_file(str(dataset_path(scale, "parquet")), "sales", "table")
+            out_dir = tempfile.mkdtemp(prefix="duckboard-bench-")
+            out = os.path.join(out_dir, f"export.{file_format}")
+            try:
+                runs, _ = timed(lambda: manager.export_result(DISPLAY_QUERY, out, file_format), repeat)
+            finally:
+                shutil.rmtree(out_dir, ignore_errors=True)
+        else:
+            raise ValueError(f"Unknown case: {case}")
+    finally:
+        manager.close()
+    return {"seconds": statistics.median(runs), "runs": runs, "rows": rows, "peak_rss_mb": peak_rss_mb()}
+
+def _time_display(manager, scale: str, repeat: int):
+    """time ResultsTable.display_results for a full-table query under offscreen qt"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QEvent
+    from PySide6.QtWidgets import QApplication
+    from src.gui.results_table import ResultsTable
+
+    app = QApplication.instance() or QApplication([])
+    manager.load_file(str(dataset_path(scale, "parquet")), "sales", "table")
+    table = ResultsTable(manager)
+    table.resize(1200, 600)
+    table.show()
+
+    def display():
+        result = manager.execute_query(DISPLAY_QUERY)
+        table.display_results(result)
+        app.processEvents()
+
+    runs, _ = timed(display, repeat)
+    #stops the side row counts, then deliver their queued signals and delete the widgets
+    #before the database and the interpreter go away
+    table.clear()
+    app.processEvents()
+    table.deleteLater()
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    return runs
+
+def measure(case: str, scale: str, repeat: int):
+    """
+    run a case in a fresh interpreter
+
+    returns:
+        the case's result dict, or {"error": message} if it failed
+    """
+    proc = subprocess.run(
+        [sys.executable, __file__, "--case", case, "--scales", scale, "--repeat", str(repeat)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = proc.stderr.strip().splitlines()
+        return {"error": error[-1] if error else f"exited with code {proc.returncode}"}
+    return json.loads(lines[-1])
+
+def compare(results, baseline, tolerance: float, rss_tolerance: float):
+    """
+    check results against a baseline
+
+    returns:
+        list of regression descriptions, empty if none
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None or "error" in base or "error" in result:
+            continue
+        slower = result["seconds"] - base["seconds"]
+        if result["seconds"] > base["seconds"] * (1 + tolerance) and slower > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{key}: {base['seconds']:.3f}s -> {result['seconds']:.3f}s")
+        if result.get("peak_rss_mb") and base.get("peak_rss_mb") and \
+                result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + rss_tolerance):
+            regressions.append(f"{key}: peak rss {base['peak_rss_mb']:.0f}MB -> {result['peak_rss_mb']:.0f}MB")
+    return regressions
+
+def environment():
+    """what the numbers were measured on"""
+    import duckdb
+    return {
+        "python": platform.python_version(),
+        "duckdb": duckdb.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+def main(argv=None) -> int:
+    """run the suite and compare it with the baseline"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1m", help=f"comma separated, of {', '.join(SCALES)}")
+    parser.add_argument("--cases", help="only run case ids starting with one of these comma separated prefixes, e.g. query/table")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per case, the median is reported")
+    parser.add_argument("--output", type=Path, help="results json (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline json file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--rss-tolerance", type=float, default=DEFAULT_RSS_TOLERANCE, help="allowed peak rss growth")
+    parser.add_argument("--update-baseline", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    scales = args.scales.split(",")
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale {', '.join(unknown)}, choose from {', '.join(SCALES)}")
+
+    if args.case:
+        try:
+            result = run_case(args.case, scales[0], args.repeat)
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {str(e).splitlines()[0]}"}
+        print(json.dumps(result))
+        return 0
+
+    prefixes = args.cases.split(",") if args.cases else None
+    results = {}
+    for scale in scales:
+        start = time.perf_counter()
+        generate(scale)
+        print(f"{scale}: datasets ready in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        for case in cases():
+            if prefixes and not case.startswith(tuple(prefixes)):
+                continue
+            key = f"{scale}/{case}"
+            results[key] = result = measure(case, scale, args.repeat)
+            if "error" in result:
+                print(f"{key:40} error: {result['error']}")
+            else:
+                rss = f"{result['peak_rss_mb']:8.0f}MB" if result["peak_rss_mb"] is not None else ""
+                print(f"{key:40} {result['seconds']:9.3f}s {rss}")
+
+    output = args.output or RESULTS_DIR / f"{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"environment": environment(), "results": results}, indent=2) + "\n")
+    print(f"results written to {output}", file=sys.stderr)
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        #keep baseline entries of scales and cases this run didn't cover
+        merged = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+        merged.update(results)
+        args.baseline.write_text(json.dumps({"environment": environment(), "results": merged}, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text())["results"], args.tolerance, args.rss_tolerance)
+    for regression in regressions:
+        print(f"regressed {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+headless entry point, runs saved queries and exports without a display
+
+    python -m src.cli run report.sql --out report.parquet --db workspace.duckdb
+    python -m src.cli run daily/*.sql --out exports/ --load sales=data/sales/*.parquet
+
+only imports the database layer, never PySide6, so it starts quickly in cron and ci jobs
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+from src.database.duckdb_manager import DuckDBManager, FORMAT_EXTENSIONS, detect_format
+from src.database.remote import DEFAULT_BLOCK_CACHE_BYTES
+from src.database.result_set import ResultSet
+from src.utils.instrumentation import tracer
+
+def parse_load(value: str):
+    """argparse type for --load NAME=PATH"""
+    name, sep, path = value.partition("=")
+    if not sep or not name or not path:
+        raise argparse.ArgumentTypeError(f"expected NAME=PATH, got {value!r}")
+    return name, path
+
+def output_path(sql_file: str, out: Optional[str], out_is_dir: bool, file_format: str) -> Optional[str]:
+    """
+    where a sql file's result is exported
+
+    args:
+        sql_file: the sql file that was run
+        out: the --out argument
+        out_is_dir: whether --out names a directory, one file per query
+        file_format: export format
+    returns:
+        output file path, or None to only count the rows
+    """
+    if out is None:
+        return None
+    if not out_is_dir:
+        return out
+    stem = os.path.splitext(os.path.basename(sql_file))[0]
+    return os.path.join(out, stem + FORMAT_EXTENSIONS[file_format])
+
+def run_file(manager: DuckDBManager, sql_file: str, out: Optional[str], file_format: str) -> Dict[str, Any]:
+    """
+    run every statement of a sql file, exporting or counting the last one's rows
+
+    runs on the manager's worker pool, each worker has its own cursor
+
+    args:
+        manager: db manager to run on
+        sql_file: path to the sql file
+        out: file to export the last statement's result to, None to count its rows
+        file_format: export format ('csv', 'parquet', 'arrow')
+    returns:
+        dict with rows (None when exported) and seconds
+    """
+    start = time.perf_counter()
+    with open(sql_file, encoding="utf-8") as f:
+        statements = duckdb.extract_statements(f.read())
+    if not statements:
+        raise ValueError("No SQL statements found")
+
+    cursor = manager.cursor()
+    try:
+        with tracer.operation(), tracer.span("run", "cli", file=sql_file):
+            rows = _execute(manager, cursor, statements, out, file_format)
+    finally:
+        cursor.close()
+    return {"rows": rows, "seconds": time.perf_counter() - start}
+
+def _execute(manager: DuckDBManager, cursor: duckdb.DuckDBPyConnection, statements,
+             out: Optional[str], file_format: str) -> Optional[int]:
+    """run the statements of a file, returns the last one's row count or None once exported"""
+    for statement in statements[:-1]:
+        cursor.execute(statement.query)
+
+    last = statements[-1]
+    if out is not None:
+        if last.type != duckdb.StatementType.SELECT:
+            raise ValueError("The last statement must be a query to export its result")
+        manager.export_result(last.query, out, file_format, cursor=cursor)
+        return None
+
+    cursor.execute(last.query)
+    if last.type != duckdb.StatementType.SELECT:
+        return 0
+    #stream the result in batches, only counting it
+    return sum(batch.num_rows for batch in cursor.to_arrow_reader(ResultSet.DEFAULT_BATCH_SIZE))
+
+def run(args) -> int:
+    """
+    the run command
+
+    returns:
+        process exit code, 1 if any source or query failed
+    """
+    out_is_dir = args.out is not None and (
+        len(args.sql_files) > 1 or os.path.isdir(args.out) or args.out.endswith(os.sep)
+    )
+    file_format = args.format
+    if file_format is None:
+        file_format = "parquet" if args.out is None or out_is_dir else detect_format(args.out)
+        if file_format is None:
+            print(f"error: can't tell the export format of {args.out}, pass --format", file=sys.stderr)
+            return 2
+    if out_is_dir:
+        os.makedirs(args.out, exist_ok=True)
+
+    started = time.perf_counter()
+    manager = DuckDBManager(args.db, max_workers=args.workers, max_queued_jobs=len(args.sql_files) + len(args.load),
+                            disk_block_cache=args.remote_disk_cache,
+                            block_cache_bytes=args.remote_disk_cache_gb * 1024 ** 3)
+    failed = False
+    try:
+        #sources first, stale workspace sources and --load ones in parallel
+        loads = [(source["source"], source["table_name"], source["mode"]) for source in manager.restore_workspace()]
+        for table_name in manager.missing_sources:
+            print(f"warning: source files of {table_name} are missing, using the stored table", file=sys.stderr)
+        loads += [(path, name, "auto") for name, path in args.load]
+        futures = {manager.submit(manager.load_file, path, name, mode): name for path, name, mode in loads}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                print(f"loaded {futures[future]}", file=sys.stderr)
+            except Exception as e:
+                failed = True
+                print(f"error: could not load {futures[future]}: {e}", file=sys.stderr)
+
+        futures = {}
+        for sql_file in args.sql_files:
+            out = output_path(sql_file, args.out, out_is_dir, file_format)
+            futures[manager.submit(run_file, manager, sql_file, out, file_format)] = (sql_file, out)
+
+        for future in as_completed(futures):
+            sql_file, out = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                failed = True
+                print(f"error: {sql_file}: {e}", file=sys.stderr)
+                continue
+            result = f"-> {out}" if out is not None else f"{outcome['rows']:,} rows"
+            print(f"{sql_file}\t{outcome['seconds']:.3f}s\t{result}")
+    finally:
+        manager.close()
+
+    print(f"total\t{time.perf_counter() - started:.3f}s", file=sys.stderr)
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"trace written to {args.trace}", file=sys.stderr)
+    return 1 if failed else 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """command line arguments"""
+    parser = argparse.ArgumentParser(prog="duckboard", description="Run Duckboard queries without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run sql files, optionally exporting their results")
+    run_parser.add_argument("sql_files", nargs="+", metavar="SQL_FILE",
+                            help="sql files to run, the last statement of each is exported or counted")
+    run_parser.add_argument("--db", help="workspace .duckdb file whose sources the queries read (in-memory if omitted)")
+    run_parser.add_argument("--out", help="export file, or a directory for one file per query")
+    run_parser.add_argument("--format", choices=list(FORMAT_EXTENSIONS),
+                            help="export format, from the --out extension by default")
+    run_parser.add_argument("--load", type=parse_load, action="append", default=[], metavar="NAME=PATH",
+                            help="register a data file, folder or glob as a table before running")
+    run_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="queries run in parallel (default: one per core)")
+    run_parser.add_argument("--remote-disk-cache", action="store_true",
+                            help="cache blocks of remote files on disk (installs the cache_httpfs community extension)")
+    run_parser.add_argument("--remote-disk-cache-gb", type=int, default=DEFAULT_BLOCK_CACHE_BYTES // 1024 ** 3,
+                            help="size limit of the on-disk block cache, least recently used blocks are evicted past it")
+    run_parser.add_argument("--trace", metavar="PATH",
+                            help="write a chrome trace json of the loads, queries and exports")
+    run_parser.set_defaults(handler=run)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """entry point for the headless cli"""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
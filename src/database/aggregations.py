@@ -0,0 +1,414 @@
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import duckdb
+
+from src.utils.sql import quote_identifier
+
+CHART_KINDS = ("bar", "line", "histogram", "scatter")
+AGGREGATES = ("count", "sum", "avg", "min", "max")
+RAW_VALUES = "none"  # line charts with this aggregate plot raw values, downsampled with m4
+
+MAX_BARS = 50  # categories shown on a bar chart, the largest first
+DEFAULT_PIXELS = (800, 300)  # plot size assumed when a spec doesn't give one
+MIN_LINE_POINTS = 16
+MAX_LINE_POINTS = 4000  # buckets a line chart is aggregated into at most, whatever its width
+HISTOGRAM_BINS = 50
+DENSITY_CELL_PIXELS = 4  # scatter density cells are this many pixels square
+
+#candidate time_bucket widths for line charts, the finest that fits the plot's width wins
+TIME_BUCKETS = [
+    ("1 second", 1),
+    ("10 seconds", 10),
+    ("1 minute", 60),
+    ("5 minutes", 300),
+    ("15 minutes", 900),
+    ("1 hour", 3600),
+    ("6 hours", 6 * 3600),
+    ("1 day", 86400),
+    ("7 days", 7 * 86400),
+    ("1 month", 30 * 86400),
+    ("3 months", 91 * 86400),
+    ("1 year", 365 * 86400),
+]
+
+def _sql_value(value) -> str:
+    """sql literal for a bound returned by duckdb"""
+    if isinstance(value, datetime.datetime):
+        return f"TIMESTAMP '{value.replace(tzinfo=None).isoformat(sep=' ')}'"
+    if isinstance(value, datetime.date):
+        return f"DATE '{value.isoformat()}'"
+    return repr(value)
+
+def _as_datetime(value) -> datetime.datetime:
+    """promote a date bound to a naive timestamp"""
+    if isinstance(value, datetime.datetime):
+        return value.replace(tzinfo=None)
+    return datetime.datetime.combine(value, datetime.time())
+
+def value_expr(spec: Dict[str, Any]) -> str:
+    """
+    aggregate expression for a chart's y axis
+
+    args:
+        spec: chart spec with agg and, unless agg is count, y
+    returns:
+        sql aggregate expression
+    """
+    agg = spec.get("agg", "count")
+    if agg not in AGGREGATES or agg == RAW_VALUES:
+        raise ValueError(f"Unsupported aggregate: {agg}")
+    if agg == "count" or not spec.get("y"):
+        return "count(*)"
+    return f"{agg}({quote_identifier(spec['y'])})"
+
+def bounds_columns(spec: Dict[str, Any]) -> List[str]:
+    """columns whose min/max a chart needs before it can build its groups, none once it is zoomed in"""
+    columns = []
+    if spec["kind"] in ("line", "histogram", "scatter") and not spec.get("x_range"):
+        columns.append(spec["x"])
+    if spec["kind"] == "scatter" and not spec.get("y_range"):
+        columns.append(spec["y"])
+    return columns
+
+def chart_bounds(spec: Dict[str, Any], fetched: Dict[str, Tuple[Any, Any]]) -> Dict[str, Tuple[Any, Any]]:
+    """bounds of a chart's axes, the visible range of a zoomed chart or the column's full range"""
+    bounds = dict(fetched)
+    if spec.get("x_range"):
+        bounds[spec["x"]] = tuple(spec["x_range"])
+    if spec.get("y_range"):
+        bounds[spec["y"]] = tuple(spec["y_range"])
+    return bounds
+
+def pixels(spec: Dict[str, Any]) -> Tuple[int, int]:
+    """plot width and height in pixels"""
+    width, height = spec.get("pixels") or DEFAULT_PIXELS
+    return max(int(width), 1), max(int(height), 1)
+
+def line_buckets(spec: Dict[str, Any]) -> int:
+    """buckets of a line chart, about one per horizontal pixel"""
+    return max(MIN_LINE_POINTS, min(pixels(spec)[0], MAX_LINE_POINTS))
+
+def range_filter(spec: Dict[str, Any]) -> str:
+    """
+    WHERE clause limiting a zoomed chart to its visible range
+
+    returns:
+        sql condition, TRUE for a chart showing everything
+    """
+    conditions = []
+    for axis in ("x", "y"):
+        visible = spec.get(f"{axis}_range")
+        if visible:
+            col = quote_identifier(spec[axis])
+            conditions.append(f"{col} BETWEEN {_sql_value(visible[0])} AND {_sql_value(visible[1])}")
+    return " AND ".join(conditions) or "TRUE"
+
+def fetch_bounds(cursor: duckdb.DuckDBPyConnection, relation: str, columns: List[str]) -> Dict[str, Tuple[Any, Any]]:
+    """
+    min and max of several columns in one pass
+
+    args:
+        cursor: cursor to run on
+        relation: table or view name
+        columns: column names
+    returns:
+        dict of column -> (min, max)
+    """
+    columns = list(dict.fromkeys(columns))
+    if not columns:
+        return {}
+    exprs = ", ".join(f"min({quote_identifier(col)}), max({quote_identifier(col)})" for col in columns)
+    row = cursor.execute(f"SELECT {exprs} FROM {quote_identifier(relation)}").fetchone()
+    return {col: (row[i * 2], row[i * 2 + 1]) for i, col in enumerate(columns)}
+
+def time_bucket_width(lo, hi, buckets: int) -> str:
+    """finest TIME_BUCKETS width that keeps a time range within a number of buckets"""
+    span = (_as_datetime(hi) - _as_datetime(lo)).total_seconds()
+    for label, seconds in TIME_BUCKETS:
+        if span / seconds <= buckets:
+            return label
+    return TIME_BUCKETS[-1][0]
+
+def numeric_bin_expr(column: str, lo, hi, bins: int) -> str:
+    """expression mapping a numeric column onto the lower edge of one of `bins` equal-width bins"""
+    width = (hi - lo) / bins if hi != lo else 1
+    col = quote_identifier(column)
+    index = f"least(floor(({col} - {lo!r}) / {width!r}), {bins - 1})"
+    return f"({lo!r} + {index} * {width!r})"
+
+def group_expr(spec: Dict[str, Any], bounds: Dict[str, Tuple[Any, Any]]) -> Optional[str]:
+    """
+    grouping expression of a bar, line or histogram chart
+
+    args:
+        spec: chart spec
+        bounds: min/max of the columns listed by bounds_columns
+    returns:
+        sql expression to group by, or None if the column has no values
+    """
+    kind = spec["kind"]
+    if kind == "bar":
+        return quote_identifier(spec["x"])
+
+    lo, hi = bounds[spec["x"]]
+    if lo is None:
+        return None
+    col = quote_identifier(spec["x"])
+    if isinstance(lo, (datetime.date, datetime.datetime)):
+        if kind == "line":
+            return f"time_bucket(INTERVAL '{time_bucket_width(lo, hi, line_buckets(spec))}', {col})"
+        #histogram over time, equal-width bins of whole seconds
+        lo, hi = (_as_datetime(v) for v in (lo, hi))
+        width = max((hi - lo).total_seconds() / HISTOGRAM_BINS, 1)
+        start = _sql_value(lo)
+        index = f"least(floor(epoch({col}::TIMESTAMP - {start}) / {width!r}), {HISTOGRAM_BINS - 1})"
+        return f"{start} + to_seconds({index} * {width!r})"
+
+    if isinstance(lo, (str, bytes, bool)):
+        raise ValueError(f"{kind.capitalize()} charts need a numeric or date/time x column")
+    bins = line_buckets(spec) if kind == "line" else HISTOGRAM_BINS
+    return numeric_bin_expr(spec["x"], float(lo), float(hi), bins)
+
+def finish_groups(spec: Dict[str, Any], rows: List[tuple]) -> Dict[str, Any]:
+    """
+    turn (group, value) rows into plot data
+
+    args:
+        spec: chart spec
+        rows: grouped rows from group_expr and value_expr
+    returns:
+        dict with x and y lists, ordered for plotting
+    """
+    rows = [row for row in rows if row[0] is not None]
+    if spec["kind"] == "bar":
+        rows.sort(key=lambda row: (row[1] is None, -(row[1] or 0)))
+        rows = rows[:MAX_BARS]
+        return {"x": [str(row[0]) for row in rows], "y": [row[1] for row in rows]}
+    rows.sort(key=lambda row: row[0])
+    return {"x": [row[0] for row in rows], "y": [row[1] for row in rows]}
+
+def chart_plan(spec: Dict[str, Any], bounds: Dict[str, Tuple[Any, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    the grouped query behind one chart, without running it
+
+    args:
+        spec: chart spec, see run_chart
+        bounds: min/max of the columns listed by bounds_columns
+    returns:
+        dict with group (expressions), values (aggregates), where (row condition),
+        top (keep only the MAX_BARS largest groups) and finish (turns the
+        (*group, *values) rows into plot data), or None if the chart has no values
+    """
+    kind = spec["kind"]
+    if kind not in CHART_KINDS:
+        raise ValueError(f"Unsupported chart kind: {kind}")
+
+    bounds = chart_bounds(spec, bounds)
+    if kind == "scatter":
+        return _density_plan(spec, bounds)
+    if kind == "line" and spec.get("agg") == RAW_VALUES:
+        return _m4_plan(spec, bounds)
+
+    group = group_expr(spec, bounds)
+    if group is None:
+        return None
+    return {
+        "group": [group],
+        "values": ["count(*)" if kind == "histogram" else value_expr(spec)],
+        "where": range_filter(spec),
+        #bars keep only the largest categories, so high-cardinality columns stay cheap to plot
+        "top": kind == "bar",
+        "finish": lambda rows: finish_groups(spec, rows),
+    }
+
+def empty_data(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """plot data of a chart whose columns hold no values"""
+    return {"x": [], "y": [], "count": []} if spec["kind"] == "scatter" else {"x": [], "y": []}
+
+def plan_query(plan: Dict[str, Any], relation: str) -> str:
+    """
+    sql of a chart plan
+
+    args:
+        plan: plan from chart_plan
+        relation: quoted table, view or cte to read
+    returns:
+        SELECT returning the plan's (*group, *values) rows
+    """
+    groups = [f"{expr} AS g{i}" for i, expr in enumerate(plan["group"])]
+    values = [f"{expr} AS v{i}" for i, expr in enumerate(plan["values"])]
+    group_by = ", ".join(f"g{i}" for i in range(len(groups)))
+    limit = f" ORDER BY v0 DESC NULLS LAST LIMIT {MAX_BARS}" if plan["top"] else ""
+    return f"SELECT {', '.join(groups + values)} FROM {relation} WHERE {plan['where']} GROUP BY {group_by}{limit}"
+
+def run_chart(cursor: duckdb.DuckDBPyConnection, spec: Dict[str, Any],
+              bounds: Optional[Dict[str, Tuple[Any, Any]]] = None) -> Dict[str, Any]:
+    """
+    compute the plot data of one chart inside duckdb
+
+    only the aggregated points reach python, and their number is bounded by the
+    plot's pixel size, so the cost is one aggregate query however large the source is
+
+    args:
+        cursor: cursor to run on
+        spec: dict with kind (one of CHART_KINDS), source, x, and for
+            bar/line charts agg (one of AGGREGATES, or RAW_VALUES for a line) and y.
+            optional pixels (width, height), and x_range/y_range (lo, hi) to
+            re-query only the visible part of a zoomed chart
+        bounds: already known min/max of the chart's bounds_columns, fetched if None
+    returns:
+        dict with x and y lists, scatter charts also get a density grid (see _density_plan)
+    """
+    if bounds is None:
+        bounds = fetch_bounds(cursor, spec["source"], bounds_columns(spec))
+    plan = chart_plan(spec, bounds)
+    if plan is None:
+        return empty_data(spec)
+    return plan["finish"](cursor.execute(plan_query(plan, quote_identifier(spec["source"]))).fetchall())
+
+def run_charts(cursor: duckdb.DuckDBPyConnection, source: str, specs: List[Dict[str, Any]],
+               bounds: Dict[str, Tuple[Any, Any]]) -> List[Any]:
+    """
+    compute the plot data of several charts on one source in a single scan
+
+    the columns the charts use are read once into a materialized cte, and every
+    chart aggregates that in memory as one list-valued column of a single row.
+    the cte holds those columns in full, so keep this to sources that fit in memory
+
+    args:
+        cursor: cursor to run on
+        source: table or view every spec reads
+        specs: chart specs, see run_chart
+        bounds: min/max of every spec's bounds_columns
+    returns:
+        plot data per spec, in order, or the ValueError that chart failed with
+    """
+    results: List[Any] = [None] * len(specs)
+    plans = {}
+    for i, spec in enumerate(specs):
+        if spec["source"] != source:
+            results[i] = ValueError(f"Chart reads {spec['source']}, not {source}")
+            continue
+        try:
+            plan = chart_plan(spec, bounds)
+        except ValueError as e:
+            results[i] = e
+            continue
+        if plan is None:
+            results[i] = empty_data(spec)
+        else:
+            plans[i] = plan
+    if not plans:
+        return results
+
+    columns = dict.fromkeys(
+        quote_identifier(specs[i][axis]) for i in plans for axis in ("x", "y") if specs[i].get(axis)
+    )
+    charts = []
+    for n, plan in enumerate(plans.values()):
+        fields = [f"g{k}" for k in range(len(plan["group"]))] + [f"v{k}" for k in range(len(plan["values"]))]
+        charts.append(f"(SELECT list(({', '.join(fields)})) FROM ({plan_query(plan, 'shared')})) AS c{n}")
+    shared = f"SELECT {', '.join(columns)} FROM {quote_identifier(source)}"
+    row = cursor.execute(f"WITH shared AS MATERIALIZED ({shared}) SELECT {', '.join(charts)}").fetchone()
+
+    for (i, plan), rows in zip(plans.items(), row):
+        try:
+            results[i] = plan["finish"](rows or [])
+        except ValueError as e:
+            results[i] = e
+    return results
+
+def _position_expr(column: str, lo) -> str:
+    """a column as a plain number, epoch seconds for dates and timestamps"""
+    col = quote_identifier(column)
+    return f"epoch({col})" if isinstance(lo, (datetime.date, datetime.datetime)) else f"{col}::DOUBLE"
+
+def _position(value) -> float:
+    """a bound as a plain number, matching _position_expr"""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return _as_datetime(value).replace(tzinfo=datetime.timezone.utc).timestamp()
+    return float(value)
+
+def _cell_expr(column: str, lo, hi, cells: int) -> str:
+    """index of the equal-width cell a value falls in, out of `cells` between lo and hi"""
+    start, end = _position(lo), _position(hi)
+    width = (end - start) / cells if end != start else 1.0
+    return f"least(floor(({_position_expr(column, lo)} - {start!r}) / {width!r}), {cells - 1})"
+
+def _not_null(spec: Dict[str, Any]) -> str:
+    """row condition of charts plotting individual x/y pairs"""
+    x, y = quote_identifier(spec["x"]), quote_identifier(spec["y"])
+    return f"{x} IS NOT NULL AND {y} IS NOT NULL AND {range_filter(spec)}"
+
+def _m4_plan(spec: Dict[str, Any], bounds) -> Optional[Dict[str, Any]]:
+    """
+    m4 downsampling of a raw line series
+
+    keeps the first, last, lowest and highest point of every pixel column, which
+    draws the same line as the full series at that width
+    """
+    lo, hi = bounds[spec["x"]]
+    if lo is None:
+        return None
+    x, y = quote_identifier(spec["x"]), quote_identifier(spec["y"])
+
+    def finish(rows):
+        points = set()
+        for row in rows:
+            if row[0] is not None:
+                points.update(zip(row[1::2], row[2::2]))
+        points = sorted(points, key=lambda point: point[0])
+        return {"x": [point[0] for point in points], "y": [point[1] for point in points]}
+
+    return {
+        "group": [_cell_expr(spec["x"], lo, hi, line_buckets(spec))],
+        "values": [
+            f"min({x})", f"arg_min({y}, {x})",
+            f"arg_min({x}, {y})", f"min({y})",
+            f"arg_max({x}, {y})", f"max({y})",
+            f"max({x})", f"arg_max({y}, {x})",
+        ],
+        "where": _not_null(spec),
+        "top": False,
+        "finish": finish,
+    }
+
+def _density_plan(spec: Dict[str, Any], bounds) -> Optional[Dict[str, Any]]:
+    """
+    grid-binned point counts of a scatter plot, one cell per few pixels
+
+    the finished data has x and y (lower cell corners) and count per cell, plus
+    the grid as extent (x_lo, x_hi, y_lo, y_hi) and cells (columns, rows)
+    """
+    (x_lo, x_hi), (y_lo, y_hi) = bounds[spec["x"]], bounds[spec["y"]]
+    if x_lo is None or y_lo is None:
+        return None
+    for lo in (x_lo, y_lo):
+        if isinstance(lo, (str, bytes, bool, datetime.date)):
+            raise ValueError("Scatter charts need numeric x and y columns")
+
+    width, height = pixels(spec)
+    x_cells = max(1, width // DENSITY_CELL_PIXELS)
+    y_cells = max(1, height // DENSITY_CELL_PIXELS)
+    x_lo, x_hi, y_lo, y_hi = float(x_lo), float(x_hi), float(y_lo), float(y_hi)
+    x_step = (x_hi - x_lo) / x_cells if x_hi != x_lo else 1.0
+    y_step = (y_hi - y_lo) / y_cells if y_hi != y_lo else 1.0
+
+    def finish(rows):
+        rows = [row for row in rows if row[0] is not None and row[1] is not None]
+        return {
+            "x": [x_lo + row[0] * x_step for row in rows],
+            "y": [y_lo + row[1] * y_step for row in rows],
+            "count": [row[2] for row in rows],
+            "extent": (x_lo, x_lo + x_cells * x_step, y_lo, y_lo + y_cells * y_step),
+            "cells": (x_cells, y_cells),
+        }
+
+    return {
+        "group": [_cell_expr(spec["x"], x_lo, x_hi, x_cells), _cell_expr(spec["y"], y_lo, y_hi, y_cells)],
+        "values": ["count(*)"],
+        "where": _not_null(spec),
+        "top": False,
+        "finish": finish,
+    }
@@ -1,86 +1,993 @@
 import duckdb
-from typing import Optional, List, Dict, Any
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable, Set, Union
 from pathlib import Path
 
+from src.database.aggregations import bounds_columns, fetch_bounds, run_chart, run_charts
+from src.database.parquet_inspector import inspect_parquet
+from src.database.profiler import profile_relation
+from src.database.query_cache import DEFAULT_CACHE_BYTES, QueryCache, deterministic_functions, is_deterministic
+from src.database.remote import (
+    DEFAULT_BLOCK_CACHE_BYTES, default_block_cache_dir, enable_remote, is_remote, is_remote_glob,
+    prune_block_cache, remote_path
+)
+from src.database.result_set import ROW_QUERY_PREFIXES, ResultSet
+from src.database.transforms import run_polars
+from src.utils.instrumentation import tracer
+from src.utils.sql import quote_identifier, quote_literal
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+LOAD_MODES = ("view", "table")
+EXPORT_RELATION = "duckboard_export"  # name a complete result is registered under while it is exported
+ARROW_EXPORT_BATCH_ROWS = 122880  # rows per record batch of an arrow export, duckdb's row group size
+
+TAIL_DIGEST_BYTES = 4096  # bytes compared when checking a csv was only appended to
+
+DEFAULT_MAX_WORKERS = 4  # concurrent loads/exports on the worker pool
+DEFAULT_MAX_QUEUED_JOBS = 16  # jobs allowed to wait for a free worker
+
+#file size at which the auto load mode switches from table to view
+AUTO_VIEW_THRESHOLDS = {
+    "csv": 1024 ** 3,
+    "csv.gz": 256 * 1024 ** 2,
+    "parquet": 64 * 1024 ** 2,
+    "arrow": 64 * 1024 ** 2,
+}
+
+#views re-parse these formats on every scan, so dashboard charts over them share one scan.
+#columnar sources only read the columns a chart uses, separate queries are cheaper there
+SHARED_SCAN_FORMATS = ("csv",)
+#the shared scan holds the charts' columns in memory, larger files are streamed chart by chart
+SHARED_SCAN_MAX_BYTES = 256 * 1024 ** 2
+
+def detect_format(file_path: str) -> Optional[str]:
+    """
+    detect data format from a file name
+
+    returns:
+        'csv', 'parquet', 'arrow', or None if unsupported
+    """
+    name = (remote_path(file_path) if is_remote(file_path) else file_path).lower()
+    if name.endswith('.csv') or name.endswith('.csv.gz') or name.endswith('.gz'):
+        return "csv"
+    if name.endswith('.parquet'):
+        return "parquet"
+    if name.endswith('.arrow'):
+        return "arrow"
+    return None
+
+FORMAT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+#a source is a file path, a glob pattern, a directory, or a list of file paths
+Source = Union[str, List[str]]
+
+def is_glob(path: str) -> bool:
+    """whether a path contains glob wildcards"""
+    return any(ch in path for ch in "*?[")
+
+def expand_source(source: Source) -> List[str]:
+    """
+    list the concrete files behind a source
+
+    args:
+        source: file path, glob pattern, directory, or list of file paths
+    returns:
+        sorted list of data file paths
+    """
+    if isinstance(source, (list, tuple)):
+        return list(source)
+    if is_remote(source):
+        #remote globs are listed by httpfs itself
+        return [source]
+    if is_glob(source):
+        return sorted(glob.glob(source, recursive=True))
+    if os.path.isdir(source):
+        pattern = os.path.join(source, "**", "*")
+        return sorted(f for f in glob.glob(pattern, recursive=True) if os.path.isfile(f) and detect_format(f))
+    return [source]
+
+def absolute_source(source: Source) -> Source:
+    """the source with local paths made absolute, so it still resolves from another working directory"""
+    if isinstance(source, (list, tuple)):
+        return [absolute_source(path) for path in source]
+    if is_remote(source):
+        return source
+    return os.path.abspath(source)
+
+def source_label(source: Source) -> str:
+    """short human readable description of a source"""
+    if isinstance(source, (list, tuple)):
+        if len(source) == 1:
+            return source[0]
+        return f"{len(source)} files in {os.path.dirname(source[0])}"
+    return source
+
+def default_table_name(file_path: Source) -> str:
+    """derive a table name from a file name, glob pattern, directory or file list"""
+    if isinstance(file_path, (list, tuple)):
+        file_path = file_path[0]
+    if is_remote(file_path):
+        file_path = remote_path(file_path).rstrip("/") or "url_data"
+    if is_glob(file_path):
+        #use the last path part without wildcards, e.g. data/year=*/*.parquet -> data
+        parts = [part for part in Path(file_path).parts if not is_glob(part)]
+        file_path = parts[-1] if parts else "glob_data"
+
+    # handle double extensions like .csv.gz
+    name = Path(file_path).name
+    # remove .gz if present
+    if name.endswith('.gz'):
+        name = name[:-3]
+    # remove data file extensions
+    for ext in ['.csv', '.parquet', '.arrow']:
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+            break
+    # sanitize name
+    return name.replace(" ", "_").replace("-", "_").replace("=", "_")
+
+def is_multi_file(source: Source) -> bool:
+    """whether a source can span several files (list, glob or directory)"""
+    if is_remote(source):
+        return is_remote_glob(source)
+    return isinstance(source, (list, tuple)) or is_glob(source) or os.path.isdir(source)
+
+def file_states(source: Source) -> Dict[str, Dict[str, float]]:
+    """
+    stat the files behind a source so changes on disk can be detected
+
+    returns:
+        dict of file path -> {mtime, size}, empty for urls
+    """
+    if is_remote(source):
+        return {}
+    states = {}
+    for path in expand_source(source):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        states[path] = {"mtime": st.st_mtime, "size": st.st_size}
+    return states
+
+def source_signature(source: Source, states: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Any]:
+    """
+    fingerprint the files behind a source
+
+    returns:
+        dict with the newest mtime and the total size of the source's files,
+        both None for urls or sources with no files
+    """
+    states = file_states(source) if states is None else states
+    if not states:
+        return {"mtime": None, "size": None}
+    return {
+        "mtime": max(st["mtime"] for st in states.values()),
+        "size": sum(st["size"] for st in states.values()),
+    }
+
+def tail_digest(path: str, offset: int) -> str:
+    """hash of the bytes just before offset, used to check a file was only appended to"""
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - TAIL_DIGEST_BYTES))
+        return hashlib.sha1(f.read(offset - f.tell())).hexdigest()
+
+#catalog of loaded sources, kept inside workspace databases
+CATALOG_TABLE = "_duckboard_sources"
+
+class _ThreadCursor:
+    """a thread's cursor, kept in thread-local storage so it goes away with the thread"""
+    def __init__(self, cursor: duckdb.DuckDBPyConnection, generation: int):
+        self.cursor = cursor
+        self.generation = generation
+        self.frames = (None, set())  # (frames version, registered names)
+
 class DuckDBManager:
     """manages duckdb connection and query execution"""
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_queued_jobs: int = DEFAULT_MAX_QUEUED_JOBS, cache_bytes: int = DEFAULT_CACHE_BYTES,
+                 block_cache_dir: Optional[str] = None, block_cache_bytes: int = DEFAULT_BLOCK_CACHE_BYTES,
+                 disk_block_cache: bool = False):
         """
         init duckdb manager
         args:
             db_path: path to persist db file or use in-memory db
+            max_workers: size of the worker pool used by submit()
+            max_queued_jobs: jobs that may wait for a worker before submit() refuses more
+            cache_bytes: memory budget of the query result cache, 0 disables it
+            block_cache_dir: folder caching blocks of remote files (a per-user folder if None)
+            block_cache_bytes: disk budget of the remote block cache
+            disk_block_cache: cache remote blocks on disk with the cache_httpfs community
+                extension, downloaded on first use (in memory for the session otherwise)
+        """
+        self.loaded_tables: Dict[str, str] = {} # table_name -> file path or source description
+        self.sources: Dict[str, Dict[str, Any]] = {} # table_name -> {path, format, mode, mtime, size, files}
+        self.missing_sources: List[str] = []  # restored sources whose files are gone, kept as stored
+        self.source_versions: Dict[str, int] = {} # table_name -> bumped whenever its data changes
+        self.query_cache = QueryCache(cache_bytes)
+        self._profiles: Dict[str, tuple] = {} # table_name -> (source version, column profile)
+        self._bounds: Dict[tuple, tuple] = {} # (table_name, column) -> (source version, (min, max)) for charts
+        #arrow tables queried in place, registered on every cursor since registrations are per connection
+        self.frames: Dict[str, "pa.Table"] = {} # table_name -> arrow table
+        self._frames_version = 0  # bumped when frames change, thread cursors re-register them
+        self.block_cache_dir = block_cache_dir or default_block_cache_dir()
+        self.block_cache_bytes = block_cache_bytes
+        self.disk_block_cache = disk_block_cache
+
+        #every thread talks to the database through its own cursor, the shared conn is only
+        #used under _lock for the tracer's memory probe
+        self._local = threading.local()
+        self._thread_cursors: List[duckdb.DuckDBPyConnection] = []
+        self._retired_cursors: List[duckdb.DuckDBPyConnection] = []  # of ended threads, not closed yet
+        self._generation = 0  # bumped when the connection is replaced, invalidates thread cursors
+        self._lock = threading.RLock()  # guards loaded_tables, sources and the thread cursors
+        self._remote_lock = threading.Lock()  # serializes the one time remote setup
+
+        self._connect(db_path)
+        #spans sample the engine's memory next to the process rss
+        tracer.memory_probe = self.memory_usage
+
+        #bounded worker pool with a small job queue for loads and exports
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="duckboard-worker")
+        self._job_slots = threading.BoundedSemaphore(max_workers + max_queued_jobs)
+        self._jobs = set()  # futures of submitted jobs that haven't finished
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        run a job on the worker pool
+
+        the job may call any manager method, each worker thread gets its own
+        cursor so jobs run concurrently with each other and with queries
+
+        args:
+            fn: callable to run, e.g. self.load_file
+            *args, **kwargs: passed to fn
+        returns:
+            future for the job's result
+        raises:
+            RuntimeError: if the job queue is full
+        """
+        if not self._job_slots.acquire(blocking=False):
+            raise RuntimeError("Too many pending jobs, wait for running loads to finish")
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._job_slots.release()
+            raise
+        with self._lock:
+            self._jobs.add(future)
+        future.add_done_callback(self._on_job_done)
+        return future
+
+    def _on_job_done(self, future: Future):
+        """free the job's queue slot"""
+        with self._lock:
+            self._jobs.discard(future)
+        self._job_slots.release()
+
+    @property
+    def pending_jobs(self) -> int:
+        """submitted jobs still queued or running, on whichever connection they started"""
+        with self._lock:
+            return len(self._jobs)
+
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        cursor owned by the calling thread, created on first use
+
+        meant for long lived threads (the gui thread, pool workers). the cursor
+        of a thread that ended is closed on a later call, but one-off threads
+        should take a cursor() of their own and close it instead
+        """
+        if self._retired_cursors:
+            self._close_retired_cursors()
+        owned = getattr(self._local, "owned", None)
+        if owned is None or owned.generation != self._generation:
+            owned = _ThreadCursor(self.conn.cursor(), self._generation)
+            self._local.owned = owned
+            with self._lock:
+                self._thread_cursors.append(owned.cursor)
+            #thread-local storage is dropped when the thread ends, taking owned with it
+            weakref.finalize(owned, self._retire_cursor, owned.cursor).atexit = False
+        if owned.frames[0] != self._frames_version:
+            owned.frames = self._attach_frames(owned.cursor, owned.frames[1])
+        return owned.cursor
+
+    def _retire_cursor(self, cursor: duckdb.DuckDBPyConnection):
+        """hand the cursor of an ended thread over to be closed by a live one"""
+        #closing it here, during the thread's teardown, crashes for threads started by qt
+        with self._lock:
+            if cursor in self._thread_cursors:
+                self._thread_cursors.remove(cursor)
+                self._retired_cursors.append(cursor)
+
+    def _close_retired_cursors(self):
+        """close the cursors of threads that have ended"""
+        with self._lock:
+            retired, self._retired_cursors = self._retired_cursors, []
+        for cursor in retired:
+            try:
+                cursor.close()
+            except duckdb.Error:
+                pass
+
+    def _new_cursor(self) -> duckdb.DuckDBPyConnection:
+        """new cursor on the connection that can see the registered frames"""
+        cursor = self.conn.cursor()
+        self._attach_frames(cursor)
+        return cursor
+
+    def _attach_frames(self, cursor: duckdb.DuckDBPyConnection, registered=()):
+        """
+        register the current frames on a cursor
+
+        args:
+            cursor: cursor to register on
+            registered: frame names the cursor already has, dropped ones are unregistered
+        returns:
+            (frames version, registered names) to pass back in next time
         """
+        with self._lock:
+            frames = dict(self.frames)
+            version = self._frames_version
+        for name in set(registered) - set(frames):
+            cursor.unregister(name)
+        for name, table in frames.items():
+            cursor.register(name, table)
+        return version, set(frames)
+
+    @property
+    def is_workspace(self) -> bool:
+        """whether the database is a persistent workspace file"""
+        return self.db_path not in (None, ":memory:")
+
+    def _connect(self, db_path: Optional[str]):
+        """connect to a database file (or in-memory) and prepare its source catalog"""
         self.db_path = db_path
-        self.conn = duckdb.connect(db_path or ":memory")
-        self.loaded_tables: Dict[str, str] = {} # table_name -> file_path
+        self.conn = duckdb.connect(db_path or ":memory:")
+        self.remote_cache: Optional[str] = None  # 'disk' or 'memory' once a remote source was used
+        self._deterministic_functions: Optional[Set[str]] = None  # listed on the first cacheable query
+        if self.is_workspace:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} (
+                    table_name VARCHAR PRIMARY KEY,
+                    source VARCHAR,      -- json encoded path, pattern or file list
+                    format VARCHAR,
+                    load_mode VARCHAR,
+                    mtime DOUBLE,
+                    size BIGINT,
+                    loaded_at TIMESTAMP,
+                    files VARCHAR        -- json encoded per-file state for incremental refresh
+                )
+            """)
+            self.conn.execute(f"ALTER TABLE {CATALOG_TABLE} ADD COLUMN IF NOT EXISTS files VARCHAR")
+
+    def open_workspace(self, db_path: Optional[str]):
+        """
+        switch to another workspace database, creating it if needed
+
+        open result sets and running jobs on the old database must be finished
+        first, see pending_jobs
+
+        args:
+            db_path: path to a .duckdb file, or None for a scratch in-memory database
+        """
+        self._close_retired_cursors()
+        with self._lock:
+            for cursor in self._thread_cursors:
+                cursor.close()
+            self._thread_cursors.clear()
+            self._generation += 1
+            self.conn.close()
+            self.loaded_tables.clear()
+            self.sources.clear()
+            self.missing_sources.clear()
+            self.source_versions.clear()
+            self.query_cache.clear()
+            self._profiles.clear()
+            self._bounds.clear()
+            self.frames.clear()
+            self._frames_version += 1
+            self._connect(db_path)
+        #queries on the old database's remote views added blocks too
+        self._prune_block_cache()
+
+    def restore_workspace(self) -> List[Dict[str, Any]]:
+        """
+        register the sources recorded in the workspace catalog
+
+        tables whose source files are unchanged (and all views, which always
+        read the current files) are reused as they are, without touching the data.
+        a local source whose files are all gone keeps its stored table instead of
+        being reloaded, and is listed in missing_sources
 
-    def load_file(self, file_path: str, table_name: Optional[str] = None) -> str:
+        returns:
+            stale sources that need reloading, as dicts with table_name, source and mode
+        """
+        self.missing_sources = []
+        if not self.is_workspace:
+            return []
+
+        cursor = self._cursor()
+        rows = cursor.execute(
+            f"SELECT table_name, source, format, load_mode, mtime, size, files FROM {CATALOG_TABLE} ORDER BY loaded_at"
+        ).fetchall()
+        existing = {
+            name.lower() for (name,) in cursor.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
+            ).fetchall()
+        }
+
+        stale = []
+        for table_name, source_json, file_format, mode, mtime, size, files_json in rows:
+            source = json.loads(source_json)
+            states = file_states(source)
+            signature = source_signature(source, states)
+            unchanged = signature["mtime"] == mtime and signature["size"] == size
+            #moved or deleted, reloading would only drop the table stored in the workspace
+            missing = not states and not is_remote(source)
+            if missing:
+                self.missing_sources.append(table_name)
+            if table_name.lower() in existing and (mode == "view" or unchanged or missing):
+                with self._lock:
+                    self.loaded_tables[table_name] = source_label(source)
+                    self.sources[table_name] = {
+                        "path": source, "format": file_format, "mode": mode,
+                        "mtime": mtime, "size": size, "files": json.loads(files_json or "{}"),
+                    }
+                    self._bump_version(table_name)
+            elif not missing:
+                stale.append({"table_name": table_name, "source": source, "mode": mode})
+
+        #restored remote views read through the block cache too, set up off the startup path
+        if any(is_remote(info["path"]) for info in self.sources.values()):
+            try:
+                self.submit(self._prepare_remote)
+            except RuntimeError:
+                pass  # the first remote load sets it up instead
+        return stale
+
+    def _record_source(self, table_name: str, cursor: duckdb.DuckDBPyConnection):
+        """write a loaded source to the workspace catalog"""
+        if not self.is_workspace:
+            return
+        info = self.sources[table_name]
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {CATALOG_TABLE} "
+            "(table_name, source, format, load_mode, mtime, size, loaded_at, files) "
+            "VALUES (?, ?, ?, ?, ?, ?, now(), ?)",
+            [table_name, json.dumps(info["path"]), info["format"], info["mode"],
+             info["mtime"], info["size"], json.dumps(info["files"])]
+        )
+
+    def _bump_version(self, table_name: str):
+        """mark a source's data as changed, dropping cached results that read it"""
+        with self._lock:
+            self.source_versions[table_name] = self.source_versions.get(table_name, 0) + 1
+        self.query_cache.invalidate(table_name)
+
+    def load_file(self, file_path: Source, table_name: Optional[str] = None, mode: str = "auto",
+                  cursor: Optional[duckdb.DuckDBPyConnection] = None) -> str:
         """
         load a data file (csv, parquet, arrow) into duckdb
+
         args:
-            file_path: path to file
+            file_path: path to file, or a glob pattern, directory or list of files
+                that are registered together as one table (hive partitions such as
+                year=2024/ become columns)
             table_name: optional table name, use filename without extension if none
+            mode: 'view' scans the file in place on every query (projection and
+                filter pushdown into the reader, no copy), 'table' materializes it
+                into the database, 'auto' picks based on file size and format
+            cursor: cursor to load on, lets the caller poll progress (thread cursor if None)
         returns:
             the table name used
         """
-        #check if url
-        is_url = file_path.startswith('http://') or file_path.startswith('https://')
+        if isinstance(file_path, (list, tuple)) and len(file_path) == 1:
+            file_path = file_path[0]
+        #the catalog outlives the working directory it was loaded from
+        file_path = absolute_source(file_path)
+
+        #http(s) and object store urls are read by httpfs with range requests
+        is_url = is_remote(file_path)
 
         if not table_name:
-            if is_url:
-                #for urls, use "url_data" or extract from url path
-                default_name = "url_data"
-            else:
-                # handle double extensions like .csv.gz
-                name = path.name
-                # remove .gz if present
-                if name.endswith('.gz'):
-                    name = name[:-3]
-                # remove data file extensions
-                for ext in ['.csv', '.parquet', '.arrow']:
-                    if name.endswith(ext):
-                        name = name[:-len(ext)]
-                        break
-                # sanitize name
-                default_name = name.replace(" ", "_").replace("-","_")
-        
-        #determin file type
+            table_name = default_table_name(file_path)
+
+        #determin file type and what to hand the reader, for url without an extension assume csv
         if is_url:
-            #for url assume csv
-            suffix = ".csv"
+            file_format = detect_format(file_path) or "csv"
+            reader_source, multi_file = quote_literal(file_path), is_remote_glob(file_path)
         else:
-            path = Path(file_path)
-            suffix = path.suffix.lower()
+            file_format, reader_source, multi_file = self._reader_source(file_path)
+        if file_format == "csv":
+            reader = "read_csv_auto"
+        elif file_format == "parquet":
+            reader = "read_parquet"
+        elif file_format == "arrow":
+            reader = "read_arrow"
+        else:
+            raise ValueError(f"Unsupported file type: {source_label(file_path)}")
+
+        if mode == "auto":
+            mode = self.choose_load_mode(file_path, file_format, is_url)
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unsupported load mode: {mode}")
+
+        #multi-file sources are unioned by column name and pick up hive partition columns,
+        #materialized ones also keep a filename column so refresh can replace single files
+        options = ""
+        if multi_file and file_format != "arrow":
+            options = ", hive_partitioning = true, union_by_name = true"
+            if mode == "table":
+                options += ", filename = true"
+
+        cursor = cursor or self._cursor()
+        if is_url:
+            self._prepare_remote(cursor)
+        create_type = "VIEW" if mode == "view" else "TABLE"
+        query = (
+            f"CREATE OR REPLACE {create_type} {quote_identifier(table_name)} AS "
+            f"SELECT * FROM {reader}({reader_source}{options})"
+        )
+        #fingerprint before reading so a write during the load shows up as stale later
+        states = file_states(file_path)
+        if self._is_appendable_csv(file_path, file_format, mode):
+            for path, state in states.items():
+                state["tail"] = tail_digest(path, state["size"])
+
+        #a view and a table can't replace each other, drop whichever exists first. in one
+        #transaction with the create, so a failed load leaves the previous data in place
+        cursor.execute("BEGIN TRANSACTION")
+        try:
+            self._drop_relation(table_name, cursor)
+            with tracer.span("load", "load", table=table_name, mode=mode, format=file_format):
+                cursor.execute(query)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        #a frame of the same name would shadow the new table
+        if self._drop_frame(table_name):
+            cursor.unregister(table_name)
+        with self._lock:
+            self.loaded_tables[table_name] = source_label(file_path)
+            self.sources[table_name] = {
+                "path": file_path, "format": file_format, "mode": mode,
+                **source_signature(file_path, states), "files": states,
+            }
+            self._bump_version(table_name)
+        self._record_source(table_name, cursor)
+        if is_url:
+            self._prune_block_cache()
+        return table_name
+
+    def _prepare_remote(self, cursor: Optional[duckdb.DuckDBPyConnection] = None):
+        """
+        set up httpfs and the remote block cache before the first remote source is used
+
+        args:
+            cursor: cursor to configure the database on (thread cursor if None)
+        """
+        #own lock, installing an extension can wait on the network
+        with self._remote_lock:
+            if self.remote_cache is not None:
+                return
+            self.remote_cache = enable_remote(cursor or self._cursor(), self.block_cache_dir, self.disk_block_cache)
+        self._prune_block_cache()
+
+    def _prune_block_cache(self):
+        """keep the on-disk block cache within its budget, if it is enabled"""
+        if self.disk_block_cache:
+            prune_block_cache(self.block_cache_dir, self.block_cache_bytes)
+
+    def _is_appendable_csv(self, source: Source, file_format: str, mode: str) -> bool:
+        """whether a source is a single uncompressed local csv table, which can be refreshed by its tail"""
+        return (
+            mode == "table" and file_format == "csv" and isinstance(source, str)
+            and not is_multi_file(source) and not source.lower().endswith(".gz")
+            and not is_remote(source)
+        )
 
+    def refresh_source(self, table_name: str, cursor: Optional[duckdb.DuckDBPyConnection] = None) -> str:
+        """
+        bring a loaded source up to date with its files on disk
+
+        views always read the current files, so only their version changes.
+        a single csv table that was only appended to ingests just the new tail
+        bytes, a multi-file table re-reads only new and modified files (using its
+        filename column), anything else is reloaded in full
+
+        args:
+            table_name: loaded table to refresh
+            cursor: cursor to run on (thread cursor if None)
+        returns:
+            'unchanged', 'view', 'appended', 'files' or 'reloaded'
+        """
+        info = self.sources[table_name]
+        source = info["path"]
+        cursor = cursor or self._cursor()
 
-        #choose talbe for url or view for local
-        create_type = "TABLE" # always use table for speed, will add memory effienct view later
+        current = file_states(source)
+        recorded = info.get("files", {})
+        changed = {
+            path for path, state in current.items()
+            if path not in recorded
+            or (state["mtime"], state["size"]) != (recorded[path]["mtime"], recorded[path]["size"])
+        }
+        removed = set(recorded) - set(current)
+        if not changed and not removed:
+            return "unchanged"
 
-        # create a view for easier naming and schema
-        if suffix == ".csv" or suffix == ".gz":
-            query = f"CREATE OR REPLACE {create_type} {table_name} AS SELECT * FROM read_csv_auto('{file_path}')"
-        elif suffix == ".parquet":
-            query = f"CREATE OR REPLACE {create_type} {table_name} AS SELECT * FROM read_parquet('{file_path}')"
-        elif suffix == ".arrow":
-            query = f"CREATE OR REPLACE {create_type} {table_name} AS SELECT * FROM read_arrow('{file_path}')"
+        if info["mode"] == "view":
+            outcome = "view"
+        elif self._is_appendable_csv(source, info["format"], info["mode"]) and self._append_csv_tail(
+                table_name, source, recorded.get(source), current.get(source), cursor):
+            outcome = "appended"
+        elif is_multi_file(source) and info["format"] != "arrow" and current:
+            self._refresh_files(table_name, source, sorted(changed), sorted(removed), cursor)
+            outcome = "files"
         else:
-            raise ValueError(f"Unsupported file type: {suffix}")
+            self.load_file(source, table_name, info["mode"], cursor=cursor)
+            return "reloaded"
+
+        with self._lock:
+            info["files"] = current
+            info.update(source_signature(source, current))
+            self._bump_version(table_name)
+        self._record_source(table_name, cursor)
+        return outcome
+
+    def _append_csv_tail(self, table_name: str, path: str, recorded: Optional[Dict[str, Any]],
+                         current: Optional[Dict[str, Any]], cursor: duckdb.DuckDBPyConnection) -> bool:
+        """
+        insert the rows appended to a csv since it was loaded
+
+        returns:
+            False if the file was rewritten rather than appended to
+        """
+        if not recorded or not current or current["size"] < recorded["size"]:
+            return False
+        offset = recorded["size"]
+        if recorded.get("tail") != tail_digest(path, offset):
+            return False
+
+        with open(path, "rb") as f:
+            #the loaded part must have ended on a complete line
+            if offset > 0:
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    return False
+            tail = f.read(current["size"] - offset)
+
+        #only ingest complete lines, a half-written last line waits for the next refresh
+        end = tail.rfind(b"\n") + 1
+        if end > 0:
+            #sniff_csv reports unset options as '(empty)'
+            dialect = [
+                "" if value == "(empty)" else value
+                for value in cursor.execute(
+                    f"SELECT Delimiter, Quote, Escape FROM sniff_csv({quote_literal(path)})"
+                ).fetchone()
+            ]
+            columns = ", ".join(
+                f"{quote_literal(name)}: {quote_literal(col_type)}"
+                for name, col_type in self.get_table_schema(table_name)
+            )
+            with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as tmp:
+                tmp.write(tail[:end])
+            try:
+                cursor.execute(
+                    f"INSERT INTO {quote_identifier(table_name)} SELECT * FROM read_csv("
+                    f"{quote_literal(tmp.name)}, header = false, auto_detect = false, "
+                    f"delim = {quote_literal(dialect[0])}, quote = {quote_literal(dialect[1])}, "
+                    f"escape = {quote_literal(dialect[2])}, columns = {{{columns}}})"
+                )
+            finally:
+                os.remove(tmp.name)
 
-        self.conn.execute(query)
-        self.loaded_tables[table_name] = file_path
+        #remember how far the table goes, a partial last line is picked up next time
+        current["size"] = offset + end
+        current["tail"] = tail_digest(path, current["size"])
+        return True
+
+    def _refresh_files(self, table_name: str, source: Source, changed: List[str], removed: List[str],
+                       cursor: duckdb.DuckDBPyConnection):
+        """replace the rows of changed and removed files in a multi-file table"""
+        info = self.sources[table_name]
+        reader = "read_parquet" if info["format"] == "parquet" else "read_csv_auto"
+        table = quote_identifier(table_name)
+
+        cursor.execute("BEGIN TRANSACTION")
+        try:
+            stale = [path for path in changed if path in info["files"]] + removed
+            if stale:
+                paths = ", ".join(quote_literal(path) for path in stale)
+                cursor.execute(f"DELETE FROM {table} WHERE filename IN ({paths})")
+            if changed:
+                paths = ", ".join(quote_literal(path) for path in changed)
+                cursor.execute(
+                    f"INSERT INTO {table} BY NAME SELECT * FROM {reader}([{paths}], "
+                    "hive_partitioning = true, union_by_name = true, filename = true)"
+                )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    def _reader_source(self, source: Source):
+        """
+        work out the format and reader argument for a local source
+
+        returns:
+            (format, sql for the reader's first argument, whether it spans multiple files)
+        """
+        if isinstance(source, (list, tuple)):
+            formats = {detect_format(path) for path in source}
+            if len(formats) != 1:
+                raise ValueError("All files in a multi-file source must have the same format")
+            paths = ", ".join(quote_literal(path) for path in source)
+            return formats.pop(), f"[{paths}]", True
+
+        if is_glob(source):
+            return detect_format(source), quote_literal(source), True
+
+        if os.path.isdir(source):
+            files = expand_source(source)
+            if not files:
+                raise ValueError(f"No data files found in {source}")
+            file_format = detect_format(files[0])
+            extension = FORMAT_EXTENSIONS[file_format]
+            if files[0].lower().endswith(".gz"):
+                extension += ".gz"
+            pattern = os.path.join(source, "**", f"*{extension}")
+            return file_format, quote_literal(pattern), True
+
+        return detect_format(source), quote_literal(source), False
+
+    def choose_load_mode(self, file_path: Source, file_format: str, is_url: bool = False) -> str:
+        """
+        pick 'view' or 'table' for the auto load mode
+
+        small files are materialized so repeated queries don't re-parse them,
+        large ones are left on disk as views so loading doesn't copy them into memory.
+        csv is parsed on every scan of a view, so it only switches much later than parquet
+
+        args:
+            file_path: path to file, or any multi-file source (sizes are summed)
+            file_format: format returned by detect_format
+            is_url: remote parquet stays remote as a view, queries range-read only
+                the footers and row groups they need. other remote formats can't be
+                read partially and are materialized
+        returns:
+            'view' or 'table'
+        """
+        if is_url:
+            return "view" if file_format == "parquet" else "table"
+
+        files = expand_source(file_path)
+        key = "csv.gz" if file_format == "csv" and files and files[0].lower().endswith(".gz") else file_format
+        total_size = sum(os.path.getsize(path) for path in files)
+        if total_size >= AUTO_VIEW_THRESHOLDS[key]:
+            return "view"
+        return "table"
+
+    def _drop_relation(self, name: str, cursor: Optional[duckdb.DuckDBPyConnection] = None):
+        """drop an existing table or view with this name"""
+        cursor = cursor or self._cursor()
+        row = cursor.execute(
+            "SELECT table_type FROM information_schema.tables WHERE lower(table_name) = lower(?) AND table_schema = 'main'",
+            [name]
+        ).fetchone()
+        if row is None:
+            return
+        relation_type = "VIEW" if row[0] == "VIEW" else "TABLE"
+        cursor.execute(f"DROP {relation_type} {quote_identifier(name)}")
+
+    def register_frame(self, table_name: str, frame, label: str = "in-memory frame") -> str:
+        """
+        make an arrow table or polars dataframe queryable as a table without copying it
+
+        duckdb scans the frame's buffers in place, so it lives only as long as
+        the session and is never written to the workspace file
+
+        args:
+            table_name: name to query the frame by, replaces an earlier frame of that name
+            frame: pyarrow table or polars dataframe
+            label: what the frame holds, shown in place of a file path
+        returns:
+            the table name used
+        raises:
+            ValueError: if a file source already uses the name
+        """
+        with self._lock:
+            if table_name in self.sources:
+                raise ValueError(f"A source named {table_name} is already loaded")
+        #polars shares its buffers with the arrow table it hands out
+        table = frame.to_arrow() if hasattr(frame, "to_arrow") else frame
+        with self._lock:
+            self.frames[table_name] = table
+            self._frames_version += 1
+            self.loaded_tables[table_name] = label
+            self._profiles.pop(table_name, None)
+            self._bump_version(table_name)
         return table_name
-        
-    def execute_query(self, query: str) -> duckdb.DuckDBPyConnection:
+
+    def _drop_frame(self, table_name: str) -> bool:
+        """forget a registered frame, returns whether there was one"""
+        with self._lock:
+            if self.frames.pop(table_name, None) is None:
+                return False
+            self._frames_version += 1
+            self.loaded_tables.pop(table_name, None)
+            return True
+
+    def polars_transform(self, table: "pa.Table", expression: str, table_name: str) -> str:
+        """
+        run a polars expression over a result and register its output as a table
+
+        args:
+            table: complete result, exposed to the expression as df
+            expression: polars expression, see transforms.run_polars
+            table_name: name the output is registered under
+        returns:
+            the table name used
+        """
+        with tracer.span("transform", "query", table=table_name):
+            frame = run_polars(table, expression)
+        return self.register_frame(table_name, frame, label=f"Polars transform: {expression}")
+
+    def execute_query(self, query: str, cursor: Optional[duckdb.DuckDBPyConnection] = None) -> ResultSet:
         """
-        execute sql query
+        execute sql query on its own cursor
 
         args:
             query: sql query string
+            cursor: cursor to run on, lets the caller interrupt it (a new one if None)
         returns:
-            query result object
+            streaming result set that owns the cursor, rows are fetched on demand
         """
-        return self.conn.execute(query)
-    
+        cursor = cursor or self._new_cursor()
+        is_row_query = query.lstrip().lower().startswith(ROW_QUERY_PREFIXES)
+        sources, only_sources = self._referenced_sources(query, cursor)
+
+        #serve repeated reads of unchanged sources from the result cache
+        cache_key = None
+        if is_row_query and sources and only_sources and self.query_cache.max_bytes \
+                and self._is_deterministic(query, cursor):
+            with self._lock:
+                versions = {name: self.source_versions.get(name, 0) for name in sources}
+            cache_key = self.query_cache.make_key(query, versions)
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                tracer.record("execute", tracer.now(), tracer.now(), "query", cached=True)
+                return ResultSet(cursor, query, table=cached, cursor_factory=self._new_cursor)
+
+        try:
+            #parsing, planning and running up to the first result all happen in execute
+            with tracer.span("execute", "query", query=query[:200]):
+                cursor.execute(query)
+        except Exception:
+            cursor.close()
+            raise
+
+        #statements like INSERT or UPDATE change the sources they touch
+        if not is_row_query:
+            for name in sources:
+                self._bump_version(name)
+
+        result = ResultSet(cursor, query, cursor_factory=self._new_cursor)
+        if cache_key is not None:
+            #only results fetched to the end are complete enough to cache
+            result.on_exhausted = lambda r: self.query_cache.put(cache_key, r.arrow(), sources)
+        return result
+
+    def _is_deterministic(self, query: str, cursor: duckdb.DuckDBPyConnection) -> bool:
+        """whether a query's rows only change with its sources, so its result can be cached"""
+        if self._deterministic_functions is None:
+            self._deterministic_functions = deterministic_functions(cursor)
+        return is_deterministic(query, cursor, self._deterministic_functions)
+
+    def _referenced_sources(self, query: str, cursor: duckdb.DuckDBPyConnection):
+        """
+        loaded sources a statement reads or writes
+
+        sources are matched by name in the sql text, since duckdb's own table
+        name lookup expands views and skips INSERT/UPDATE targets
+
+        returns:
+            (source names, whether every table the statement reads is a versioned source).
+            results that read other tables can't be cached, their changes aren't tracked
+        """
+        with self._lock:
+            known = {name.lower(): name for name in self.source_versions}
+        text = query.lower()
+        sources = [name for lower, name in known.items() if re.search(rf"\b{re.escape(lower)}\b", text)]
+
+        try:
+            names = cursor.get_table_names(query)
+        except duckdb.Error:
+            return sources, False
+        return sources, all(name.split(".")[-1].lower() in known for name in names)
+
+    def profile_query(self, query: str, cursor: Optional[duckdb.DuckDBPyConnection] = None) -> Dict[str, Any]:
+        """
+        run a query under EXPLAIN ANALYZE and collect duckdb's profile
+
+        the query runs to completion inside the engine, its rows are discarded
+
+        args:
+            query: sql query string, must return rows
+            cursor: cursor to run on, lets the caller interrupt it
+        returns:
+            parsed json profile with latency, peak memory and the operator tree
+        """
+        if not query.lstrip().lower().startswith(ROW_QUERY_PREFIXES):
+            raise ValueError("Only queries that return rows can be profiled")
+
+        query = query.strip().rstrip(";")
+        row = (cursor or self._cursor()).execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}").fetchone()
+        return json.loads(row[1])
+
+    def estimate_scan_rows(self, query: str) -> Optional[int]:
+        """
+        estimate how many rows a query will scan from the tables it reads
+
+        duckdb's progress is the fraction of source rows processed, so this
+        turns a progress percentage into an approximate rows-scanned figure
+
+        args:
+            query: sql query string
+        returns:
+            total estimated rows of the referenced tables, or None if any of
+            them is a view or can't be resolved
+        """
+        try:
+            names = self._cursor().get_table_names(query)
+        except duckdb.Error:
+            return None
+        if not names:
+            return None
+
+        total = 0
+        for name in names:
+            row = self._cursor().execute(
+                "SELECT estimated_size FROM duckdb_tables() WHERE lower(table_name) = lower(?)",
+                [name.split(".")[-1]]
+            ).fetchone()
+            if row is None:
+                return None
+            total += row[0]
+        return total
+
+    def set_memory_limit(self, limit: Optional[str], cursor: Optional[duckdb.DuckDBPyConnection] = None):
+        """
+        cap the memory duckdb may use before spilling or failing
+
+        the limit applies to the whole database, whichever cursor sets it
+
+        args:
+            limit: size string such as '4GB', or None for duckdb's default
+            cursor: cursor to set it through (the calling thread's if None)
+        raises:
+            duckdb.Error: if duckdb can't parse the limit
+        """
+        cursor = cursor or self._cursor()
+        if limit:
+            cursor.execute(f"SET memory_limit = {quote_literal(limit)}")
+        else:
+            cursor.execute("RESET memory_limit")
+
     def get_table_schema(self, table_name: str) -> List[tuple]:
         """
         get schema information for a table
@@ -90,7 +997,7 @@ class DuckDBManager:
         returns:
             list of (column_name, column_type) tuples
         """
-        result = self.conn.execute(f"DESCRIBE {table_name}").fetchall()
+        result = self._cursor().execute(f"DESCRIBE {quote_identifier(table_name)}").fetchall()
         return [(row[0], row[1]) for row in result]
     
     def get_table_stats(self, table_name: str) -> Dict[str, Any]:
@@ -102,7 +1009,7 @@ class DuckDBManager:
         returns:
             dictionary with row count and column count
         """
-        row_count = self.conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        row_count = self._cursor().execute(f"SELECT COUNT(*) FROM {quote_identifier(table_name)}").fetchone()[0]
         schema = self.get_table_schema(table_name)
 
         return {
@@ -111,32 +1018,261 @@ class DuckDBManager:
             "columns": schema
         }
 
+    def profile_table(self, table_name: str, cursor: Optional[duckdb.DuckDBPyConnection] = None) -> Dict[str, Any]:
+        """
+        approximate per-column profile of a table or view
+
+        profiles are cached per source version, so reopening one is instant until
+        the source's data changes
+
+        args:
+            table_name: name of the table
+            cursor: cursor to run on (the calling thread's if None)
+        returns:
+            profile dict from profiler.profile_relation
+        """
+        with self._lock:
+            version = self.source_versions.get(table_name, 0)
+            cached = self._profiles.get(table_name)
+            info = self.sources.get(table_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        #views over local parquet files can answer counts and bounds from the footers
+        parquet_files = None
+        if info is not None and info["mode"] == "view" and info["format"] == "parquet":
+            parquet_files = list(file_states(info["path"])) or None
+
+        profile = profile_relation(cursor or self._cursor(), table_name, parquet_files)
+        with self._lock:
+            self._profiles[table_name] = (version, profile)
+        return profile
+
+    def inspect_parquet(self, path: str, cursor: Optional[duckdb.DuckDBPyConnection] = None) -> Dict[str, Any]:
+        """
+        read the footers of a parquet file, folder or glob without loading it
+
+        args:
+            path: parquet file path, folder or glob pattern
+            cursor: cursor to run on (the calling thread's if None)
+        returns:
+            footer summary dict from parquet_inspector.inspect_parquet
+        """
+        files = [f for f in expand_source(path) if detect_format(f) == "parquet"]
+        if not files:
+            raise ValueError(f"No Parquet files found at {path}")
+        return inspect_parquet(cursor or self._cursor(), files)
+
+    def chart_data(self, spec: Dict[str, Any], cursor: Optional[duckdb.DuckDBPyConnection] = None) -> Dict[str, Any]:
+        """
+        aggregate the points of a dashboard chart inside duckdb
+
+        args:
+            spec: chart spec, see aggregations.run_chart
+            cursor: cursor to run on (the calling thread's if None)
+        returns:
+            dict with x and y lists
+        """
+        cursor = cursor or self._cursor()
+        bounds = self._chart_bounds(cursor, spec["source"], bounds_columns(spec))
+        return run_chart(cursor, spec, bounds)
+
+    def chart_batch(self, specs: List[Dict[str, Any]], cursor: Optional[duckdb.DuckDBPyConnection] = None) -> List[Any]:
+        """
+        aggregate several dashboard charts over one source
+
+        the bounds of every chart come from one shared query. views over row formats
+        like csv up to SHARED_SCAN_MAX_BYTES then feed all charts from a single
+        scan held in memory, other sources run one column-pruned query per chart
+        that streams over the source. one broken chart can't blank the others
+
+        args:
+            specs: chart specs that all read the same source
+            cursor: cursor to run on (the calling thread's if None)
+        returns:
+            plot data per spec, in order, or the exception that chart failed with
+        """
+        cursor = cursor or self._cursor()
+        source = specs[0]["source"]
+        columns = [col for spec in specs for col in bounds_columns(spec)]
+        bounds = self._chart_bounds(cursor, source, columns)
+
+        with self._lock:
+            info = self.sources.get(source)
+        if info is not None and info["mode"] == "view" and info["format"] in SHARED_SCAN_FORMATS \
+                and info["size"] is not None and info["size"] <= SHARED_SCAN_MAX_BYTES:
+            try:
+                return run_charts(cursor, source, specs, bounds)
+            except duckdb.Error:
+                pass  # retry chart by chart below, so the error lands on the chart that caused it
+
+        results = []
+        for spec in specs:
+            try:
+                results.append(run_chart(cursor, spec, bounds))
+            except (duckdb.Error, ValueError) as e:
+                results.append(e)
+        return results
+
+    def _chart_bounds(self, cursor: duckdb.DuckDBPyConnection, table_name: str, columns: List[str]) -> Dict[str, tuple]:
+        """
+        min/max of chart columns, cached per source version
+
+        args:
+            cursor: cursor to run on
+            table_name: source the charts read
+            columns: columns to bound
+        returns:
+            dict of column -> (min, max)
+        """
+        with self._lock:
+            version = self.source_versions.get(table_name, 0)
+            cached = {col: self._bounds.get((table_name, col)) for col in columns}
+        bounds = {col: entry[1] for col, entry in cached.items() if entry is not None and entry[0] == version}
+
+        missing = [col for col in columns if col not in bounds]
+        if missing:
+            fetched = fetch_bounds(cursor, table_name, missing)
+            bounds.update(fetched)
+            with self._lock:
+                for col, value in fetched.items():
+                    self._bounds[(table_name, col)] = (version, value)
+        return bounds
+
     def list_tables(self) -> List[str]:
         """
         list all available tables/views
         returns:
             list of table names
         """
-        return list(self.loaded_tables.keys())
+        with self._lock:
+            return list(self.loaded_tables.keys())
     
-    def export_result(self, query:str, output_path: str, format: str = "csv"):
+    def cursor(self, profiling: bool = False) -> duckdb.DuckDBPyConnection:
+        """
+        create an independent cursor on the database
+
+        progress tracking is enabled so another thread can poll query_progress()
+
+        args:
+            profiling: also collect a query profile, read back with get_profiling_information()
+        returns:
+            new cursor, the caller is responsible for closing it
+        """
+        cursor = self._new_cursor()
+        cursor.execute("SET enable_progress_bar = true")
+        cursor.execute("SET enable_progress_bar_print = false")
+        if profiling:
+            cursor.execute("PRAGMA enable_profiling = 'no_output'")
+        return cursor
+
+    def export_result(self, query:str, output_path: str, format: str = "csv",
+                      compression: Optional[str] = None, row_group_size: Optional[int] = None,
+                      partition_by: Optional[List[str]] = None,
+                      cursor: Optional[duckdb.DuckDBPyConnection] = None,
+                      table: Optional["pa.Table"] = None):
         """
         execute query and export results to a file
 
+        the query is re-run inside COPY so rows stream straight from the engine
+        to disk without passing through python. a result that was already fetched
+        in full is passed as table instead, and copied from its arrow buffers.
+        duckdb has no arrow COPY format, arrow ipc files are written batch by
+        batch with pyarrow
+
         args:
             query: sql query to execute
-            output_path: path to output file
+            output_path: path to output file, or a directory when partition_by is set
             format: output format('csv', 'parquet', 'arrow')
+            compression: codec name, e.g. 'gzip' or 'zstd' (None for the format default)
+            row_group_size: rows per parquet row group (None for the default)
+            partition_by: columns to hive-partition the output by
+            cursor: cursor to run the export on, lets the caller poll progress or interrupt
+            table: the query's complete result, exported without running the query again
+        raises:
+            ValueError: for an unknown format, or a partitioned arrow export
         """
+        if format == "arrow":
+            if partition_by:
+                raise ValueError("Arrow exports can't be partitioned, choose CSV or Parquet")
+            cursor = cursor or self._cursor()
+            with tracer.span("export", "export", format=format, path=output_path, rerun=table is None):
+                self._export_arrow(query, output_path, cursor, table)
+            return
+
         if format == "csv":
-            self.conn.execute(f"COPY ({query}) TO '{output_path}' (HEADER, DELIMITER ',')")
+            options = ["FORMAT CSV", "HEADER", "DELIMITER ','"]
         elif format == "parquet":
-            self.conn.execute(f"COPY ({query}) TO '{output_path}' (FORMAT PARQUET)")
-        elif format == "arrow":
-            self.conn.execute(f"COPY ({query}) TO '{output_path}' (FORMAT ARROW)")
+            options = ["FORMAT PARQUET"]
+            if row_group_size:
+                options.append(f"ROW_GROUP_SIZE {int(row_group_size)}")
         else:
             raise ValueError(f"Unsupported export format: {format}")
+
+        if compression:
+            options.append(f"COMPRESSION {quote_literal(compression)}")
+        if partition_by:
+            columns = ", ".join(quote_identifier(col) for col in partition_by)
+            options.append(f"PARTITION_BY ({columns})")
+            options.append("OVERWRITE_OR_IGNORE")
+
+        cursor = cursor or self._cursor()
+        query = query.strip().rstrip(";")
+        if table is not None:
+            cursor.register(EXPORT_RELATION, table)
+            query = f"SELECT * FROM {EXPORT_RELATION}"
+        copy = f"COPY ({query}) TO {quote_literal(output_path)} ({', '.join(options)})"
+        try:
+            with tracer.span("export", "export", format=format, path=output_path, rerun=table is None):
+                cursor.execute(copy)
+        finally:
+            if table is not None:
+                cursor.unregister(EXPORT_RELATION)
+
+    def _export_arrow(self, query: str, output_path: str, cursor: duckdb.DuckDBPyConnection,
+                      table: Optional["pa.Table"] = None):
+        """stream a query's result (or a complete table) into an arrow ipc file"""
+        import pyarrow as pa
+
+        if table is not None:
+            reader = table.to_reader(max_chunksize=ARROW_EXPORT_BATCH_ROWS)
+        else:
+            reader = cursor.execute(query.strip().rstrip(";")).to_arrow_reader(ARROW_EXPORT_BATCH_ROWS)
+        try:
+            with pa.OSFile(output_path, "wb") as sink, pa.ipc.new_file(sink, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+        except BaseException:
+            #an interrupted export would leave a file without its footer
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+
+    def memory_usage(self) -> int:
+        """
+        memory held by the engine's buffer manager, spilled temporary files excluded
+
+        called by the tracer from whichever thread records a span, so it reads
+        through the shared connection rather than giving that thread a cursor
+
+        returns:
+            bytes in use across duckdb's memory tags
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT sum(memory_usage_bytes) FROM duckdb_memory()").fetchone()
+        return int(row[0] or 0)
         
     def close(self):
-        """close the database connection"""
-        self.conn.close()
\ No newline at end of file
+        """stop the worker pool and close the database connection"""
+        if tracer.memory_probe == self.memory_usage:
+            tracer.memory_probe = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._close_retired_cursors()
+        with self._lock:
+            for cursor in self._thread_cursors:
+                cursor.interrupt()
+                cursor.close()
+            self._thread_cursors.clear()
+        self.conn.close()
+        #queries on remote views add blocks too, trim what the session left behind
+        self._prune_block_cache()
\ No newline at end of file
@@ -0,0 +1,74 @@
+from typing import Any, Dict, List
+
+import duckdb
+
+from src.database.profiler import parquet_footer_stats
+from src.utils.sql import quote_literal
+
+def _rows(cursor: duckdb.DuckDBPyConnection, query: str) -> List[Dict[str, Any]]:
+    """run a query and return its rows as dicts, so columns missing in older duckdb versions are just absent"""
+    result = cursor.execute(query)
+    names = [desc[0] for desc in result.description]
+    return [dict(zip(names, row)) for row in result.fetchall()]
+
+def inspect_parquet(cursor: duckdb.DuckDBPyConnection, files: List[str]) -> Dict[str, Any]:
+    """
+    describe parquet files from their footers, without reading any data pages
+
+    args:
+        cursor: cursor to run on
+        files: parquet file paths
+    returns:
+        dict with
+            files: per-file totals (rows, row groups, writer, size, footer size)
+            schema: the parquet schema tree, one dict per element
+            row_groups: per row group rows and compressed/uncompressed bytes
+            columns: per column type, codecs, encodings, sizes, nulls and min/max
+    """
+    file_list = "[" + ", ".join(quote_literal(path) for path in files) + "]"
+
+    file_rows = _rows(cursor, f"SELECT * FROM parquet_file_metadata({file_list}) ORDER BY file_name")
+    schema = _rows(cursor, f"SELECT * FROM parquet_schema({file_list}) WHERE file_name = {quote_literal(files[0])}")
+
+    row_groups = _rows(cursor, f"""
+        SELECT
+            file_name,
+            row_group_id,
+            any_value(row_group_num_rows) AS num_rows,
+            sum(total_compressed_size) AS compressed_bytes,
+            sum(total_uncompressed_size) AS uncompressed_bytes
+        FROM parquet_metadata({file_list})
+        GROUP BY file_name, row_group_id
+        ORDER BY file_name, row_group_id
+    """)
+
+    columns = _rows(cursor, f"""
+        SELECT
+            path_in_schema AS name,
+            any_value(type) AS physical_type,
+            string_agg(DISTINCT compression, ', ') AS compression,
+            string_agg(DISTINCT encodings, ', ') AS encodings,
+            sum(total_compressed_size) AS compressed_bytes,
+            sum(total_uncompressed_size) AS uncompressed_bytes,
+            min(column_id) AS column_id
+        FROM parquet_metadata({file_list})
+        GROUP BY path_in_schema
+        ORDER BY column_id
+    """)
+
+    #min/max cast back to the column type so they combine correctly across row groups
+    described = cursor.execute(f"DESCRIBE SELECT * FROM read_parquet({file_list}, union_by_name = true)").fetchall()
+    footer = parquet_footer_stats(cursor, files, [(row[0], row[1]) for row in described])
+    stats = footer["columns"] if footer is not None else {}
+    for column in columns:
+        column_stats = stats.get(column["name"], {})
+        column["nulls"] = column_stats.get("nulls")
+        column["min"] = column_stats.get("min")
+        column["max"] = column_stats.get("max")
+
+    return {
+        "files": file_rows,
+        "schema": schema,
+        "row_groups": row_groups,
+        "columns": columns,
+    }
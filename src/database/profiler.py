@@ -0,0 +1,164 @@
+import re
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+from src.utils.sql import quote_identifier, quote_literal
+
+SAMPLE_THRESHOLD_ROWS = 10_000_000  # relations larger than this are profiled from a sample
+SAMPLE_TARGET_ROWS = 1_000_000  # rows the sample aims for
+TOP_K = 5  # most frequent values shown per column
+QUANTILES = [0.25, 0.5, 0.75]
+
+NUMERIC_TYPE = re.compile(r"^(U?(TINYINT|SMALLINT|INTEGER|BIGINT|HUGEINT)|FLOAT|DOUBLE|REAL|DECIMAL.*)$")
+TEMPORAL_TYPE = re.compile(r"^(DATE|TIME|TIMESTAMP.*)$")
+NESTED_TYPE = re.compile(r"(\[\d*\]$|^(STRUCT|MAP|UNION)\b)")
+
+def profile_relation(cursor: duckdb.DuckDBPyConnection, relation: str,
+                     parquet_files: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    profile every column of a table or view in one aggregate pass
+
+    computes non-null counts, approximate distinct counts (hyperloglog), min/max,
+    approximate quartiles and approximate top-k values. relations above
+    SAMPLE_THRESHOLD_ROWS are profiled from a TABLESAMPLE, and for views over
+    parquet files the row count, null counts and min/max come from the footers
+
+    args:
+        cursor: cursor to run the profile on
+        relation: table or view name
+        parquet_files: files behind a parquet view, enables footer statistics
+    returns:
+        dict with row_count, sampled, sample_rows and columns, a list of per-column
+        dicts with name, type, nulls, null_fraction, distinct, min, max,
+        quantiles, top_k and exact_bounds
+    """
+    schema = [(row[0], row[1]) for row in cursor.execute(f"DESCRIBE {quote_identifier(relation)}").fetchall()]
+    footer = parquet_footer_stats(cursor, parquet_files, schema) if parquet_files else None
+
+    #a cheap row count decides whether to sample, tables keep it in their metadata
+    if footer is not None:
+        row_count = footer["row_count"]
+    elif parquet_files is None and _is_table(cursor, relation):
+        row_count = cursor.execute(f"SELECT COUNT(*) FROM {quote_identifier(relation)}").fetchone()[0]
+    else:
+        row_count = None
+
+    sampled = row_count is not None and row_count > SAMPLE_THRESHOLD_ROWS
+    source = quote_identifier(relation)
+    if sampled:
+        percent = max(0.01, 100.0 * SAMPLE_TARGET_ROWS / row_count)
+        source = f"{source} TABLESAMPLE {percent:.4f}%"
+
+    #one select with a fixed group of aggregates per column
+    exprs = ["count(*)"]
+    for name, col_type in schema:
+        col = quote_identifier(name)
+        nested = bool(NESTED_TYPE.search(col_type))
+        ordered = NUMERIC_TYPE.match(col_type) or TEMPORAL_TYPE.match(col_type)
+        exprs += [
+            f"count({col})",
+            f"approx_count_distinct({col})",
+            "NULL" if nested else f"min({col})::VARCHAR",
+            "NULL" if nested else f"max({col})::VARCHAR",
+            f"approx_quantile({col}, {QUANTILES})::VARCHAR[]" if ordered else "NULL",
+            "NULL" if nested else f"approx_top_k({col}, {TOP_K})::VARCHAR[]",
+        ]
+    row = cursor.execute(f"SELECT {', '.join(exprs)} FROM {source}").fetchone()
+
+    sample_rows = row[0]
+    if row_count is None:
+        row_count = sample_rows
+    scale = row_count / sample_rows if sample_rows else 0
+
+    columns = []
+    for i, (name, col_type) in enumerate(schema):
+        non_null, distinct, min_value, max_value, quantiles, top_k = row[1 + i * 6: 7 + i * 6]
+        #hyperloglog can overshoot on small or low-cardinality columns, there can't be more values than rows
+        distinct = min(distinct, non_null)
+        nulls = round((sample_rows - non_null) * scale)
+        exact_bounds = False
+        stats = footer["columns"].get(name) if footer is not None else None
+        if stats is not None:
+            #footer statistics are exact, they win over the sample
+            nulls = stats["nulls"] if stats["nulls"] is not None else nulls
+            if stats["min"] is not None:
+                min_value, max_value, exact_bounds = stats["min"], stats["max"], True
+        columns.append({
+            "name": name,
+            "type": col_type,
+            "nulls": nulls,
+            "null_fraction": nulls / row_count if row_count else 0.0,
+            "distinct": distinct,
+            "min": min_value,
+            "max": max_value,
+            "quantiles": quantiles,
+            "top_k": top_k,
+            "exact_bounds": exact_bounds,
+        })
+
+    return {
+        "row_count": row_count,
+        "sampled": sampled,
+        "sample_rows": sample_rows,
+        "columns": columns,
+    }
+
+def _is_table(cursor: duckdb.DuckDBPyConnection, relation: str) -> bool:
+    """whether a relation is a base table, views may need a full scan to count"""
+    row = cursor.execute(
+        "SELECT table_type FROM information_schema.tables WHERE lower(table_name) = lower(?) AND table_schema = 'main'",
+        [relation]
+    ).fetchone()
+    return row is not None and row[0] == "BASE TABLE"
+
+def parquet_footer_stats(cursor: duckdb.DuckDBPyConnection, files: List[str],
+                         schema: List[tuple]) -> Optional[Dict[str, Any]]:
+    """
+    row count and per-column null counts and min/max from parquet footers
+
+    only the metadata at the end of each file is read. min/max are cast back to
+    the column type before combining row groups, so numbers don't compare as text
+
+    returns:
+        dict with row_count and columns (name -> {nulls, min, max}), or None if
+        the footers can't be read
+    """
+    file_list = "[" + ", ".join(quote_literal(path) for path in files) + "]"
+    names = [(name, col_type) for name, col_type in schema if not NESTED_TYPE.search(col_type)]
+
+    #one pass over the metadata with a group of filtered aggregates per column
+    exprs = []
+    for name, col_type in names:
+        where = f"FILTER (WHERE path_in_schema = {quote_literal(name)})"
+        exprs += [
+            f"count(*) {where}",
+            f"count(stats_null_count) {where}",
+            f"sum(stats_null_count) {where}",
+            f"count(stats_min_value) {where}",
+            f"min(TRY_CAST(stats_min_value AS {col_type})) {where}::VARCHAR",
+            f"max(TRY_CAST(stats_max_value AS {col_type})) {where}::VARCHAR",
+        ]
+    try:
+        row_count = cursor.execute(
+            f"SELECT sum(num_rows) FROM parquet_file_metadata({file_list})"
+        ).fetchone()[0]
+        row = cursor.execute(
+            f"SELECT {', '.join(exprs)} FROM parquet_metadata({file_list})"
+        ).fetchone() if exprs else ()
+    except duckdb.Error:
+        return None
+
+    columns = {}
+    for i, (name, _) in enumerate(names):
+        chunks, null_counts, nulls, min_counts, min_value, max_value = row[i * 6: i * 6 + 6]
+        #columns missing from the footers (e.g. hive partition keys) fall back to the scan
+        if not chunks:
+            continue
+        bounds = min_counts == chunks and min_value is not None
+        columns[name] = {
+            "nulls": nulls if null_counts == chunks else None,
+            "min": min_value if bounds else None,
+            "max": max_value if bounds else None,
+        }
+    return {"row_count": row_count or 0, "columns": columns}
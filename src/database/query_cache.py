@@ -0,0 +1,217 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Set, Tuple
+
+import duckdb
+
+if TYPE_CHECKING:
+    #only for annotations, pyarrow is loaded by duckdb once a result is fetched
+    import pyarrow as pa
+
+DEFAULT_CACHE_BYTES = 512 * 1024 ** 2  # arrow bytes kept across all cached results
+#sql value keywords that read the clock, parsed as column references rather than function calls
+TIME_KEYWORDS = {"current_date", "current_time", "current_timestamp", "localtime", "localtimestamp"}
+
+def normalize_sql(query: str) -> str:
+    """
+    normalize sql text for use as a cache key
+
+    collapses whitespace, lowercases, and drops comments and trailing semicolons
+    outside of string literals and quoted identifiers, so formatting-only edits still hit
+
+    args:
+        query: sql query string
+    returns:
+        normalized query text
+    """
+    out = []
+    i = 0
+    quote = None
+    pending_space = False
+    while i < len(query):
+        ch = query[i]
+        if quote:
+            out.append(ch)
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            if pending_space and out:
+                out.append(" ")
+            pending_space = False
+            quote = ch
+            out.append(ch)
+        elif query.startswith("--", i):
+            #line comment
+            end = query.find("\n", i)
+            i = len(query) if end == -1 else end
+            pending_space = True
+            continue
+        elif query.startswith("/*", i):
+            end = query.find("*/", i + 2)
+            i = len(query) if end == -1 else end + 2
+            pending_space = True
+            continue
+        elif ch.isspace():
+            pending_space = True
+        else:
+            if pending_space and out:
+                out.append(" ")
+            pending_space = False
+            #unquoted keywords and identifiers are case-insensitive
+            out.append(ch.lower())
+        i += 1
+    return "".join(out).rstrip(";").rstrip()
+
+def deterministic_functions(cursor: duckdb.DuckDBPyConnection) -> Set[str]:
+    """
+    names of the functions whose result depends only on their arguments
+
+    scalar and aggregate functions duckdb marks as consistent, and its built-in
+    macros. functions such as random() and now() are left out, and so are user
+    macros and table functions, which can read anything
+
+    args:
+        cursor: cursor on the database whose functions to list
+    returns:
+        lowercase function names
+    """
+    rows = cursor.execute("""
+        SELECT function_name FROM duckdb_functions()
+        WHERE stability = 'CONSISTENT' OR (function_type = 'macro' AND internal)
+        EXCEPT
+        SELECT function_name FROM duckdb_functions()
+        WHERE stability IN ('VOLATILE', 'CONSISTENT_WITHIN_QUERY')
+    """).fetchall()
+    return {name.lower() for (name,) in rows}
+
+def is_deterministic(query: str, cursor: duckdb.DuckDBPyConnection, functions: Set[str]) -> bool:
+    """
+    whether a query returns the same rows as long as the tables it reads are unchanged
+
+    walks the parsed query for calls outside functions (see deterministic_functions),
+    table functions such as read_csv() or range(), whose files the cache doesn't
+    track, and time keywords like current_timestamp
+
+    args:
+        query: sql query string
+        cursor: cursor used to parse the query
+        functions: names from deterministic_functions
+    returns:
+        False as well if the query can't be parsed as a select
+    """
+    try:
+        tree = json.loads(cursor.execute("SELECT json_serialize_sql(?)", [query]).fetchone()[0])
+    except duckdb.Error:
+        return False
+    if tree.get("error"):
+        return False
+
+    nodes = [tree["statements"]]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, list):
+            nodes.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        if node.get("type") == "TABLE_FUNCTION":
+            return False
+        if node.get("class") in ("FUNCTION", "WINDOW") and node["function_name"].lower() not in functions:
+            return False
+        if node.get("class") == "COLUMN_REF" and len(node["column_names"]) == 1 \
+                and node["column_names"][0].lower() in TIME_KEYWORDS:
+            return False
+        nodes.extend(node.values())
+    return True
+
+class QueryCache:
+    """
+    lru cache of complete query results as arrow tables
+
+    entries are keyed on normalized sql plus the version of every source the
+    query reads, so a reloaded source can never serve stale rows. queries whose
+    rows change without their sources changing (see is_deterministic) are not cached
+    """
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        init the cache
+
+        args:
+            max_bytes: memory budget for cached arrow data, 0 disables caching
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()  # key -> (table, source names)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: str, versions: Dict[str, int]) -> Tuple:
+        """
+        build the cache key for a query
+
+        args:
+            query: sql query string
+            versions: version of every source the query reads
+        returns:
+            hashable cache key
+        """
+        return (normalize_sql(query), tuple(sorted(versions.items())))
+
+    def get(self, key: Tuple) -> Optional["pa.Table"]:
+        """
+        look up a cached result, marking it as recently used
+
+        returns:
+            cached arrow table, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, table: "pa.Table", sources: Iterable[str]):
+        """
+        store a complete result, evicting least recently used entries over budget
+
+        args:
+            key: key from make_key
+            table: the full result
+            sources: names of the sources the query reads, for invalidation
+        """
+        size = table.nbytes
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[0].nbytes
+            self._entries[key] = (table, {name.lower() for name in sources})
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def invalidate(self, source: str):
+        """
+        drop every cached result that reads a source
+
+        args:
+            source: name of a loaded source whose data changed
+        """
+        source = source.lower()
+        with self._lock:
+            for key in [key for key, (_, sources) in self._entries.items() if source in sources]:
+                self.current_bytes -= self._entries.pop(key)[0].nbytes
+
+    def clear(self):
+        """drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
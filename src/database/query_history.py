@@ -0,0 +1,142 @@
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+class QueryHistory:
+    """
+    persistent query history with execution statistics
+
+    stored in a small sqlite file next to the app settings, with an fts5 index
+    over the sql text when sqlite was built with it
+    """
+    def __init__(self, path: str):
+        """
+        open (or create) the history store
+
+        args:
+            path: sqlite file path, ':memory:' for a throwaway history
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY,
+                query TEXT NOT NULL,
+                executed_at REAL NOT NULL,   -- unix timestamp
+                execution_time REAL,         -- seconds
+                row_count INTEGER,
+                bytes_scanned INTEGER
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS history_time ON history (execution_time)")
+
+        #full-text index kept in sync by a trigger, LIKE is the fallback without fts5
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(query, content='history', content_rowid='id')"
+            )
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+                    INSERT INTO history_fts (rowid, query) VALUES (new.id, new.query);
+                END
+            """)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self.conn.commit()
+
+    def add(self, query: str, execution_time: float, row_count: Optional[int] = None,
+            bytes_scanned: Optional[int] = None) -> int:
+        """
+        record an executed query
+
+        args:
+            query: sql text
+            execution_time: seconds until the first page was available
+            row_count: total rows, if already known
+            bytes_scanned: bytes read from storage, if the engine reported it
+        returns:
+            id of the new entry
+        """
+        cursor = self.conn.execute(
+            "INSERT INTO history (query, executed_at, execution_time, row_count, bytes_scanned) VALUES (?, ?, ?, ?, ?)",
+            (query, time.time(), execution_time, row_count, bytes_scanned)
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def update_row_count(self, entry_id: int, row_count: int):
+        """fill in a row count that arrived after the entry was recorded"""
+        self.conn.execute("UPDATE history SET row_count = ? WHERE id = ?", (row_count, entry_id))
+        self.conn.commit()
+
+    def recent(self, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        newest entries first
+
+        args:
+            limit: page size
+            offset: entries to skip
+        returns:
+            list of entry dicts
+        """
+        rows = self.conn.execute(
+            "SELECT * FROM history ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def slowest(self, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        slowest entries first
+
+        args:
+            limit: page size
+            offset: entries to skip
+        returns:
+            list of entry dicts
+        """
+        rows = self.conn.execute(
+            "SELECT * FROM history ORDER BY execution_time DESC LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, text: str, limit: int, offset: int = 0, slowest: bool = False) -> List[Dict[str, Any]]:
+        """
+        full-text search over the sql of past queries
+
+        every word must match, as a prefix
+
+        args:
+            text: search words
+            limit: page size
+            offset: entries to skip
+            slowest: order by execution time instead of newest first
+        returns:
+            list of entry dicts
+        """
+        words = text.split()
+        if not words:
+            return self.slowest(limit, offset) if slowest else self.recent(limit, offset)
+        order = "history.execution_time DESC" if slowest else "history.id DESC"
+
+        if self.has_fts:
+            match = " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+            rows = self.conn.execute(
+                "SELECT history.* FROM history_fts JOIN history ON history.id = history_fts.rowid "
+                f"WHERE history_fts MATCH ? ORDER BY {order} LIMIT ? OFFSET ?",
+                (match, limit, offset)
+            ).fetchall()
+        else:
+            conditions = " AND ".join("query LIKE ?" for _ in words)
+            rows = self.conn.execute(
+                f"SELECT * FROM history WHERE {conditions} ORDER BY {order} LIMIT ? OFFSET ?",
+                (*[f"%{word}%" for word in words], limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        """close the history store"""
+        self.conn.close()
@@ -0,0 +1,62 @@
+from typing import Any, Dict, List
+
+#wrapper operators added by EXPLAIN ANALYZE itself, not part of the query's plan
+WRAPPER_OPERATORS = ("EXPLAIN_ANALYZE", "QUERY")
+
+def operator_tree(profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    turn duckdb's json profile into a tree of operator dicts
+
+    each node has name, timing (seconds), cardinality, output_bytes, share (of the
+    total operator time), details (duckdb's extra_info) and children
+
+    args:
+        profile: parsed json from EXPLAIN (ANALYZE, FORMAT JSON) or get_profiling_information()
+    returns:
+        root operators of the query plan
+    """
+    roots = _unwrap(profile.get("children", []))
+    nodes = [_build_node(child) for child in roots]
+    total = sum(_subtree_time(node) for node in nodes) or 1.0
+    for node in _walk(nodes):
+        node["share"] = node["timing"] / total
+    return nodes
+
+def hottest(nodes: List[Dict[str, Any]], count: int = 3) -> List[Dict[str, Any]]:
+    """
+    the operators that took the most time
+
+    args:
+        nodes: roots from operator_tree
+        count: how many to return
+    returns:
+        operator dicts, slowest first
+    """
+    return sorted(_walk(nodes), key=lambda node: node["timing"], reverse=True)[:count]
+
+def _unwrap(children: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """skip the wrapper operators explain analyze puts on top of the plan"""
+    while len(children) == 1 and children[0].get("operator_type") in WRAPPER_OPERATORS:
+        children = children[0].get("children", [])
+    return children
+
+def _build_node(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """convert one profiled operator and its inputs"""
+    return {
+        "name": raw.get("operator_name") or raw.get("operator_type") or "?",
+        "timing": raw.get("operator_timing") or 0.0,
+        "cardinality": raw.get("operator_cardinality") or 0,
+        "output_bytes": raw.get("result_set_size") or 0,
+        "details": raw.get("extra_info") or {},
+        "children": [_build_node(child) for child in raw.get("children", [])],
+    }
+
+def _subtree_time(node: Dict[str, Any]) -> float:
+    """time spent in an operator and everything below it"""
+    return node["timing"] + sum(_subtree_time(child) for child in node["children"])
+
+def _walk(nodes: List[Dict[str, Any]]):
+    """every operator in the tree, depth first"""
+    for node in nodes:
+        yield node
+        yield from _walk(node["children"])
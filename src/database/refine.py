@@ -0,0 +1,72 @@
+from typing import Dict, Optional, Tuple
+
+import duckdb
+
+from src.database.result_set import ROW_QUERY_PREFIXES
+from src.utils.sql import quote_identifier, quote_literal
+
+#longest first, so '>=' isn't read as '>' followed by '=...'
+FILTER_OPERATORS = (">=", "<=", "!=", "<>", ">", "<", "=")
+NULL_FILTERS = {"null": "IS NULL", "!null": "IS NOT NULL"}
+REFINED_ALIAS = "refined"
+
+def can_refine(query: str) -> bool:
+    """whether a query's results can be sorted and filtered by wrapping it in a subquery"""
+    if not query.lstrip().lower().startswith(ROW_QUERY_PREFIXES):
+        return False
+    try:
+        return len(duckdb.extract_statements(query)) == 1
+    except duckdb.Error:
+        return False
+
+def filter_condition(column: str, text: str) -> str:
+    """
+    sql condition for a results filter box
+
+    args:
+        column: column the box filters
+        text: '>= 10', '= north', '< 2024-03-01' etc compare against the value
+            (duckdb casts it to the column's type), 'null' and '!null' test for
+            nulls, anything else keeps rows whose text contains it, ignoring case
+    returns:
+        condition for a WHERE clause
+    """
+    col = quote_identifier(column)
+    text = text.strip()
+    if text.lower() in NULL_FILTERS:
+        return f"{col} {NULL_FILTERS[text.lower()]}"
+    for op in FILTER_OPERATORS:
+        if text.startswith(op):
+            return f"{col} {op} {quote_literal(text[len(op):].strip())}"
+    return f"contains(lower(CAST({col} AS VARCHAR)), {quote_literal(text.lower())})"
+
+def refine_query(query: str, filters: Dict[str, str], sort: Optional[Tuple[str, bool]] = None) -> str:
+    """
+    wrap a query so the engine filters and sorts its whole result
+
+    the wrapped query streams like any other, so a sort or filter of a huge
+    result costs one engine query and only the pages the grid shows are fetched
+
+    args:
+        query: the query whose results are shown
+        filters: column -> filter box text, see filter_condition
+        sort: (column, descending) or None to keep the query's own order
+    returns:
+        the wrapped query, or query itself with nothing to apply
+    raises:
+        ValueError: if the query can't be wrapped (see can_refine)
+    """
+    conditions = [filter_condition(col, text) for col, text in filters.items() if text.strip()]
+    if not conditions and sort is None:
+        return query
+    if not can_refine(query):
+        raise ValueError("Only the results of a single SELECT query can be sorted or filtered")
+
+    #the newline keeps a trailing -- comment from swallowing the closing parenthesis
+    refined = f"SELECT * FROM (\n{query.strip().rstrip(';')}\n) AS {REFINED_ALIAS}"
+    if conditions:
+        refined += " WHERE " + " AND ".join(conditions)
+    if sort is not None:
+        column, descending = sort
+        refined += f" ORDER BY {quote_identifier(column)} {'DESC' if descending else 'ASC'}"
+    return refined
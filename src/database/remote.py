@@ -0,0 +1,147 @@
+import logging
+import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import duckdb
+
+from src.utils.sql import quote_literal
+
+logger = logging.getLogger(__name__)
+
+#schemes duckdb's httpfs extension reads, over http range requests
+REMOTE_PREFIXES = ("http://", "https://", "s3://", "s3a://", "s3n://", "gs://", "gcs://", "r2://", "hf://")
+#object stores list glob patterns, plain http servers can't
+GLOB_PREFIXES = ("s3://", "s3a://", "s3n://", "gs://", "gcs://", "r2://", "hf://")
+
+DEFAULT_BLOCK_CACHE_BYTES = 4 * 1024 ** 3  # disk budget of the remote block cache
+S3_SECRET = "duckboard_s3"
+
+def is_remote(source) -> bool:
+    """whether a source is a url read through httpfs"""
+    return isinstance(source, str) and source.lower().startswith(REMOTE_PREFIXES)
+
+def remote_path(url: str) -> str:
+    """path part of a url, without the query string that signed urls carry"""
+    return urlsplit(url).path
+
+def is_remote_glob(url: str) -> bool:
+    """whether a url is a glob over an object store, e.g. s3://bucket/year=*/*.parquet"""
+    return url.lower().startswith(GLOB_PREFIXES) and any(ch in remote_path(url) for ch in "*?[")
+
+def default_block_cache_dir() -> str:
+    """per-user folder for cached remote blocks, shared by the gui and the cli"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "duckboard", "remote")
+
+def enable_remote(cursor: duckdb.DuckDBPyConnection, cache_dir: str, disk_cache: bool = False) -> str:
+    """
+    load httpfs and turn on block caching of remote files, once per database
+
+    blocks read by range requests are kept in memory for the session by
+    duckdb's external file cache. opting in to disk_cache uses the cache_httpfs
+    community extension instead, which keeps them on disk so later sessions
+    re-read them locally, but is third-party code downloaded on first use.
+    parquet footers and http metadata are cached either way
+
+    args:
+        cursor: cursor on the database to configure
+        cache_dir: folder for the on-disk block cache
+        disk_cache: install and use cache_httpfs
+    returns:
+        'disk' or 'memory', where blocks are cached
+    """
+    _load_extension(cursor, "httpfs")
+    cursor.execute("SET GLOBAL parquet_metadata_cache = true")
+    cursor.execute("SET GLOBAL enable_http_metadata_cache = true")
+    _create_s3_secret(cursor, os.environ)
+
+    if disk_cache:
+        try:
+            _load_extension(cursor, "cache_httpfs", "community")
+            os.makedirs(cache_dir, exist_ok=True)
+            cursor.execute("SET GLOBAL cache_httpfs_type = 'on_disk'")
+            cursor.execute(f"SET GLOBAL cache_httpfs_cache_directory = {quote_literal(cache_dir)}")
+            return "disk"
+        except (duckdb.Error, OSError) as e:
+            logger.warning("on-disk block cache unavailable, cache_httpfs could not be loaded: %s", e)
+    else:
+        logger.info("on-disk block cache not enabled, remote blocks are cached in memory for this session")
+    cursor.execute("SET GLOBAL enable_external_file_cache = true")
+    return "memory"
+
+def _load_extension(cursor: duckdb.DuckDBPyConnection, name: str, repository: Optional[str] = None):
+    """load an extension, installing it the first time"""
+    try:
+        cursor.execute(f"LOAD {name}")
+    except duckdb.Error:
+        cursor.execute(f"INSTALL {name}" + (f" FROM {repository}" if repository else ""))
+        cursor.execute(f"LOAD {name}")
+
+def _create_s3_secret(cursor: duckdb.DuckDBPyConnection, env: Dict[str, str]):
+    """
+    s3 credentials from the standard aws environment variables
+
+    AWS_ENDPOINT_URL points s3:// urls at another store (minio, r2, a local
+    stand-in), which usually also wants path style urls
+    """
+    options = []
+    for key, var in (("KEY_ID", "AWS_ACCESS_KEY_ID"), ("SECRET", "AWS_SECRET_ACCESS_KEY"),
+                     ("SESSION_TOKEN", "AWS_SESSION_TOKEN"), ("REGION", "AWS_REGION")):
+        if env.get(var):
+            options.append(f"{key} {quote_literal(env[var])}")
+    endpoint = env.get("AWS_ENDPOINT_URL")
+    if endpoint:
+        parts = urlsplit(endpoint if "://" in endpoint else f"https://{endpoint}")
+        options.append(f"ENDPOINT {quote_literal(parts.netloc)}")
+        options.append(f"USE_SSL {'false' if parts.scheme == 'http' else 'true'}")
+        options.append("URL_STYLE 'path'")
+    if options:
+        cursor.execute(f"CREATE OR REPLACE SECRET {S3_SECRET} (TYPE s3, {', '.join(options)})")
+
+def cache_size(cache_dir: str) -> int:
+    """bytes held by the on-disk block cache"""
+    total = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+def prune_block_cache(cache_dir: str, max_bytes: int) -> int:
+    """
+    evict the least recently used cached blocks until the cache fits its budget
+
+    a block's last use is its access time, or its write time on filesystems
+    mounted without access times. an evicted block is simply fetched again
+
+    args:
+        cache_dir: folder of the on-disk block cache
+        max_bytes: budget to shrink the cache to
+    returns:
+        bytes evicted
+    """
+    blocks = []
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            blocks.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+
+    total = sum(size for _, size, _ in blocks)
+    evicted = 0
+    for _, size, path in sorted(blocks):
+        if total - evicted <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        evicted += size
+    return evicted
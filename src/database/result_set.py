@@ -0,0 +1,244 @@
+import json
+
+import duckdb
+from typing import TYPE_CHECKING, Callable, Optional, List
+
+if TYPE_CHECKING:
+    #imported on first use instead, it is slow to load and startup doesn't need it
+    import polars
+    import pyarrow as pa
+
+#queries that produce rows and can safely be wrapped in a subquery
+ROW_QUERY_PREFIXES = ("select", "with", "from", "values", "table", "(")
+#plan operators a side count can repeat for about the cost of a scan, besides the scans themselves
+STREAMING_OPERATORS = {"PROJECTION", "FILTER", "LIMIT", "STREAMING_LIMIT", "UNION"}
+
+
+class ResultSet:
+    """
+    streaming handle over a query result
+
+    record batches are pulled from the engine on demand, so only the pages a
+    caller actually asks for are ever materialized
+    """
+    DEFAULT_BATCH_SIZE = 2048  # one duckdb vector per batch
+
+    def __init__(self, cursor: duckdb.DuckDBPyConnection, query: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 table: Optional["pa.Table"] = None,
+                 cursor_factory: Optional[Callable[[], duckdb.DuckDBPyConnection]] = None):
+        """
+        wrap an executed cursor
+
+        args:
+            cursor: cursor the query was executed on, owned by the result set
+            query: the sql that produced the result
+            batch_size: rows per fetched record batch
+            table: complete result to serve instead of the cursor's (a cache hit)
+            cursor_factory: makes the side cursor of count_rows, a plain cursor of cursor's if None
+        """
+        self.cursor = cursor
+        self.cursor_factory = cursor_factory or cursor.cursor
+        self.query = query
+        self.batch_size = batch_size
+        self.batches: List["pa.RecordBatch"] = []
+        self.fetched_rows = 0
+        self.total_rows: Optional[int] = None
+        self.from_cache = table is not None
+        #bytes read from storage, known once the stream is done on a profiling cursor
+        self.bytes_scanned: Optional[int] = None
+        #called with the result set once every row has been fetched
+        self.on_exhausted: Optional[Callable[["ResultSet"], None]] = None
+        self._count_cursor = None
+
+        if table is not None:
+            self.columns = list(table.column_names)
+            self._reader = table.to_reader(max_chunksize=batch_size)
+            self.exhausted = False
+            self.total_rows = table.num_rows
+        elif cursor.description:
+            self.columns = [desc[0] for desc in cursor.description]
+            self._reader = cursor.to_arrow_reader(batch_size)
+            self.exhausted = False
+        else:
+            #statement returned no rows (ddl, insert, ...)
+            self.columns = []
+            self._reader = None
+            self.exhausted = True
+            self.total_rows = 0
+
+    @property
+    def returns_rows(self) -> bool:
+        """whether the statement produced a row result"""
+        return bool(self.columns)
+
+    def fetch_next(self) -> Optional["pa.RecordBatch"]:
+        """
+        pull the next record batch from the engine
+
+        returns:
+            the fetched batch, or None once the result is exhausted
+        """
+        if self.exhausted:
+            return None
+
+        try:
+            batch = self._reader.read_next_batch()
+        except StopIteration:
+            self._mark_exhausted()
+            return None
+
+        self.batches.append(batch)
+        self.fetched_rows += batch.num_rows
+
+        #a short batch usually means the end, confirm it so the count is known without a side query
+        if batch.num_rows < self.batch_size:
+            try:
+                extra = self._reader.read_next_batch()
+            except StopIteration:
+                self._mark_exhausted()
+            else:
+                self.batches.append(extra)
+                self.fetched_rows += extra.num_rows
+        return batch
+
+    def read_all(self) -> "pa.Table":
+        """
+        fetch every remaining batch and return the full result as a table
+
+        returns:
+            arrow table with all rows
+        """
+        while self.fetch_next() is not None:
+            pass
+        return self.arrow()
+
+    def is_plain_scan(self) -> bool:
+        """
+        whether the query only scans, filters and projects its sources
+
+        counting such a result again on a side cursor is about as cheap as a
+        scan. joins, aggregations, sorts and windows would be run twice in
+        full, so their total is only known once the stream ends, or when the
+        user asks for a count. plans on a side cursor, call from a worker thread
+        """
+        if not self.query.lstrip().lower().startswith(ROW_QUERY_PREFIXES):
+            return False
+        cursor = self.cursor_factory()
+        try:
+            rows = cursor.execute(f"EXPLAIN (FORMAT JSON) {self.query.strip().rstrip(';')}").fetchall()
+        except duckdb.Error:
+            return False
+        finally:
+            cursor.close()
+
+        nodes = [node for row in rows for node in json.loads(row[1])]
+        while nodes:
+            node = nodes.pop()
+            name = node.get("name", "")
+            if not (name.endswith("_SCAN") or name.startswith("READ_") or name in STREAMING_OPERATORS):
+                return False
+            nodes.extend(node.get("children", []))
+        return True
+
+    def count_rows(self) -> Optional[int]:
+        """
+        count the full result on a side cursor without fetching it
+
+        blocks until the count finishes, call from a worker thread
+        returns:
+            total row count, or None if the statement cannot be counted
+        """
+        if self.total_rows is not None:
+            return self.total_rows
+        if not self.query.lstrip().lower().startswith(ROW_QUERY_PREFIXES):
+            return None
+
+        self._count_cursor = self.cursor_factory()
+        try:
+            query = self.query.strip().rstrip(";")
+            count = self._count_cursor.execute(f"SELECT COUNT(*) FROM ({query})").fetchone()[0]
+        except duckdb.Error:
+            return None
+        finally:
+            self._count_cursor.close()
+            self._count_cursor = None
+
+        #the stream may have finished first, its exact count wins
+        if self.total_rows is None:
+            self.total_rows = count
+        return self.total_rows
+
+    def close(self):
+        """release the cursor and abort a running side count"""
+        if self._count_cursor is not None:
+            try:
+                self._count_cursor.interrupt()
+            except duckdb.Error:
+                pass
+        self.exhausted = True
+        self._reader = None
+        self.cursor.close()
+
+    def _mark_exhausted(self):
+        """record that the stream is done, the fetched count is now exact"""
+        self.exhausted = True
+        self._reader = None
+        self.total_rows = self.fetched_rows
+        if not self.from_cache:
+            self.bytes_scanned = self._profiled_bytes_read()
+        if self.on_exhausted is not None:
+            self.on_exhausted(self)
+
+    def _profiled_bytes_read(self) -> Optional[int]:
+        """bytes read by the finished query, if the cursor had profiling enabled"""
+        try:
+            profile = json.loads(self.cursor.get_profiling_information())
+        except (duckdb.Error, ValueError):
+            return None
+        return profile.get("total_bytes_read")
+
+    def arrow(self) -> "pa.Table":
+        """
+        the batches fetched so far as a table, without copying them
+
+        returns:
+            arrow table of the fetched rows (the full result once exhausted)
+        """
+        import pyarrow as pa
+
+        if self.batches:
+            return pa.Table.from_batches(self.batches)
+        return pa.table({name: [] for name in self.columns})
+
+    @property
+    def complete(self) -> bool:
+        """whether every row has been fetched, so arrow() is the whole result"""
+        return self.exhausted and self.total_rows == self.fetched_rows
+
+    def pl(self) -> "polars.DataFrame":
+        """
+        the batches fetched so far as a polars dataframe
+
+        numeric, temporal and boolean columns share the arrow buffers, polars
+        only re-encodes string columns into its own layout
+
+        returns:
+            polars dataframe of the fetched rows (the full result once exhausted)
+        raises:
+            ImportError: if polars is not installed
+        """
+        polars = import_polars()
+        return polars.from_arrow(self.arrow(), rechunk=False)
+
+def import_polars():
+    """
+    polars, imported on first use
+
+    raises:
+        ImportError: with install instructions if it is missing
+    """
+    try:
+        import polars
+    except ImportError:
+        raise ImportError("Polars is not installed, install it with: pip install duckboard[polars]") from None
+    return polars
@@ -0,0 +1,36 @@
+from typing import TYPE_CHECKING
+
+from src.database.result_set import import_polars
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+DEFAULT_EXPRESSION = "df"
+
+def run_polars(table: "pa.Table", expression: str) -> "pa.Table":
+    """
+    evaluate a polars expression over a result
+
+    the result is handed to polars without copying its fixed-width columns, and
+    the output goes back as arrow so duckdb can scan it in place too
+
+    args:
+        table: complete result, available to the expression as df
+        expression: python expression using df and pl, e.g.
+            df.group_by("region").agg(pl.col("amount").sum()).
+            a LazyFrame is collected
+    returns:
+        the expression's dataframe as an arrow table
+    raises:
+        ImportError: if polars is not installed
+        ValueError: if the expression doesn't produce a dataframe
+    """
+    pl = import_polars()
+    df = pl.from_arrow(table, rechunk=False)
+    #the expression is the user's own code, run like the sql they type into the editor
+    frame = eval(compile(expression, "<polars transform>", "eval"), {"pl": pl, "df": df})
+    if isinstance(frame, pl.LazyFrame):
+        frame = frame.collect()
+    if not isinstance(frame, pl.DataFrame):
+        raise ValueError(f"The expression must produce a Polars DataFrame, not {type(frame).__name__}")
+    return frame.to_arrow()
@@ -0,0 +1,222 @@
+import datetime
+from decimal import Decimal
+
+import numpy as np
+from PySide6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
+from PySide6.QtCore import Signal, QTimer
+from matplotlib import dates as mdates
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg, NavigationToolbar2QT
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+from src.database.aggregations import RAW_VALUES
+
+#matches the app's dark palette
+BACKGROUND = "#1e1e1e"
+AXES_BACKGROUND = "#191919"
+FOREGROUND = "#c8c8c8"
+ACCENT = "#2a82da"
+
+def chart_title(spec) -> str:
+    """short description of what a chart shows"""
+    kind = spec["kind"]
+    if kind == "histogram":
+        return f"Distribution of {spec['x']}"
+    if kind == "scatter":
+        return f"{spec['y']} vs {spec['x']}"
+    agg = spec.get("agg", "count")
+    if agg == RAW_VALUES:
+        return f"{spec['y']} over {spec['x']}"
+    value = "count" if agg == "count" else f"{agg}({spec['y']})"
+    return f"{value} by {spec['x']}"
+
+def _plain(values):
+    """decimals to floats, matplotlib can't scale them"""
+    return [float(v) if isinstance(v, Decimal) else v for v in values]
+
+class ChartWidget(QFrame):
+    """one dashboard chart, drawn from points aggregated by duckdb"""
+    remove_requested = Signal(object)  # this widget
+    view_changed = Signal(object)  # this widget, after a zoom or pan settles
+    VIEW_DEBOUNCE_MS = 300  # wait for zooming and panning to stop before re-querying
+
+    def __init__(self, spec, parent=None):
+        super().__init__(parent)
+        self.spec = spec
+        self.view = {}  # x_range/y_range of a zoomed chart, empty when showing everything
+        self.full_limits = None  # axis limits of the unzoomed chart
+        self.x_is_time = False
+        self._drawing = False  # limit changes made while drawing are not user zooms
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.setMinimumHeight(280)
+
+        self.view_timer = QTimer(self)
+        self.view_timer.setSingleShot(True)
+        self.view_timer.timeout.connect(self._on_view_settled)
+        self._init_ui()
+
+    def _init_ui(self):
+        """init ui"""
+        layout = QVBoxLayout(self)
+
+        header = QHBoxLayout()
+        title = QLabel(f"{chart_title(self.spec)} - {self.spec['source']}")
+        title.setStyleSheet("font-weight: bold;")
+        header.addWidget(title)
+        header.addStretch()
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("font-size: 11px; color: #888;")
+        header.addWidget(self.status_label)
+
+        remove_btn = QPushButton("x")
+        remove_btn.setFixedWidth(24)
+        remove_btn.setToolTip("Remove chart")
+        remove_btn.clicked.connect(lambda: self.remove_requested.emit(self))
+        header.addWidget(remove_btn)
+        layout.addLayout(header)
+
+        self.figure = Figure(figsize=(5, 3), facecolor=BACKGROUND, layout="tight")
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.axes = self.figure.add_subplot()
+        layout.addWidget(self.canvas)
+
+        #zoom and pan re-query the visible range at full resolution
+        if self.spec["kind"] != "bar":
+            toolbar = NavigationToolbar2QT(self.canvas, self, coordinates=False)
+            toolbar.setIconSize(toolbar.iconSize() * 0.75)
+            layout.addWidget(toolbar)
+
+    def query_spec(self):
+        """
+        the spec to query for the chart's current size and visible range
+
+        returns:
+            chart spec with pixels and, once zoomed in, x_range/y_range
+        """
+        spec = dict(self.spec, pixels=(self.canvas.width(), self.canvas.height()))
+        spec.update(self.view)
+        return spec
+
+    def show_loading(self):
+        """mark the chart as waiting for its query"""
+        self.status_label.setText("updating...")
+
+    def show_error(self, error_msg):
+        """show a failed chart query"""
+        self.status_label.setText("failed")
+        self.status_label.setToolTip(error_msg)
+        self._drawing = True
+        self._reset_axes()
+        self.axes.text(0.5, 0.5, error_msg[:200], ha="center", va="center", wrap=True,
+                       color=FOREGROUND, transform=self.axes.transAxes)
+        self.canvas.draw_idle()
+        self._drawing = False
+
+    def plot(self, data, elapsed=None):
+        """
+        draw aggregated chart data
+
+        args:
+            data: dict with x and y lists from DuckDBManager.chart_data
+            elapsed: query time in seconds, shown next to the title
+        """
+        self.status_label.setText(f"{len(data['x']):,} points" + (f" in {elapsed:.2f}s" if elapsed is not None else ""))
+        self.status_label.setToolTip("")
+        self._drawing = True
+        self._reset_axes()
+        x, y = _plain(data["x"]), _plain(data["y"])
+        kind = self.spec["kind"]
+
+        if not x:
+            self.axes.text(0.5, 0.5, "No data", ha="center", va="center",
+                           color=FOREGROUND, transform=self.axes.transAxes)
+        elif kind == "bar":
+            positions = range(len(x))
+            self.axes.bar(positions, y, color=ACCENT)
+            self.axes.set_xticks(list(positions), x, rotation=45, ha="right", fontsize=8)
+        elif kind == "line":
+            self.axes.plot(x, y, color=ACCENT, linewidth=1)
+        elif kind == "histogram":
+            self.axes.bar(x, y, width=self._bin_width(x), align="edge", color=ACCENT)
+        elif kind == "scatter":
+            self._plot_density(data)
+
+        self.x_is_time = bool(x) and isinstance(x[0], (datetime.date, datetime.datetime))
+        if kind != "bar" and self.x_is_time:
+            self.figure.autofmt_xdate()
+
+        #keep a zoomed chart at the range that was re-queried
+        if "x_range" in self.view:
+            self.axes.set_xlim(*[mdates.date2num(v) if self.x_is_time else v for v in self.view["x_range"]])
+        if "y_range" in self.view:
+            self.axes.set_ylim(*self.view["y_range"])
+        if not self.view:
+            self.full_limits = (self.axes.get_xlim(), self.axes.get_ylim())
+
+        self.axes.callbacks.connect("xlim_changed", self._on_limits_changed)
+        self.axes.callbacks.connect("ylim_changed", self._on_limits_changed)
+        self.canvas.draw_idle()
+        self._drawing = False
+
+    def _plot_density(self, data):
+        """draw grid-binned scatter counts as an image, empty cells stay transparent"""
+        columns, rows = data["cells"]
+        x_lo, x_hi, y_lo, y_hi = data["extent"]
+        grid = np.zeros((rows, columns))
+        x_step = (x_hi - x_lo) / columns
+        y_step = (y_hi - y_lo) / rows
+        for x, y, count in zip(data["x"], data["y"], data["count"]):
+            column = min(int(round((x - x_lo) / x_step)), columns - 1)
+            row = min(int(round((y - y_lo) / y_step)), rows - 1)
+            grid[row, column] = count
+        self.axes.imshow(
+            np.ma.masked_equal(grid, 0), extent=(x_lo, x_hi, y_lo, y_hi), origin="lower",
+            aspect="auto", interpolation="nearest", cmap="viridis", norm=LogNorm()
+        )
+
+    def _on_limits_changed(self, _axes):
+        """restart the debounce after a zoom or pan step"""
+        if not self._drawing:
+            self.view_timer.start(self.VIEW_DEBOUNCE_MS)
+
+    def _on_view_settled(self):
+        """record the visible range and ask for it to be re-queried"""
+        #plain floats, numpy scalars don't render as sql literals
+        (x_lo, x_hi), (y_lo, y_hi) = ((float(v) for v in limits) for limits in (self.axes.get_xlim(), self.axes.get_ylim()))
+        view = {}
+        if self.full_limits is None or not self._covers(self.full_limits[0], (x_lo, x_hi)):
+            if self.x_is_time:
+                x_lo, x_hi = (mdates.num2date(v).replace(tzinfo=None) for v in (x_lo, x_hi))
+            view["x_range"] = (x_lo, x_hi)
+        #only scatter plots filter on y, lines and histograms need every value in the x range
+        if self.spec["kind"] == "scatter" and (
+                self.full_limits is None or not self._covers(self.full_limits[1], (y_lo, y_hi))):
+            view["y_range"] = (y_lo, y_hi)
+
+        if view != self.view:
+            self.view = view
+            self.view_changed.emit(self)
+
+    @staticmethod
+    def _covers(full, visible):
+        """whether the visible limits show the whole unzoomed range"""
+        return min(visible) <= min(full) and max(visible) >= max(full)
+
+    def _bin_width(self, x):
+        """width of histogram bars, the smallest gap between bin edges"""
+        gaps = [b - a for a, b in zip(x, x[1:])]
+        return min(gaps) if gaps else (datetime.timedelta(days=1) if isinstance(x[0], datetime.date) else 1)
+
+    def _reset_axes(self):
+        """clear the plot and reapply the dark style"""
+        self.axes.clear()
+        self.axes.set_facecolor(AXES_BACKGROUND)
+        self.axes.tick_params(colors=FOREGROUND, labelsize=8)
+        for spine in self.axes.spines.values():
+            spine.set_color("#444")
+        self.axes.xaxis.get_offset_text().set_color(FOREGROUND)
+        self.axes.yaxis.get_offset_text().set_color(FOREGROUND)
+        self.axes.set_xlabel(self.spec["x"], color=FOREGROUND, fontsize=9)
+        uses_y = self.spec["kind"] == "scatter" or self.spec.get("agg", "count") != "count"
+        self.axes.set_ylabel(self.spec.get("y") if uses_y else "count", color=FOREGROUND, fontsize=9)
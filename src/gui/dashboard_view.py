@@ -1,32 +1,223 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PySide6.QtWidgets import (
+    QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QScrollArea, QGridLayout, QMessageBox
+)
 from PySide6.QtCore import Qt
+import time
+
+from src.database.duckdb_manager import DuckDBManager
+from src.gui.chart_widget import ChartWidget
+from src.gui.dialogs.add_chart import AddChartDialog
+from src.gui.jobs import JobWatcher
 
 class DashboardView(QWidget):
     """dashboard panel for visualizations"""
+    GRID_COLUMNS = 2
 
-    def __init__(self, parent=None):
+    def __init__(self, db_manager: DuckDBManager, parent=None):
         super().__init__(parent)
+        self.db_manager = db_manager
+        self.charts = []  # ChartWidgets in display order
+        self.chart_jobs = {}  # ChartWidget -> JobWatcher for queries in flight
+        self.rerun = set()  # charts zoomed while their query was in flight
+        self.drawn_versions = {}  # ChartWidget -> source version its last query read
         self._init_ui()
 
     def _init_ui(self):
         """init ui"""
         layout = QVBoxLayout(self)
 
-        #title
+        #title and actions
+        header = QHBoxLayout()
         title = QLabel("Dashboard")
         title.setStyleSheet("font-size: 14px; font-weight: bold; padding: 5px;")
-        layout.addWidget(title)
+        header.addWidget(title)
+        header.addStretch()
+
+        self.add_chart_btn = QPushButton("Add Chart...")
+        self.add_chart_btn.clicked.connect(self._add_chart)
+        header.addWidget(self.add_chart_btn)
+
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.setToolTip("Re-run every chart's query")
+        self.refresh_btn.clicked.connect(self.refresh_charts)
+        header.addWidget(self.refresh_btn)
+        layout.addLayout(header)
 
         #placeholder text
-        placeholder = QLabel("Auto-generated visualizations will appear here")
-        placeholder.setStyleSheet("font-size: 12px; color: #888; padding: 20px;")
-        placeholder.setAlignment(Qt.AlignCenter)
-        layout.addWidget(placeholder)
-
-        layout.addStretch()
-
-    # TODO: Implement visualization functionality
-    # - Bar charts for categorical aggregations
-    # - Line charts for time series
-    # - Scatter plots for correlations
-    # - Summary cards (count, sum, avg, etc.)
\ No newline at end of file
+        self.placeholder = QLabel("Add a chart to visualize a loaded source, aggregated by DuckDB")
+        self.placeholder.setStyleSheet("font-size: 12px; color: #888; padding: 20px;")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.placeholder)
+
+        #chart grid
+        grid_widget = QWidget()
+        self.grid = QGridLayout(grid_widget)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(grid_widget)
+        layout.addWidget(scroll, 1)
+
+    def _add_chart(self):
+        """prompt for a chart and add it to the grid"""
+        if not self.db_manager.list_tables():
+            QMessageBox.information(self, "No Data", "Load a data source before adding charts.")
+            return
+
+        dialog = AddChartDialog(self.db_manager, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        chart = ChartWidget(dialog.spec, self)
+        chart.remove_requested.connect(self._remove_chart)
+        chart.view_changed.connect(self._run_chart)
+        self.charts.append(chart)
+        self._layout_charts()
+        self._run_chart(chart)
+
+    def _remove_chart(self, chart):
+        """drop a chart from the dashboard"""
+        self.charts.remove(chart)
+        self.chart_jobs.pop(chart, None)
+        self.rerun.discard(chart)
+        self.drawn_versions.pop(chart, None)
+        chart.deleteLater()
+        self._layout_charts()
+
+    def clear(self):
+        """remove every chart, e.g. when another workspace is opened"""
+        for chart in list(self.charts):
+            self._remove_chart(chart)
+
+    def _layout_charts(self):
+        """place the charts in the grid"""
+        for chart in self.charts:
+            self.grid.removeWidget(chart)
+        for i, chart in enumerate(self.charts):
+            self.grid.addWidget(chart, i // self.GRID_COLUMNS, i % self.GRID_COLUMNS)
+        self.placeholder.setVisible(not self.charts)
+
+    def refresh_charts(self):
+        """re-run the query of every chart"""
+        self._run_batches(self.charts)
+
+    def refresh_stale(self):
+        """re-run only the charts whose source changed since they were drawn"""
+        versions = self.db_manager.source_versions
+        self._run_batches([
+            chart for chart in self.charts
+            if self.drawn_versions.get(chart) != versions.get(chart.spec["source"], 0)
+        ])
+
+    def _run_batches(self, charts):
+        """
+        query charts with one shared scan per source
+
+        every source is its own job, so each source's charts update as soon as
+        its scan finishes, without waiting for the others
+        """
+        by_source = {}
+        for chart in charts:
+            if chart in self.chart_jobs:
+                self.rerun.add(chart)
+            else:
+                by_source.setdefault(chart.spec["source"], []).append(chart)
+
+        for source, source_charts in by_source.items():
+            if len(source_charts) == 1:
+                self._run_chart(source_charts[0])
+                continue
+            version = self.db_manager.source_versions.get(source, 0)
+            try:
+                future = self.db_manager.submit(self._timed_chart_batch, [chart.query_spec() for chart in source_charts])
+            except RuntimeError as e:
+                for chart in source_charts:
+                    chart.show_error(str(e))
+                continue
+
+            job = JobWatcher(future, self)
+            job.finished.connect(lambda outcome, job=job, charts=source_charts: self._on_batch_data(job, charts, outcome))
+            job.error.connect(lambda error_msg, job=job, charts=source_charts: self._on_batch_error(job, charts, error_msg))
+            for chart in source_charts:
+                self.chart_jobs[chart] = job
+                self.drawn_versions[chart] = version
+                chart.show_loading()
+            job.start()
+
+    def _run_chart(self, chart):
+        """aggregate a chart's data on the worker pool"""
+        if chart in self.chart_jobs:
+            #run again for the newest view once the current query lands
+            self.rerun.add(chart)
+            return
+        version = self.db_manager.source_versions.get(chart.spec["source"], 0)
+        try:
+            future = self.db_manager.submit(self._timed_chart_data, chart.query_spec())
+        except RuntimeError as e:
+            chart.show_error(str(e))
+            return
+
+        job = JobWatcher(future, self)
+        job.finished.connect(lambda outcome, chart=chart: self._on_chart_data(chart, outcome))
+        job.error.connect(lambda error_msg, chart=chart: self._on_chart_error(chart, error_msg))
+        self.chart_jobs[chart] = job
+        self.drawn_versions[chart] = version
+        chart.show_loading()
+        job.start()
+
+    def _timed_chart_data(self, spec):
+        """chart query job, runs on the db manager's worker pool"""
+        start = time.perf_counter()
+        data = self.db_manager.chart_data(spec)
+        return data, time.perf_counter() - start
+
+    def _timed_chart_batch(self, specs):
+        """shared scan job for charts over one source, runs on the db manager's worker pool"""
+        start = time.perf_counter()
+        results = self.db_manager.chart_batch(specs)
+        return results, time.perf_counter() - start
+
+    def _on_batch_data(self, job, charts, outcome):
+        """draw every chart of a shared scan, or the error its own part failed with"""
+        results, elapsed = outcome
+        for chart, data in zip(charts, results):
+            if self.chart_jobs.get(chart) is not job:
+                #removed while the scan was running
+                continue
+            del self.chart_jobs[chart]
+            if isinstance(data, Exception):
+                chart.show_error(str(data))
+            else:
+                chart.plot(data, elapsed)
+            self._run_pending(chart)
+
+    def _on_batch_error(self, job, charts, error_msg):
+        """show a failed shared scan on each of its charts"""
+        for chart in charts:
+            if self.chart_jobs.get(chart) is not job:
+                continue
+            del self.chart_jobs[chart]
+            chart.show_error(error_msg)
+            self._run_pending(chart)
+
+    def _on_chart_data(self, chart, outcome):
+        """draw a chart once its points arrive"""
+        if self.chart_jobs.pop(chart, None) is None:
+            #removed while its query was running
+            return
+        data, elapsed = outcome
+        chart.plot(data, elapsed)
+        self._run_pending(chart)
+
+    def _on_chart_error(self, chart, error_msg):
+        """show a failed chart query"""
+        if self.chart_jobs.pop(chart, None) is None:
+            return
+        chart.show_error(error_msg)
+        self._run_pending(chart)
+
+    def _run_pending(self, chart):
+        """re-run a chart whose view changed while it was being queried"""
+        if chart in self.rerun:
+            self.rerun.discard(chart)
+            self._run_chart(chart)
@@ -0,0 +1,102 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QComboBox, QDialogButtonBox, QMessageBox
+)
+
+from src.database.aggregations import AGGREGATES, RAW_VALUES
+
+class AddChartDialog(QDialog):
+    """dialog for choosing a chart's source, kind and columns"""
+    KINDS = [
+        ("Bar - aggregate by category", "bar"),
+        ("Line - aggregate over time or a numeric axis", "line"),
+        ("Histogram - distribution of one column", "histogram"),
+        ("Scatter - two numeric columns", "scatter"),
+    ]
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self._init_ui()
+
+    def _init_ui(self):
+        """init ui"""
+        layout = QVBoxLayout(self)
+        self.setWindowTitle("Add Chart")
+
+        form = QFormLayout()
+
+        self.source_combo = QComboBox()
+        self.source_combo.addItems(self.db_manager.list_tables())
+        self.source_combo.currentTextChanged.connect(self._on_source_changed)
+        form.addRow("Source:", self.source_combo)
+
+        self.kind_combo = QComboBox()
+        for label, value in self.KINDS:
+            self.kind_combo.addItem(label, value)
+        self.kind_combo.currentIndexChanged.connect(self._on_kind_changed)
+        form.addRow("Chart:", self.kind_combo)
+
+        self.x_combo = QComboBox()
+        form.addRow("X column:", self.x_combo)
+
+        self.agg_combo = QComboBox()
+        self.agg_combo.addItems(AGGREGATES)
+        self.agg_combo.currentTextChanged.connect(self._on_kind_changed)
+        form.addRow("Aggregate:", self.agg_combo)
+
+        self.y_combo = QComboBox()
+        form.addRow("Y column:", self.y_combo)
+
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self._validate)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._on_source_changed(self.source_combo.currentText())
+
+    def _on_source_changed(self, table_name):
+        """list the columns of the chosen source"""
+        self.x_combo.clear()
+        self.y_combo.clear()
+        if not table_name:
+            return
+        columns = [name for name, _ in self.db_manager.get_table_schema(table_name)]
+        self.x_combo.addItems(columns)
+        self.y_combo.addItems(columns)
+        self._on_kind_changed()
+
+    def _on_kind_changed(self):
+        """enable the inputs the chosen chart kind uses"""
+        kind = self.kind_combo.currentData()
+        aggregated = kind in ("bar", "line")
+        #only line charts can plot raw values, downsampled per pixel by the backend
+        raw_index = self.agg_combo.findText(RAW_VALUES)
+        if kind == "line" and raw_index < 0:
+            self.agg_combo.addItem(RAW_VALUES)
+        elif kind != "line" and raw_index >= 0:
+            self.agg_combo.removeItem(raw_index)
+        self.agg_combo.setEnabled(aggregated)
+        self.y_combo.setEnabled(kind == "scatter" or (aggregated and self.agg_combo.currentText() != "count"))
+
+    def _validate(self):
+        """accept once a source has been chosen"""
+        if not self.source_combo.currentText():
+            QMessageBox.warning(self, "No Source", "Load a data source before adding charts.")
+            return
+        self.accept()
+
+    @property
+    def spec(self):
+        """chart spec for DuckDBManager.chart_data"""
+        spec = {
+            "kind": self.kind_combo.currentData(),
+            "source": self.source_combo.currentText(),
+            "x": self.x_combo.currentText(),
+        }
+        if spec["kind"] in ("bar", "line"):
+            spec["agg"] = self.agg_combo.currentText()
+        if self.y_combo.isEnabled():
+            spec["y"] = self.y_combo.currentText()
+        return spec
@@ -14,13 +14,21 @@ class AddSourceDialog(QDialog):
         layout = QVBoxLayout(self)
 
         self.setWindowTitle("Add Data Source")
-        self.setFixedSize(250, 120)
+        self.setFixedSize(250, 200)
         
-        self.from_file_btn = QPushButton("From File...")
+        self.from_file_btn = QPushButton("From File(s)...")
         self.from_file_btn.clicked.connect(self._add_file)
         layout.addWidget(self.from_file_btn)
 
-        self.from_url_btn = QPushButton("From URL...")
+        self.from_folder_btn = QPushButton("From Folder...")
+        self.from_folder_btn.clicked.connect(self._add_folder)
+        layout.addWidget(self.from_folder_btn)
+
+        self.from_glob_btn = QPushButton("From Glob Pattern...")
+        self.from_glob_btn.clicked.connect(self._add_glob)
+        layout.addWidget(self.from_glob_btn)
+
+        self.from_url_btn = QPushButton("From URL (HTTP, S3, GCS)...")
         self.from_url_btn.clicked.connect(self._add_url)
         layout.addWidget(self.from_url_btn)
 
@@ -28,6 +36,14 @@ class AddSourceDialog(QDialog):
         self.source_type =  'file'
         self.accept()
 
+    def _add_folder(self):
+        self.source_type =  'folder'
+        self.accept()
+
+    def _add_glob(self):
+        self.source_type =  'glob'
+        self.accept()
+
     def _add_url(self):
         self.source_type =  'url'
         self.accept()
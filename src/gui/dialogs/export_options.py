@@ -0,0 +1,105 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QComboBox, QSpinBox,
+    QListWidget, QListWidgetItem, QDialogButtonBox, QLabel
+)
+from PySide6.QtCore import Qt
+
+from src.database.duckdb_manager import FORMAT_EXTENSIONS
+
+class ExportOptionsDialog(QDialog):
+    """dialog for choosing export format and COPY options"""
+    FORMATS = [("CSV", "csv"), ("Parquet", "parquet"), ("Arrow", "arrow")]
+    COMPRESSIONS = {
+        "csv": ["none", "gzip", "zstd"],
+        "parquet": ["snappy", "zstd", "gzip", "lz4", "uncompressed"],
+        "arrow": ["none"],
+    }
+    #compressed csv files carry the codec's suffix too, parquet compresses inside the file
+    CSV_COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+    DEFAULT_ROW_GROUP_SIZE = 122880  # duckdb's default
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self._init_ui()
+
+    def _init_ui(self):
+        """init ui"""
+        layout = QVBoxLayout(self)
+        self.setWindowTitle("Export Options")
+
+        form = QFormLayout()
+
+        self.format_combo = QComboBox()
+        for label, value in self.FORMATS:
+            self.format_combo.addItem(label, value)
+        self.format_combo.currentIndexChanged.connect(self._on_format_changed)
+        form.addRow("Format:", self.format_combo)
+
+        self.compression_combo = QComboBox()
+        form.addRow("Compression:", self.compression_combo)
+
+        self.row_group_spin = QSpinBox()
+        self.row_group_spin.setRange(1024, 100_000_000)
+        self.row_group_spin.setSingleStep(10240)
+        self.row_group_spin.setValue(self.DEFAULT_ROW_GROUP_SIZE)
+        form.addRow("Row group size:", self.row_group_spin)
+
+        layout.addLayout(form)
+
+        #partition columns, checking any switches the output to a directory
+        layout.addWidget(QLabel("Partition by (writes a directory):"))
+        self.partition_list = QListWidget()
+        for col in self.columns:
+            item = QListWidgetItem(col)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.partition_list.addItem(item)
+        layout.addWidget(self.partition_list)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._on_format_changed()
+
+    def _on_format_changed(self):
+        """update the options that apply to the chosen format"""
+        export_format = self.format
+        self.compression_combo.clear()
+        self.compression_combo.addItems(self.COMPRESSIONS[export_format])
+        self.row_group_spin.setEnabled(export_format == "parquet")
+        #arrow files are written by pyarrow, which doesn't partition
+        self.partition_list.setEnabled(export_format != "arrow")
+
+    @property
+    def format(self) -> str:
+        return self.format_combo.currentData()
+
+    @property
+    def compression(self):
+        value = self.compression_combo.currentText()
+        return None if value == "none" else value
+
+    @property
+    def file_extension(self) -> str:
+        """extension of the exported file, e.g. .csv.gz for gzip compressed csv"""
+        extension = FORMAT_EXTENSIONS[self.format]
+        if self.format == "csv":
+            extension += self.CSV_COMPRESSION_SUFFIXES.get(self.compression, "")
+        return extension
+
+    @property
+    def row_group_size(self):
+        return self.row_group_spin.value() if self.format == "parquet" else None
+
+    @property
+    def partition_by(self):
+        if self.format == "arrow":
+            return []
+        return [
+            self.partition_list.item(i).text()
+            for i in range(self.partition_list.count())
+            if self.partition_list.item(i).checkState() == Qt.CheckState.Checked
+        ]
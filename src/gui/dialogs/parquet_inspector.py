@@ -0,0 +1,166 @@
+import os
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTabWidget, QTableWidget, QTableWidgetItem,
+    QDialogButtonBox, QHeaderView
+)
+from PySide6.QtCore import Qt
+
+from src.utils.formatting import format_bytes
+
+class ParquetInspectorDialog(QDialog):
+    """footer level view of parquet files: row groups, codecs, encodings and stats"""
+
+    def __init__(self, path, info, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.info = info
+        self.load_requested = False
+        self._init_ui()
+
+    def _init_ui(self):
+        """init ui"""
+        layout = QVBoxLayout(self)
+        self.setWindowTitle(f"Parquet Inspector: {os.path.basename(self.path.rstrip('/')) or self.path}")
+        self.resize(1000, 550)
+
+        summary = QLabel(self._summary_text())
+        summary.setStyleSheet("padding: 5px;")
+        summary.setWordWrap(True)
+        layout.addWidget(summary)
+
+        tabs = QTabWidget()
+        tabs.addTab(self._columns_table(), "Columns")
+        tabs.addTab(self._row_groups_table(), "Row Groups")
+        tabs.addTab(self._files_table(), "Files")
+        tabs.addTab(self._schema_table(), "Schema")
+        layout.addWidget(tabs)
+
+        #load from here once the footers look right
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        load_btn = buttons.addButton("Load...", QDialogButtonBox.ButtonRole.AcceptRole)
+        load_btn.setToolTip("Load these files as a table or view")
+        buttons.accepted.connect(self._request_load)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def _request_load(self):
+        """close and ask the file browser to load the inspected files"""
+        self.load_requested = True
+        self.accept()
+
+    def _summary_text(self):
+        """totals across all inspected files"""
+        files = self.info["files"]
+        rows = sum(f.get("num_rows") or 0 for f in files)
+        row_groups = sum(f.get("num_row_groups") or 0 for f in files)
+        compressed = sum(c["compressed_bytes"] or 0 for c in self.info["columns"])
+        uncompressed = sum(c["uncompressed_bytes"] or 0 for c in self.info["columns"])
+
+        parts = [
+            f"Files: {len(files):,}",
+            f"Rows: {rows:,}",
+            f"Row groups: {row_groups:,}",
+            f"Columns: {len(self.info['columns'])}",
+            f"Data: {format_bytes(compressed)} compressed, {format_bytes(uncompressed)} uncompressed",
+        ]
+        if uncompressed:
+            parts.append(f"ratio {uncompressed / max(compressed, 1):.1f}x")
+        #file size and footer size are missing from older duckdb versions
+        if all(f.get("file_size_bytes") is not None for f in files):
+            parts.append(f"On disk: {format_bytes(sum(f['file_size_bytes'] for f in files))}")
+        if all(f.get("footer_size") is not None for f in files):
+            parts.append(f"Footers: {format_bytes(sum(f['footer_size'] for f in files))}")
+        return " | ".join(parts)
+
+    def _columns_table(self):
+        """per column codecs, encodings, size share and footer statistics"""
+        columns = self.info["columns"]
+        total = sum(c["compressed_bytes"] or 0 for c in columns) or 1
+        rows = [
+            [
+                c["name"],
+                c["physical_type"],
+                c["compression"],
+                c["encodings"],
+                format_bytes(c["compressed_bytes"] or 0),
+                format_bytes(c["uncompressed_bytes"] or 0),
+                f"{(c['compressed_bytes'] or 0) / total * 100:.1f}%",
+                "" if c["nulls"] is None else f"{c['nulls']:,}",
+                c["min"],
+                c["max"],
+            ]
+            for c in columns
+        ]
+        headers = ["Column", "Physical Type", "Compression", "Encodings", "Compressed",
+                   "Uncompressed", "% of Data", "Nulls", "Min", "Max"]
+        return self._make_table(headers, rows, numeric=(4, 5, 6, 7))
+
+    def _row_groups_table(self):
+        """rows and bytes of every row group"""
+        multi_file = len(self.info["files"]) > 1
+        rows = []
+        for group in self.info["row_groups"]:
+            row = [
+                group["row_group_id"],
+                f"{group['num_rows']:,}",
+                format_bytes(group["compressed_bytes"] or 0),
+                format_bytes(group["uncompressed_bytes"] or 0),
+            ]
+            rows.append(([os.path.basename(group["file_name"])] if multi_file else []) + row)
+        headers = ["Row Group", "Rows", "Compressed", "Uncompressed"]
+        offset = 1 if multi_file else 0
+        return self._make_table(
+            (["File"] if multi_file else []) + headers, rows,
+            numeric=tuple(range(offset, offset + len(headers)))
+        )
+
+    def _files_table(self):
+        """file level metadata"""
+        rows = [
+            [
+                f.get("file_name"),
+                f"{f.get('num_rows') or 0:,}",
+                f.get("num_row_groups"),
+                "" if f.get("file_size_bytes") is None else format_bytes(f["file_size_bytes"]),
+                "" if f.get("footer_size") is None else format_bytes(f["footer_size"]),
+                f.get("created_by"),
+                f.get("format_version"),
+            ]
+            for f in self.info["files"]
+        ]
+        headers = ["File", "Rows", "Row Groups", "Size", "Footer", "Created By", "Format Version"]
+        return self._make_table(headers, rows, numeric=(1, 2, 3, 4))
+
+    def _schema_table(self):
+        """the parquet schema elements of the first file"""
+        rows = [
+            [
+                s.get("name"),
+                s.get("type"),
+                s.get("converted_type"),
+                s.get("logical_type"),
+                s.get("repetition_type"),
+                s.get("duckdb_type"),
+            ]
+            for s in self.info["schema"]
+        ]
+        headers = ["Name", "Physical Type", "Converted Type", "Logical Type", "Repetition", "DuckDB Type"]
+        return self._make_table(headers, rows)
+
+    def _make_table(self, headers, rows, numeric=()):
+        """read-only table widget with the given cells"""
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setAlternatingRowColors(True)
+        table.verticalHeader().setVisible(False)
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                item = QTableWidgetItem("" if value is None else str(value))
+                if c in numeric:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(r, c, item)
+        table.resizeColumnsToContents()
+        table.horizontalHeader().setSectionResizeMode(len(headers) - 1, QHeaderView.ResizeMode.Stretch)
+        return table
@@ -0,0 +1,60 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QLineEdit, QPlainTextEdit,
+    QDialogButtonBox, QLabel
+)
+from PySide6.QtGui import QFont
+
+from src.database.transforms import DEFAULT_EXPRESSION
+
+class PolarsTransformDialog(QDialog):
+    """dialog for a polars expression whose output is registered as a table"""
+    DEFAULT_TABLE_NAME = "polars_result"
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self._init_ui()
+
+    def _init_ui(self):
+        """init ui"""
+        layout = QVBoxLayout(self)
+        self.setWindowTitle("Send to Polars")
+        self.resize(520, 300)
+
+        hint = QLabel(
+            "The results are available as <b>df</b> and Polars as <b>pl</b>. "
+            "The DataFrame the expression produces can be queried by the table name below."
+        )
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+
+        self.expression_edit = QPlainTextEdit(DEFAULT_EXPRESSION)
+        self.expression_edit.setFont(QFont("Courier New", 11))
+        if self.columns:
+            self.expression_edit.setPlaceholderText(f'df.filter(pl.col("{self.columns[0]}").is_not_null())')
+        layout.addWidget(self.expression_edit)
+
+        form = QFormLayout()
+        self.name_edit = QLineEdit(self.DEFAULT_TABLE_NAME)
+        form.addRow("Table name:", self.name_edit)
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.ok_button = buttons.button(QDialogButtonBox.StandardButton.Ok)
+        self.expression_edit.textChanged.connect(self._on_changed)
+        self.name_edit.textChanged.connect(self._on_changed)
+
+    def _on_changed(self):
+        """only allow running with an expression and a table name"""
+        self.ok_button.setEnabled(bool(self.expression and self.table_name))
+
+    @property
+    def expression(self) -> str:
+        return self.expression_edit.toPlainText().strip()
+
+    @property
+    def table_name(self) -> str:
+        return self.name_edit.text().strip()
@@ -0,0 +1,102 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem, QDialogButtonBox
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QFont
+
+from src.database.query_profile import hottest, operator_tree
+from src.utils.formatting import format_bytes
+
+class QueryProfileDialog(QDialog):
+    """operator tree of a profiled query with per-operator timings"""
+    COLUMNS = ["Operator", "Time (ms)", "% Time", "Rows", "Output Size", "Details"]
+    HOT_SHARE = 0.5  # operators above this share of the time are marked red
+    WARM_SHARE = 0.2  # and above this one orange
+    HOTTEST_COUNT = 3  # slowest operators shown in bold
+
+    def __init__(self, profile, parent=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.nodes = operator_tree(profile)
+        self._init_ui()
+
+    def _init_ui(self):
+        """init ui"""
+        layout = QVBoxLayout(self)
+        self.setWindowTitle("Query Profile")
+        self.resize(900, 500)
+
+        #query level totals
+        summary = QLabel(self._summary_text())
+        summary.setStyleSheet("padding: 5px;")
+        summary.setWordWrap(True)
+        layout.addWidget(summary)
+
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(len(self.COLUMNS))
+        self.tree.setHeaderLabels(self.COLUMNS)
+        self.tree.setAlternatingRowColors(True)
+
+        hot = [id(node) for node in hottest(self.nodes, self.HOTTEST_COUNT)]
+        for node in self.nodes:
+            self.tree.addTopLevelItem(self._build_item(node, hot))
+        self.tree.expandAll()
+        for column in range(len(self.COLUMNS) - 1):
+            self.tree.resizeColumnToContents(column)
+        layout.addWidget(self.tree)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def _summary_text(self):
+        """total time, memory and io of the profiled query"""
+        profile = self.profile
+        parts = [
+            f"Total: {profile.get('latency', 0.0) * 1000:,.1f} ms",
+            f"CPU: {profile.get('cpu_time', 0.0) * 1000:,.1f} ms",
+            f"Peak buffer memory: {format_bytes(profile.get('system_peak_buffer_memory', 0))}",
+            f"Rows scanned: {profile.get('cumulative_rows_scanned', 0):,}",
+            f"Read: {format_bytes(profile.get('total_bytes_read', 0))}",
+        ]
+        if profile.get("system_peak_temp_dir_size"):
+            parts.append(f"Spilled: {format_bytes(profile['system_peak_temp_dir_size'])}")
+        return " | ".join(parts)
+
+    def _build_item(self, node, hot):
+        """tree item for an operator and its inputs"""
+        details = "; ".join(
+            f"{key}: {', '.join(value) if isinstance(value, list) else value}"
+            for key, value in node["details"].items()
+        )
+        item = QTreeWidgetItem([
+            node["name"],
+            f"{node['timing'] * 1000:,.2f}",
+            f"{node['share'] * 100:.1f}%",
+            f"{node['cardinality']:,}",
+            format_bytes(node["output_bytes"]),
+            details,
+        ])
+        item.setToolTip(len(self.COLUMNS) - 1, details.replace("; ", "\n"))
+        for column in range(1, len(self.COLUMNS) - 1):
+            item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+        #highlight where the time went
+        if node["share"] >= self.HOT_SHARE:
+            color = QColor(140, 40, 40)
+        elif node["share"] >= self.WARM_SHARE:
+            color = QColor(140, 90, 30)
+        else:
+            color = None
+        if color is not None:
+            for column in range(len(self.COLUMNS)):
+                item.setBackground(column, color)
+        if id(node) in hot:
+            font = QFont()
+            font.setBold(True)
+            for column in range(len(self.COLUMNS)):
+                item.setFont(column, font)
+
+        for child in node["children"]:
+            item.addChild(self._build_item(child, hot))
+        return item
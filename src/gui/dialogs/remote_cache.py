@@ -0,0 +1,55 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QCheckBox, QSpinBox,
+    QDialogButtonBox, QLabel
+)
+
+class RemoteCacheDialog(QDialog):
+    """dialog for where blocks of remote files are cached, and how much disk they may use"""
+    MAX_GB = 1024
+
+    def __init__(self, disk_cache: bool, max_bytes: int, cache_dir: str, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self._init_ui(disk_cache, max_bytes)
+
+    def _init_ui(self, disk_cache, max_bytes):
+        """init ui"""
+        layout = QVBoxLayout(self)
+        self.setWindowTitle("Remote Block Cache")
+
+        hint = QLabel(
+            "Blocks read from remote files are cached in memory for the session. "
+            "The on-disk cache keeps them for later sessions, using the third-party "
+            "<b>cache_httpfs</b> extension, which is downloaded on first use. "
+            "Turning it on or off applies once a workspace is reopened or Duckboard restarts."
+        )
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+
+        form = QFormLayout()
+        self.disk_check = QCheckBox(f"Cache on disk in {self.cache_dir}")
+        self.disk_check.setChecked(disk_cache)
+        form.addRow(self.disk_check)
+
+        #least recently used blocks are evicted past the limit
+        self.size_spin = QSpinBox()
+        self.size_spin.setRange(1, self.MAX_GB)
+        self.size_spin.setSuffix(" GB")
+        self.size_spin.setValue(max(1, max_bytes // 1024 ** 3))
+        self.size_spin.setEnabled(disk_cache)
+        self.disk_check.toggled.connect(self.size_spin.setEnabled)
+        form.addRow("Size limit:", self.size_spin)
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    @property
+    def disk_cache(self) -> bool:
+        return self.disk_check.isChecked()
+
+    @property
+    def max_bytes(self) -> int:
+        return self.size_spin.value() * 1024 ** 3
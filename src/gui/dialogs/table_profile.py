@@ -0,0 +1,70 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QDialogButtonBox, QHeaderView
+)
+from PySide6.QtCore import Qt
+
+class TableProfileDialog(QDialog):
+    """per-column statistics of a table or view"""
+    COLUMNS = ["Column", "Type", "Nulls", "Distinct (approx)", "Min", "Max", "Quartiles (approx)", "Top Values (approx)"]
+
+    def __init__(self, table_name, profile, parent=None):
+        super().__init__(parent)
+        self.table_name = table_name
+        self.profile = profile
+        self._init_ui()
+
+    def _init_ui(self):
+        """init ui"""
+        layout = QVBoxLayout(self)
+        self.setWindowTitle(f"Table Profile: {self.table_name}")
+        self.resize(1000, 450)
+
+        summary = QLabel(self._summary_text())
+        summary.setStyleSheet("padding: 5px;")
+        summary.setWordWrap(True)
+        layout.addWidget(summary)
+
+        columns = self.profile["columns"]
+        self.table = QTableWidget(len(columns), len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setVisible(False)
+
+        for row, col in enumerate(columns):
+            bounds_note = "from Parquet footers (exact)" if col["exact_bounds"] else "from the scanned rows"
+            values = [
+                (col["name"], None),
+                (col["type"], None),
+                (f"{col['nulls']:,} ({col['null_fraction'] * 100:.1f}%)", None),
+                (f"{col['distinct']:,}", None),
+                (col["min"], bounds_note),
+                (col["max"], bounds_note),
+                (", ".join(col["quantiles"]) if col["quantiles"] else None, "25th, 50th and 75th percentiles"),
+                (", ".join(col["top_k"]) if col["top_k"] else None, "most frequent first"),
+            ]
+            for column, (value, tooltip) in enumerate(values):
+                item = QTableWidgetItem("" if value is None else str(value))
+                if tooltip:
+                    item.setToolTip(tooltip)
+                if column in (2, 3):
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setSectionResizeMode(len(self.COLUMNS) - 1, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def _summary_text(self):
+        """row count and how the statistics were gathered"""
+        profile = self.profile
+        text = f"Rows: {profile['row_count']:,} | Columns: {len(profile['columns'])}"
+        if profile["sampled"]:
+            text += f" | profiled from a sample of {profile['sample_rows']:,} rows, counts are scaled estimates"
+        if any(col["exact_bounds"] for col in profile["columns"]):
+            text += " | min/max and nulls read from Parquet footers"
+        return text
@@ -2,37 +2,41 @@ from PySide6.QtWidgets import (
     QDialog, QWidget, QVBoxLayout, QListWidget, QPushButton,
     QFileDialog, QLabel, QListWidgetItem, QMessageBox, QInputDialog
 )
-from PySide6.QtCore import Qt, QThread, Signal
-from pathlib import Path
+from PySide6.QtCore import Qt, QTimer, Signal
 
-from src.database.duckdb_manager import DuckDBManager
+from src.database.duckdb_manager import DuckDBManager, default_table_name
+from src.database.remote import REMOTE_PREFIXES, is_remote
 from src.gui.dialogs.add_source import AddSourceDialog
-
-class FileLoaderThread(QThread):
-    """background thread for loading files without blocking UI"""
-    finished = Signal(str)  # table_name
-    error = Signal(str)  # error message
-
-    def __init__(self, db_manager, file_path, table_name):
-        super().__init__()
-        self.db_manager = db_manager
-        self.file_path = file_path
-        self.table_name = table_name
-
-    def run(self):
-        """load file in background"""
-        try:
-            table_name = self.db_manager.load_file(self.file_path, self.table_name)
-            self.finished.emit(table_name)
-        except Exception as e:
-            self.error.emit(str(e))
+from src.gui.dialogs.parquet_inspector import ParquetInspectorDialog
+from src.gui.dialogs.table_profile import TableProfileDialog
+from src.gui.jobs import JobWatcher
+from src.gui.source_watcher import SourceWatcher
+from src.utils.instrumentation import tracer
 
 class FileBrowser(QWidget):
     """panel for browsing and loading data"""
+    sources_changed = Signal()  # a source was loaded or refreshed, its data may differ
+    LOAD_MODE_CHOICES = [
+        ("Auto (by file size and format)", "auto"),
+        ("View - query the file in place", "view"),
+        ("Table - load into memory", "table"),
+    ]
+    DATA_FILE_FILTER = "Data Files (*.csv *.parquet *.arrow *csv.gz);; CSV Files (*.csv);; Parquet Files (*.parquet);;Arrow Files (*.arrow);;CSV Compressed (*.csv.gz)"
+    PROGRESS_POLL_MS = 250  # load progress refresh interval
+
     def __init__(self, db_manager: DuckDBManager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
-        self.loader_thread = None
+        self.load_jobs = {}  # JobWatcher -> {table_name, cursor, item} for loads in flight
+        self.profile_jobs = {}  # table_name -> JobWatcher for profiles being computed
+        self.inspect_job = None
+        self.progress_timer = QTimer(self)
+        self.progress_timer.timeout.connect(self._poll_load_progress)
+
+        #keeps loaded sources current as their files change
+        self.source_watcher = SourceWatcher(db_manager, self)
+        self.source_watcher.refreshed.connect(self._on_source_refreshed)
+        self.source_watcher.error.connect(self._on_refresh_error)
         self._init_ui()
     
     def _init_ui(self):
@@ -49,6 +53,12 @@ class FileBrowser(QWidget):
         self.add_data_btn.clicked.connect(self._add_data_source)
         layout.addWidget(self.add_data_btn)
 
+        #footer-only look at a parquet file before deciding how to load it
+        self.inspect_btn = QPushButton("Inspect Parquet...")
+        self.inspect_btn.setToolTip("Show row groups, codecs and column statistics without loading the file")
+        self.inspect_btn.clicked.connect(self._inspect_parquet)
+        layout.addWidget(self.inspect_btn)
+
         #loaded table list
         self.tables_list = QListWidget()
         self.tables_list.itemDoubleClicked.connect(self._show_table_info)
@@ -71,27 +81,33 @@ class FileBrowser(QWidget):
             #check which option they choes
             if dialog.source_type == 'file':
                 self._add_file()
+            elif dialog.source_type == 'folder':
+                self._add_folder()
+            elif dialog.source_type == 'glob':
+                self._add_glob()
             elif dialog.source_type == 'url':
                 self._add_url()
 
     def _add_url(self):
-        """prompt user for url and load csv from it"""
+        """prompt user for a remote file url and load it"""
         url, ok = QInputDialog.getText(
             self,
-            "Load CSV from URL",
-            "Enter CSV URL (http:// or https://):",
+            "Load Remote File",
+            "Enter a CSV or Parquet URL (http://, https://, s3://, gs://, ...).\n"
+            "Parquet is queried in place, reading only the parts a query needs:",
             text="https://"
         )
 
         if ok and url:
+            url = url.strip()
             #basic validation
-            if not (url.startswith('http://') or url.startswith('https://')):
-                QMessageBox.warning(self, 'Invalid URL', 'URL must start with http:// or https://')
+            if not is_remote(url):
+                QMessageBox.warning(self, 'Invalid URL', f"URL must start with one of: {', '.join(REMOTE_PREFIXES)}")
                 return
             
             #prompt user for table name
             #generate default table name from url
-            default_name =  "url_data"
+            default_name = default_table_name(url)
             table_name, ok = QInputDialog.getText(
                 self,
                 "Table Name",
@@ -100,81 +116,224 @@ class FileBrowser(QWidget):
             )
 
             if ok and table_name:
-                self.add_data_btn.setEnabled(False)
                 self.window().status_bar.showMessage(f"Loading {url}...")
-                # load file in background thread
-                self.loader_thread = FileLoaderThread(self.db_manager, url, table_name)
-                self.loader_thread.finished.connect(self._on_file_loaded)
-                self.loader_thread.error.connect(self._on_load_error)
-                self.loader_thread.start()
+                # load file on the worker pool
+                self.start_load(url, table_name, "auto")
 
     def _add_file(self):
-        """prompt user for file and load"""
+        """prompt user for one or more files and load"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Open Data Files",
+            "",
+            self.DATA_FILE_FILTER
+        )
+
+        if not file_paths:
+            return
+
+        if len(file_paths) == 1:
+            self._add_source(file_paths[0])
+            return
+
+        #several files, either union them into one table or load each on its own
+        answer = QMessageBox.question(
+            self,
+            "Multiple Files",
+            f"Load the {len(file_paths)} selected files as one combined table?\n\n"
+            "Choose No to load each file as a separate table.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
+        )
+        if answer == QMessageBox.StandardButton.Yes:
+            self._add_source(file_paths)
+        elif answer == QMessageBox.StandardButton.No:
+            mode = self._prompt_load_mode()
+            if mode:
+                #independent loads run concurrently on the worker pool
+                for file_path in file_paths:
+                    self.start_load(file_path, default_table_name(file_path), mode)
+                self.window().status_bar.showMessage(f"Loading {len(file_paths)} files...")
+
+    def _add_folder(self):
+        """prompt user for a directory of data files and load it as one table"""
+        folder = QFileDialog.getExistingDirectory(self, "Open Data Folder")
+        if folder:
+            self._add_source(folder)
+
+    def _add_glob(self):
+        """prompt user for a glob pattern and load the matching files as one table"""
+        pattern, ok = QInputDialog.getText(
+            self,
+            "Load Files by Pattern",
+            "Enter a glob pattern, e.g. data/year=*/month=*/*.parquet:"
+        )
+        if ok and pattern:
+            self._add_source(pattern)
+
+    def _inspect_parquet(self):
+        """prompt for a parquet file and read its footer on the worker pool"""
         file_path, _ = QFileDialog.getOpenFileName(
             self,
-            "Open Data File",
+            "Inspect Parquet File",
             "",
-            "Data Files (*.csv *.parquet *.arrow *csv.gz);; CSV Files (*.csv);; Parquet Files (*.parquet);;Arrow Files (*.arrow);;CSV Compressed (*.csv.gz)"
+            "Parquet Files (*.parquet)"
         )
+        if not file_path:
+            return
 
-        if file_path:
-            # generate default table name from filename
-            path = Path(file_path)
-            # handle double extensions like .csv.gz
-            name = path.name
-            # remove .gz if present
-            if name.endswith('.gz'):
-                name = name[:-3]
-            # remove data file extensions
-            for ext in ['.csv', '.parquet', '.arrow']:
-                if name.endswith(ext):
-                    name = name[:-len(ext)]
-                    break
-            # sanitize name
-            default_name = name.replace(" ", "_").replace("-", "_")
-
-            # prompt user for table name
-            table_name, ok = QInputDialog.getText(
-                self,
-                "Table Name",
-                "Enter a name for this table:",
-                text=default_name
-            )
+        try:
+            future = self.db_manager.submit(self.db_manager.inspect_parquet, file_path)
+        except RuntimeError as e:
+            QMessageBox.warning(self, "Busy", str(e))
+            return
 
-            if ok and table_name:
-                # disable button during loading
-                self.add_data_btn.setEnabled(False)
-                self.window().status_bar.showMessage(f"Loading {Path(file_path).name}...")
+        self.inspect_job = JobWatcher(future, self)
+        self.inspect_job.finished.connect(lambda info: self._on_parquet_inspected(file_path, info))
+        self.inspect_job.error.connect(
+            lambda error_msg: QMessageBox.critical(self, "Error", f"Could not read Parquet metadata: {error_msg}")
+        )
+        self.inspect_job.start()
 
-                # load file in background thread
-                self.loader_thread = FileLoaderThread(self.db_manager, file_path, table_name)
-                self.loader_thread.finished.connect(self._on_file_loaded)
-                self.loader_thread.error.connect(self._on_load_error)
-                self.loader_thread.start()
+    def _on_parquet_inspected(self, file_path, info):
+        """show the footer summary, loading the file if asked to"""
+        dialog = ParquetInspectorDialog(file_path, info, self)
+        dialog.exec()
+        if dialog.load_requested:
+            self._add_source(file_path)
+
+    def _add_source(self, source):
+        """prompt for table name and load mode, then load a file or multi-file source"""
+        # prompt user for table name
+        table_name, ok = QInputDialog.getText(
+            self,
+            "Table Name",
+            "Enter a name for this table:",
+            text=default_table_name(source)
+        )
 
-    def _on_file_loaded(self, table_name):
+        if not (ok and table_name):
+            return
+
+        mode = self._prompt_load_mode()
+        if mode:
+            self.window().status_bar.showMessage(f"Loading {table_name}...")
+
+            # load file on the worker pool, other loads and queries keep running
+            self.start_load(source, table_name, mode)
+
+    def _prompt_load_mode(self):
+        """
+        ask for view vs table
+
+        returns:
+            load mode, or None if cancelled
+        """
+        labels = [label for label, _ in self.LOAD_MODE_CHOICES]
+        mode_label, ok = QInputDialog.getItem(
+            self,
+            "Load Mode",
+            "How should this source be registered?",
+            labels,
+            0,
+            False
+        )
+        return dict(self.LOAD_MODE_CHOICES)[mode_label] if ok else None
+
+    def start_load(self, source, table_name, mode):
+        """submit a load job to the db manager's worker pool"""
+        #each load gets its own cursor so its progress can be shown in the list
+        cursor = self.db_manager.cursor()
+        try:
+            future = self.db_manager.submit(self._run_load, source, table_name, mode, cursor)
+        except RuntimeError as e:
+            cursor.close()
+            QMessageBox.warning(self, "Busy", str(e))
+            return
+
+        job = JobWatcher(future, self)
+        job.finished.connect(lambda table_name, job=job: self._on_file_loaded(job, table_name))
+        job.error.connect(lambda error_msg, job=job: self._on_load_error(job, error_msg))
+        self.load_jobs[job] = {"table_name": table_name, "cursor": cursor, "item": None}
+        self.refresh_tables_list()
+        self.progress_timer.start(self.PROGRESS_POLL_MS)
+        job.start()
+
+    def _run_load(self, source, table_name, mode, cursor):
+        """load job, runs on the db manager's worker pool"""
+        try:
+            with tracer.operation():
+                return self.db_manager.load_file(source, table_name, mode, cursor=cursor)
+        finally:
+            cursor.close()
+
+    def _poll_load_progress(self):
+        """show engine progress next to each loading source"""
+        for load in self.load_jobs.values():
+            try:
+                progress = load["cursor"].query_progress()
+            except Exception:
+                progress = -1
+            #duckdb reports -1 until it has an estimate
+            status = f"{progress:.0f}%" if progress >= 0 else "..."
+            load["item"].setText(f"{load['table_name']} (loading {status})")
+
+    def _finish_load(self, job):
+        """forget a completed load job"""
+        self.load_jobs.pop(job)
+        if not self.load_jobs:
+            self.progress_timer.stop()
+        self.refresh_tables_list()
+        self.source_watcher.sync()
+
+    def _on_source_refreshed(self, table_name, outcome):
+        """handle a source refreshed after its files changed"""
+        descriptions = {
+            "view": "files changed, view reads them live",
+            "appended": "appended new rows",
+            "files": "re-read new and changed files",
+            "reloaded": "reloaded",
+        }
+        self.refresh_tables_list()
+        self.sources_changed.emit()
+        self.window().status_bar.showMessage(f"Refreshed {table_name}: {descriptions.get(outcome, outcome)}")
+
+    def _on_refresh_error(self, table_name, error_msg):
+        """handle a failed refresh, the previous data stays in place"""
+        self.window().status_bar.showMessage(f"Could not refresh {table_name}: {error_msg}")
+
+    def _on_file_loaded(self, job, table_name):
         """handle successful file load"""
-        self._refresh_tables_list()
-        self.window().status_bar.showMessage(f"Loaded {table_name}")
-        self.add_data_btn.setEnabled(True)
-        self.loader_thread = None
+        self._finish_load(job)
+        self.sources_changed.emit()
+        mode = self.db_manager.sources[table_name]["mode"]
+        pending = f" | {len(self.load_jobs)} load(s) still running" if self.load_jobs else ""
+        self.window().status_bar.showMessage(f"Loaded {table_name} ({mode}){pending}")
 
-    def _on_load_error(self, error_msg):
+    def _on_load_error(self, job, error_msg):
         """handle file load error"""
+        self._finish_load(job)
         QMessageBox.critical(self, "Error Loading File", error_msg)
         self.window().status_bar.showMessage("Load failed")
-        self.add_data_btn.setEnabled(True)
-        self.loader_thread = None
 
-    def _refresh_tables_list(self):
+    def refresh_tables_list(self):
         """refresh the list of tables"""
         self.tables_list.clear()
         tables = self.db_manager.list_tables()
 
         for table_name in tables:
             item = QListWidgetItem(table_name)
-            item.setToolTip(f"Double-click to view schema")
+            item.setData(Qt.ItemDataRole.UserRole, table_name)
+            #registered frames have no source files
+            mode = self.db_manager.sources.get(table_name, {}).get("mode", "frame")
+            item.setToolTip(f"{mode.capitalize()} over {self.db_manager.loaded_tables[table_name]}\nDouble-click to profile columns")
+            self.tables_list.addItem(item)
+
+        #sources still loading, their progress is filled in by _poll_load_progress
+        for load in self.load_jobs.values():
+            item = QListWidgetItem(f"{load['table_name']} (loading...)")
+            item.setForeground(Qt.GlobalColor.gray)
             self.tables_list.addItem(item)
+            load["item"] = item
 
         #update info label
         if tables:
@@ -183,20 +342,32 @@ class FileBrowser(QWidget):
             self.info_label.setText("No tables loaded")
 
     def _show_table_info(self, item: QListWidgetItem):
-        """show table schema info"""
-        table_name = item.text()
+        """profile the table's columns on the worker pool and show the result"""
+        table_name = item.data(Qt.ItemDataRole.UserRole)
+        if table_name is None or table_name in self.profile_jobs:
+            #still loading, or already being profiled
+            return
 
         try:
-            stats = self.db_manager.get_table_stats(table_name)
+            future = self.db_manager.submit(self.db_manager.profile_table, table_name)
+        except RuntimeError as e:
+            QMessageBox.warning(self, "Busy", str(e))
+            return
 
-            info_text = f"Table: {table_name}\n\n"
-            info_text += f"Rows: {stats['row_count']:,}\n"
-            info_text += f"Columns: {stats['column_count']}\n\n"
-            info_text += "Schema:\n"
+        job = JobWatcher(future, self)
+        job.finished.connect(lambda profile, table_name=table_name: self._on_profile_ready(table_name, profile))
+        job.error.connect(lambda error_msg, table_name=table_name: self._on_profile_error(table_name, error_msg))
+        self.profile_jobs[table_name] = job
+        self.window().status_bar.showMessage(f"Profiling {table_name}...")
+        job.start()
 
-            for col_name, col_type in stats['columns']:
-                info_text += f" . {col_name}: {col_type}\n"
+    def _on_profile_ready(self, table_name, profile):
+        """show a finished column profile"""
+        self.profile_jobs.pop(table_name, None)
+        self.window().status_bar.showMessage(f"Profiled {table_name}")
+        TableProfileDialog(table_name, profile, self).exec()
 
-            QMessageBox.information(self, f"Table Info: {table_name}", info_text)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Could not retrieve table info: {str(e)}")
\ No newline at end of file
+    def _on_profile_error(self, table_name, error_msg):
+        """handle a failed column profile"""
+        self.profile_jobs.pop(table_name, None)
+        QMessageBox.critical(self, "Error", f"Could not profile table: {error_msg}")
@@ -0,0 +1,88 @@
+from typing import Dict, List
+
+from PySide6.QtWidgets import QWidget, QLineEdit, QTableView
+from PySide6.QtCore import Signal
+from shiboken6 import isValid
+
+class FilterBar(QWidget):
+    """row of filter boxes kept aligned with the columns of a table view"""
+    filters_changed = Signal(dict)  # column -> filter text, only boxes with text
+    FILTER_HINT = (
+        "Filter this column, applied on Enter:\n"
+        "  text    rows containing it (any case)\n"
+        "  > 10    compare, also >= < <= = !=\n"
+        "  null    only nulls, !null for no nulls"
+    )
+
+    def __init__(self, table: QTableView, parent=None):
+        super().__init__(parent)
+        self.table = table
+        self.header = table.horizontalHeader()
+        self.columns: List[str] = []
+        self.edits: List[QLineEdit] = []
+        self.applied: Dict[str, str] = {}
+
+        #boxes live in a strip the width of the table's viewport, which clips them while scrolling
+        self.strip = QWidget(self)
+        self.setFixedHeight(QLineEdit().sizeHint().height())
+
+        self.header.sectionResized.connect(self._place_edits)
+        self.header.sectionMoved.connect(self._place_edits)
+        self.header.geometriesChanged.connect(self._place_edits)
+        table.horizontalScrollBar().valueChanged.connect(self._place_edits)
+
+    def set_columns(self, columns: List[str]):
+        """
+        show one empty box per column
+
+        args:
+            columns: column names of the displayed results, empty to remove the boxes
+        """
+        for edit in self.edits:
+            edit.deleteLater()
+        self.columns = list(columns)
+        self.edits = []
+        self.applied = {}
+        for column in self.columns:
+            edit = QLineEdit(self.strip)
+            edit.setPlaceholderText("Filter")
+            edit.setToolTip(self.FILTER_HINT)
+            edit.setClearButtonEnabled(True)
+            edit.editingFinished.connect(self._on_edited)
+            self.edits.append(edit)
+        self._place_edits()
+
+    def filters(self) -> Dict[str, str]:
+        """column -> text of every box that has some"""
+        return {
+            column: edit.text().strip()
+            for column, edit in zip(self.columns, self.edits) if edit.text().strip()
+        }
+
+    def _on_edited(self):
+        """announce the filters once they differ from the last applied ones"""
+        filters = self.filters()
+        if filters != self.applied:
+            self.applied = filters
+            self.filters_changed.emit(filters)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._place_edits()
+
+    def _place_edits(self):
+        """line each box up with its header section"""
+        #the table's scroll bar and header can still signal while the table is torn down at exit
+        if not (isValid(self.table) and isValid(self.header)):
+            return
+        viewport = self.table.viewport()
+        left = viewport.mapTo(self.table, viewport.rect().topLeft()).x() + self.table.x() - self.x()
+        self.strip.setGeometry(left, 0, viewport.width(), self.height())
+        for section, edit in enumerate(self.edits):
+            if self.header.isSectionHidden(section):
+                edit.hide()
+                continue
+            edit.setGeometry(
+                self.header.sectionViewportPosition(section), 0, self.header.sectionSize(section), self.height()
+            )
+            edit.show()
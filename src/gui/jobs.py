@@ -0,0 +1,29 @@
+from concurrent.futures import Future
+
+from PySide6.QtCore import QObject, Signal
+
+class JobWatcher(QObject):
+    """forwards the outcome of a DuckDBManager.submit() job to the gui thread"""
+    finished = Signal(object)  # job result
+    error = Signal(str)  # error message
+
+    def __init__(self, future: Future, parent=None):
+        super().__init__(parent)
+        self.future = future
+
+    def start(self):
+        """start forwarding, call after connecting the signals"""
+        #runs on the worker thread, the signals are queued to the gui thread
+        self.future.add_done_callback(self._on_done)
+
+    def _on_done(self, future: Future):
+        """emit finished or error for the completed future"""
+        if future.cancelled():
+            self.error.emit("Job was cancelled")
+            return
+
+        exc = future.exception()
+        if exc is not None:
+            self.error.emit(str(exc))
+        else:
+            self.finished.emit(future.result())
@@ -1,15 +1,20 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QSplitter, QTabWidget, QStatusBar
+    QSplitter, QTabWidget, QStatusBar, QProgressBar, QLabel
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPalette, QColor
+from PySide6.QtWidgets import QFileDialog, QMessageBox
+from PySide6.QtCore import Qt, QSettings
+from PySide6.QtGui import QPalette, QColor, QAction
+from pathlib import Path
 
 from src.database.duckdb_manager import DuckDBManager
+from src.database.query_cache import DEFAULT_CACHE_BYTES
+from src.database.remote import DEFAULT_BLOCK_CACHE_BYTES
 from src.gui.file_browser import FileBrowser
 from src.gui.query_editor import QueryEditor
 from src.gui.results_table import ResultsTable
-from src.gui.dashboard_view import DashboardView
+from src.utils.formatting import format_bytes
+from src.utils.instrumentation import tracer
 
 class MainWindow(QMainWindow):
     """main application window for Duckboard."""
@@ -19,20 +24,138 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Duckboard - Data Analytics")
         self.setGeometry(100, 100, 1400, 800)
 
-        #initalize db manager
-        self.db_manager = DuckDBManager()
+        #initalize db manager, reopening the last workspace if there was one
+        self.settings = QSettings()
+        workspace = self.settings.value("workspace/path", "")
+        cache_mb = int(self.settings.value("cache/max_mb", DEFAULT_CACHE_BYTES // 1024 ** 2))
+        block_cache_gb = int(self.settings.value("remote/disk_cache_gb", DEFAULT_BLOCK_CACHE_BYTES // 1024 ** 3))
+        self.db_manager = DuckDBManager(
+            workspace if workspace and Path(workspace).exists() else None,
+            cache_bytes=cache_mb * 1024 ** 2,
+            block_cache_bytes=block_cache_gb * 1024 ** 3,
+            #opt-in, the on-disk cache is a community extension downloaded on first use
+            disk_block_cache=self.settings.value("remote/disk_cache", False, type=bool)
+        )
+        self.last_execution_time = 0.0
 
         #apply theme
         self._apply_dark_theme()
 
         #setup ui
         self._init_ui()
+        self._init_menu()
 
         #status bar
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
 
+        #query progress, shown while a query runs
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setVisible(False)
+        self.status_bar.addPermanentWidget(self.progress_bar)
+
+        #where the last query's time went, stage by stage
+        self.timing_label = QLabel("")
+        self.timing_label.setStyleSheet("color: #888;")
+        self.status_bar.addPermanentWidget(self.timing_label)
+
+        #warm start, reuse unchanged tables and reload only stale sources
+        self._restore_workspace()
+
+    def _init_menu(self):
+        """init the menu bar"""
+        file_menu = self.menuBar().addMenu("&File")
+
+        open_action = QAction("&Open Workspace...", self)
+        open_action.triggered.connect(self._open_workspace)
+        file_menu.addAction(open_action)
+
+        close_action = QAction("&Close Workspace", self)
+        close_action.triggered.connect(lambda: self._switch_workspace(None))
+        file_menu.addAction(close_action)
+
+        file_menu.addSeparator()
+        remote_cache_action = QAction("&Remote Block Cache...", self)
+        remote_cache_action.triggered.connect(self._edit_remote_cache)
+        file_menu.addAction(remote_cache_action)
+
+        trace_action = QAction("Export Performance &Trace...", self)
+        trace_action.triggered.connect(self._export_trace)
+        file_menu.addAction(trace_action)
+
+    def _open_workspace(self):
+        """prompt for a workspace file, a new name creates an empty workspace"""
+        db_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Open or Create Workspace",
+            "",
+            "DuckDB Workspace (*.duckdb);;All Files (*)",
+            options=QFileDialog.Option.DontConfirmOverwrite
+        )
+        if db_path:
+            self._switch_workspace(db_path)
+
+    def _edit_remote_cache(self):
+        """choose whether remote blocks are cached on disk, and the disk budget"""
+        from src.gui.dialogs.remote_cache import RemoteCacheDialog
+
+        dialog = RemoteCacheDialog(
+            self.db_manager.disk_block_cache, self.db_manager.block_cache_bytes, self.db_manager.block_cache_dir, self
+        )
+        if dialog.exec() != RemoteCacheDialog.DialogCode.Accepted:
+            return
+        self.settings.setValue("remote/disk_cache", dialog.disk_cache)
+        self.settings.setValue("remote/disk_cache_gb", dialog.max_bytes // 1024 ** 3)
+        #a database that already read remote files keeps its cache until it is reopened, the budget applies now
+        self.db_manager.disk_block_cache = dialog.disk_cache
+        self.db_manager.block_cache_bytes = dialog.max_bytes
+
+    def _switch_workspace(self, db_path):
+        """reconnect the db manager to another workspace (None for in-memory)"""
+        #loads, exports, refreshes, charts, sorts and profiles all run on the worker pool
+        if self.db_manager.pending_jobs or self.query_editor.query_thread is not None:
+            QMessageBox.warning(
+                self, "Busy", "Wait for running loads, queries, exports and chart updates to finish first."
+            )
+            return
+
+        try:
+            #results hold cursors on the old database, clearing them stops their row counts
+            self.results_table.clear()
+            #charts read the old workspace's sources
+            if self.dashboard_view is not None:
+                self.dashboard_view.clear()
+            self.db_manager.open_workspace(db_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Workspace Error", f"Could not open workspace:\n\n{str(e)}")
+            self.db_manager.open_workspace(None)
+            db_path = None
+
+        self.settings.setValue("workspace/path", db_path or "")
+        self._restore_workspace()
+
+    def _restore_workspace(self):
+        """register catalog sources and reload the stale ones in the background"""
+        workspace = self.db_manager.db_path
+        self.setWindowTitle(f"Duckboard - {Path(workspace).name}" if self.db_manager.is_workspace else "Duckboard - Data Analytics")
+
+        stale = self.db_manager.restore_workspace()
+        self.file_browser.refresh_tables_list()
+        self.file_browser.source_watcher.sync()
+        for source in stale:
+            self.file_browser.start_load(source["source"], source["table_name"], source["mode"])
+
+        reused = len(self.db_manager.list_tables())
+        if self.db_manager.is_workspace:
+            missing = self.db_manager.missing_sources
+            self.status_bar.showMessage(
+                f"Opened workspace {Path(workspace).name} | {reused} table(s) reused, {len(stale)} reloading"
+                + (f" | source files missing for {', '.join(missing)}, kept as stored" if missing else "")
+            )
+
     def _apply_dark_theme(self):
         """apply dark color scheme"""
         palette  = QPalette()
@@ -74,15 +197,17 @@ class MainWindow(QMainWindow):
         self.tab_widget = QTabWidget()
 
         self.query_editor = QueryEditor(self.db_manager, self)
-        self.dashboard_view = DashboardView(self)
-
         self.tab_widget.addTab(self.query_editor, "SQL Query")
-        self.tab_widget.addTab(self.dashboard_view, "Dashboard")
+
+        #the dashboard pulls in matplotlib, so it's only built the first time its tab is opened
+        self.dashboard_view = None
+        self.dashboard_index = self.tab_widget.addTab(QWidget(), "Dashboard")
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
 
         center_right_splitter.addWidget(self.tab_widget)
 
         #bottom panel - results table
-        self.results_table = ResultsTable(self)
+        self.results_table = ResultsTable(self.db_manager, self)
         center_right_splitter.addWidget(self.results_table)
 
         #set initial sizes for center/right splitter (60% top, 40%, bottom)
@@ -97,22 +222,107 @@ class MainWindow(QMainWindow):
 
         #connect signals
         self.query_editor.query_executed.connect(self._on_query_executed)
+        #charts follow their sources, only the ones whose source changed re-run
+        self.file_browser.sources_changed.connect(self._refresh_dashboard)
+        self.query_editor.query_executed.connect(lambda *_: self._refresh_dashboard())
+        self.results_table.row_count_changed.connect(self._show_query_status)
+        self.results_table.rendered.connect(self._show_timings)
+        #polars outputs are queryable like any other source
+        self.results_table.frame_registered.connect(lambda _: self.file_browser.refresh_tables_list())
+        self.results_table.frame_registered.connect(lambda _: self._refresh_dashboard())
+        self.results_table.row_count_changed.connect(self._record_row_count)
+        self.results_table.refined.connect(self._on_results_refined)
+
+    def _on_tab_changed(self, index):
+        """build the dashboard on its first visit"""
+        if index == self.dashboard_index and self.dashboard_view is None:
+            self._build_dashboard()
+
+    def _build_dashboard(self):
+        """replace the dashboard tab's placeholder with the real view"""
+        #imported here so startup doesn't pay for matplotlib
+        from src.gui.dashboard_view import DashboardView
+
+        self.dashboard_view = DashboardView(self.db_manager, self)
+        placeholder = self.tab_widget.widget(self.dashboard_index)
+        self.tab_widget.blockSignals(True)
+        self.tab_widget.removeTab(self.dashboard_index)
+        self.tab_widget.insertTab(self.dashboard_index, self.dashboard_view, "Dashboard")
+        self.tab_widget.setCurrentIndex(self.dashboard_index)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+
+    def _refresh_dashboard(self):
+        """re-run the charts whose sources changed, if the dashboard was built"""
+        if self.dashboard_view is not None:
+            self.dashboard_view.refresh_stale()
 
     def _on_query_executed(self, result, execution_time: float):
         """handle query execution completion"""
         try:
             #display results in table
-            self.results_table.display_results(result)
+            self.last_execution_time = execution_time
+            self.results_table.display_results(result, self.query_editor.last_operation)
 
             #update status bar with row count from results table
-            row_count = self.results_table.full_result_count
-            self.status_bar.showMessage(
-                f"Query executed successfully | {row_count:,} rows | {execution_time:.3f}s"
-            )
+            self._show_query_status(self.results_table.full_result_count)
         except Exception as e:
             self.status_bar.showMessage(f"Error: {str(e)}")
 
+    def _show_query_status(self, row_count):
+        """show the last query's row count and time, the count may arrive later"""
+        if row_count is None:
+            rows = f"{self.results_table.model.rowCount():,}+ rows"
+        else:
+            rows = f"{row_count:,} rows"
+        result = self.results_table.current_results
+        cached = " (cached)" if result is not None and result.from_cache else ""
+        action = "Results sorted/filtered" if self.results_table.is_refined else "Query executed successfully"
+        self.status_bar.showMessage(
+            f"{action} | {rows} | {self.last_execution_time:.3f}s{cached}"
+        )
+
+    def _on_results_refined(self, seconds):
+        """show the time and row count of a sort or filter of the results"""
+        self.last_execution_time = seconds
+        self._show_query_status(self.results_table.full_result_count)
+
+    def _record_row_count(self, row_count):
+        """store the query's row count in its history entry, sorted or filtered counts aren't its own"""
+        if not self.results_table.is_refined:
+            self.query_editor.update_history_row_count(row_count)
+
+    def _show_timings(self, op):
+        """show the stage breakdown and memory of a query once its results are on screen"""
+        if op is None:
+            return
+        stages = "  ".join(f"{name} {seconds * 1000:,.0f}ms" for name, seconds in tracer.breakdown(op))
+        spans = tracer.operation_spans(op)
+        memory = []
+        if spans and spans[-1]["rss"] is not None:
+            memory.append(f"RSS {format_bytes(spans[-1]['rss'])}")
+        if spans and spans[-1]["duckdb_memory"] is not None:
+            memory.append(f"DuckDB {format_bytes(spans[-1]['duckdb_memory'])}")
+        self.timing_label.setText(" | ".join(part for part in (stages, "  ".join(memory)) if part))
+
+    def _export_trace(self):
+        """save the recorded spans as a chrome trace"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Performance Trace", "duckboard-trace.json", "Chrome Trace (*.json);;All Files (*)"
+        )
+        if not path:
+            return
+        try:
+            tracer.export_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Export Error", f"Could not write trace:\n\n{str(e)}")
+            return
+        self.status_bar.showMessage(f"Trace of {len(tracer.spans):,} spans written to {path} (open in ui.perfetto.dev)")
+
     def closeEvent(self, event):
         """handle application close"""
+        #row counts run on the database, stop them before it closes
+        self.results_table.clear()
         self.db_manager.close()
+        self.query_editor.query_history.close()
         event.accept()
@@ -1,13 +1,18 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QTextEdit, QPushButton,
-    QLabel, QListWidget, QSplitter, QMessageBox,
-    QHBoxLayout
+    QLabel, QListWidget, QListWidgetItem, QSplitter, QMessageBox,
+    QHBoxLayout, QSpinBox, QComboBox, QLineEdit
 )
-from PySide6.QtCore import Qt, Signal, QThread
+from PySide6.QtCore import Qt, Signal, QThread, QTimer, QStandardPaths
 from PySide6.QtGui import QFont
+from pathlib import Path
 import time
 
 from src.database.duckdb_manager import DuckDBManager
+from src.database.query_history import QueryHistory
+from src.gui.jobs import JobWatcher
+from src.gui.dialogs.query_profile import QueryProfileDialog
+from src.utils.instrumentation import tracer
 
 class QueryExecutorThread(QThread):
     """background thread for executing queries without blocking UI"""
@@ -18,27 +23,70 @@ class QueryExecutorThread(QThread):
         super().__init__()
         self.db_manager = db_manager
         self.query = query
+        self.op = tracer.new_operation()  # groups the query's spans with the results table's
+        #created up front so the ui can interrupt it, profiled for the history's bytes scanned
+        self.cursor = db_manager.cursor(profiling=True)
 
     def run(self):
         """execute query in background"""
+        result = None
+        handed_over = False
         try:
-            start_time = time.time()
-            result = self.db_manager.execute_query(self.query)
-            execution_time = time.time() - start_time
+            start_time = time.perf_counter()
+            with tracer.operation(self.op):
+                result = self.db_manager.execute_query(self.query, cursor=self.cursor)
+                #pull the first page here so the ui can show it without blocking
+                with tracer.span("fetch", "query"):
+                    result.fetch_next()
+            execution_time = time.perf_counter() - start_time
             self.finished.emit(result, execution_time)
+            handed_over = True
         except Exception as e:
             self.error.emit(str(e))
+        finally:
+            #the result owns the cursor once it reaches the ui, otherwise nothing does
+            if not handed_over:
+                if result is not None:
+                    result.close()
+                self.cursor.close()
+
+    def cancel(self):
+        """interrupt the running query"""
+        try:
+            self.cursor.interrupt()
+        except Exception:
+            pass  # already finished and closed
 
 class QueryEditor(QWidget):
     """sql query editor with history."""
     query_executed = Signal(object, float) # result, execution_time
+    MEMORY_LIMITS = ["Default", "1GB", "2GB", "4GB", "8GB", "16GB"]
+    PROGRESS_POLL_MS = 250  # status bar progress refresh interval
+    HISTORY_VIEWS = ["Recent", "Slowest"]
+    HISTORY_PAGE_SIZE = 200  # history entries loaded per scroll page
+    HISTORY_SEARCH_MS = 250  # wait for typing to pause before searching
 
     def __init__(self, db_manager: DuckDBManager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
-        self.query_history = []
+        #persisted across sessions, entries are paged into the list as it scrolls
+        history_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+        self.query_history = QueryHistory(str(Path(history_dir) / "history.sqlite"))
+        self.history_exhausted = False
+        self.last_history_id = None
+        self.last_operation = None  # tracer operation of the last finished query
         self.current_font_size = 11
         self.query_thread = None
+        self.profile_job = None
+        self.profile_cursor = None
+        self.cancel_reason = None
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self._on_query_timeout)
+        self.progress_timer = QTimer(self)
+        self.progress_timer.timeout.connect(self._poll_progress)
+        self.query_start_time = 0.0
+        self.scan_rows_estimate = None
         self._init_ui()
 
     def _init_ui(self):
@@ -57,8 +105,24 @@ class QueryEditor(QWidget):
         title.setStyleSheet("font-size: 14px; font-weight: bold; padding: 5px;")
         editor_layout.addWidget(title)
 
-        #font size controls
+        #execution limits and font size controls
         font_controls_layout = QHBoxLayout()
+
+        font_controls_layout.addWidget(QLabel("Timeout:"))
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(0, 24 * 3600)
+        self.timeout_spin.setSuffix(" s")
+        self.timeout_spin.setSpecialValueText("None")
+        self.timeout_spin.setToolTip("Cancel queries that run longer than this")
+        font_controls_layout.addWidget(self.timeout_spin)
+
+        font_controls_layout.addWidget(QLabel("Memory limit:"))
+        self.memory_limit_combo = QComboBox()
+        self.memory_limit_combo.setEditable(True)
+        self.memory_limit_combo.addItems(self.MEMORY_LIMITS)
+        self.memory_limit_combo.setToolTip("Maximum memory DuckDB may use, e.g. 4GB")
+        font_controls_layout.addWidget(self.memory_limit_combo)
+
         font_controls_layout.addStretch()
 
         self.decrease_font_btn = QPushButton("A-")
@@ -101,7 +165,21 @@ class QueryEditor(QWidget):
                 background-color: #1a72ca;                           
             }
         """)
-        editor_layout.addWidget(self.execute_btn)
+        #execute and cancel buttons
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(self.execute_btn, 1)
+
+        self.profile_btn = QPushButton("Profile")
+        self.profile_btn.setToolTip("Run the query with EXPLAIN ANALYZE and show per-operator timings")
+        self.profile_btn.clicked.connect(self._profile_query)
+        buttons_layout.addWidget(self.profile_btn)
+
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self._cancel_query)
+        buttons_layout.addWidget(self.cancel_btn)
+
+        editor_layout.addLayout(buttons_layout)
 
         splitter.addWidget(editor_widget)
 
@@ -113,9 +191,31 @@ class QueryEditor(QWidget):
         history_title.setStyleSheet("font-size: 12px; font-weight: bold; padding: 5px;")
         history_layout.addWidget(history_title)
 
+        #search and ordering
+        history_controls = QHBoxLayout()
+        self.history_search = QLineEdit()
+        self.history_search.setPlaceholderText("Search history...")
+        self.history_search.setClearButtonEnabled(True)
+        history_controls.addWidget(self.history_search, 1)
+
+        self.history_view_combo = QComboBox()
+        self.history_view_combo.addItems(self.HISTORY_VIEWS)
+        self.history_view_combo.setToolTip("Order by most recent or by execution time")
+        history_controls.addWidget(self.history_view_combo)
+        history_layout.addLayout(history_controls)
+
+        self.history_search_timer = QTimer(self)
+        self.history_search_timer.setSingleShot(True)
+        self.history_search_timer.timeout.connect(self._reload_history)
+        self.history_search.textChanged.connect(lambda: self.history_search_timer.start(self.HISTORY_SEARCH_MS))
+        self.history_view_combo.currentIndexChanged.connect(self._reload_history)
+
         self.history_list = QListWidget()
+        self.history_list.setUniformItemSizes(True)
         self.history_list.itemDoubleClicked.connect(self._load_query_from_history)
+        self.history_list.verticalScrollBar().valueChanged.connect(self._on_history_scrolled)
         history_layout.addWidget(self.history_list)
+        self._reload_history()
 
         splitter.addWidget(history_widget)
 
@@ -132,8 +232,15 @@ class QueryEditor(QWidget):
             QMessageBox.warning(self, "No Query", "Please enter a SQL query.")
             return
 
+        # apply the memory limit through the query's own cursor, a bad limit fails before anything runs
+        query_thread = QueryExecutorThread(self.db_manager, query)
+        if not self._apply_memory_limit(query_thread.cursor):
+            query_thread.cursor.close()
+            return
+
         # disable button during execution
         self.execute_btn.setEnabled(False)
+        self.profile_btn.setEnabled(False)
         self.execute_btn.setText("Executing...")
         self.window().status_bar.showMessage("Executing query...")
 
@@ -141,38 +248,232 @@ class QueryEditor(QWidget):
         self.current_query = query
 
         # execute query in background thread
-        self.query_thread = QueryExecutorThread(self.db_manager, query)
+        self.cancel_reason = None
+        self.query_thread = query_thread
         self.query_thread.finished.connect(self._on_query_finished)
         self.query_thread.error.connect(self._on_query_error)
+        self.query_start_time = time.perf_counter()
+        self.scan_rows_estimate = self.db_manager.estimate_scan_rows(query)
         self.query_thread.start()
+        self.cancel_btn.setEnabled(True)
+
+        # poll engine progress into the status bar
+        progress_bar = self.window().progress_bar
+        progress_bar.setRange(0, 0)  # busy until duckdb has an estimate
+        progress_bar.setVisible(True)
+        self.progress_timer.start(self.PROGRESS_POLL_MS)
+
+        if self.timeout_spin.value() > 0:
+            self.timeout_timer.start(self.timeout_spin.value() * 1000)
+
+    def _profile_query(self):
+        """run the query under EXPLAIN ANALYZE on the worker pool and show its operator tree"""
+        query = self.query_text.toPlainText().strip()
+
+        if not query:
+            QMessageBox.warning(self, "No Query", "Please enter a SQL query.")
+            return
+
+        self.profile_cursor = self.db_manager.cursor()
+        if not self._apply_memory_limit(self.profile_cursor):
+            self.profile_cursor.close()
+            self.profile_cursor = None
+            return
+        try:
+            future = self.db_manager.submit(self.db_manager.profile_query, query, self.profile_cursor)
+        except RuntimeError as e:
+            self.profile_cursor.close()
+            self.profile_cursor = None
+            QMessageBox.warning(self, "Busy", str(e))
+            return
+
+        self.execute_btn.setEnabled(False)
+        self.profile_btn.setEnabled(False)
+        self.profile_btn.setText("Profiling...")
+        self.cancel_btn.setEnabled(True)
+        self.cancel_reason = None
+        self.window().status_bar.showMessage("Profiling query...")
+        if self.timeout_spin.value() > 0:
+            self.timeout_timer.start(self.timeout_spin.value() * 1000)
+
+        self.profile_job = JobWatcher(future, self)
+        self.profile_job.finished.connect(self._on_profile_finished)
+        self.profile_job.error.connect(self._on_profile_error)
+        self.profile_job.start()
+
+    def _apply_memory_limit(self, cursor):
+        """
+        set the chosen memory limit before a query or profile run
+
+        args:
+            cursor: cursor the run will use
+        returns:
+            False if the limit was rejected, after telling the user
+        """
+        memory_limit = self.memory_limit_combo.currentText().strip()
+        try:
+            self.db_manager.set_memory_limit(
+                None if memory_limit == self.MEMORY_LIMITS[0] else memory_limit, cursor=cursor
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Invalid memory limit", f"Could not set the memory limit:\n\n{e}")
+            self.window().status_bar.showMessage("Invalid memory limit")
+            return False
+        return True
+
+    def _end_profile(self):
+        """release the profile cursor and re-enable execution"""
+        self.profile_cursor.close()
+        self.profile_cursor = None
+        self.profile_job = None
+        self.profile_btn.setText("Profile")
+        self._reset_execute_state()
+
+    def _on_profile_finished(self, profile):
+        """show the operator tree of a profiled query"""
+        self._end_profile()
+        self.window().status_bar.showMessage(f"Query profiled in {profile.get('latency', 0.0):.3f}s")
+        QueryProfileDialog(profile, self).exec()
+
+    def _on_profile_error(self, error_msg):
+        """handle a failed or cancelled profile run"""
+        self._end_profile()
+        if self.cancel_reason:
+            self.window().status_bar.showMessage(self.cancel_reason)
+        else:
+            QMessageBox.critical(self, "Profile error", f"Error profiling query:\n\n{error_msg}")
+            self.window().status_bar.showMessage("Profile failed")
+
+    def _interrupt(self, reason):
+        """interrupt the running query or profile run"""
+        self.cancel_reason = reason
+        if self.query_thread is not None:
+            self.query_thread.cancel()
+        elif self.profile_cursor is not None:
+            self.profile_cursor.interrupt()
+
+    def _cancel_query(self):
+        """cancel the running query"""
+        self._interrupt("Query cancelled")
+
+    def _on_query_timeout(self):
+        """cancel the running query once it exceeds the timeout"""
+        self._interrupt(f"Query timed out after {self.timeout_spin.value()}s")
+
+    def _poll_progress(self):
+        """show percent complete, rows scanned and elapsed time for the running query"""
+        if self.query_thread is None:
+            return
+
+        elapsed = time.perf_counter() - self.query_start_time
+        try:
+            progress = self.query_thread.cursor.query_progress()
+        except Exception:
+            progress = -1
+
+        message = f"Executing query... {elapsed:.1f}s"
+        progress_bar = self.window().progress_bar
+        #duckdb reports -1 until it has an estimate
+        if progress >= 0:
+            progress_bar.setRange(0, 100)
+            progress_bar.setValue(int(progress))
+            message += f" | {progress:.0f}%"
+            if self.scan_rows_estimate:
+                scanned = int(self.scan_rows_estimate * progress / 100)
+                message += f" | ~{scanned:,} of {self.scan_rows_estimate:,} rows scanned"
+        self.window().status_bar.showMessage(message)
+
+    def _reset_execute_state(self):
+        """re-enable execution once a query has finished or failed"""
+        self.progress_timer.stop()
+        self.window().progress_bar.setVisible(False)
+        self.timeout_timer.stop()
+        self.cancel_btn.setEnabled(False)
+        self.execute_btn.setEnabled(True)
+        self.profile_btn.setEnabled(True)
+        self.execute_btn.setText("Execute Query")
+        self.query_thread = None
 
     def _on_query_finished(self, result, execution_time):
         """handle successful query execution"""
-        # add to history
-        self.query_history.append(self.current_query)
-        self.history_list.addItem(f"{self.current_query[:50]}..." if len(self.current_query) > 50 else self.current_query)
+        # add to history, the row count of a long result is filled in once counted
+        self.last_history_id = self.query_history.add(
+            self.current_query, execution_time, result.total_rows, result.bytes_scanned
+        )
+        self._reload_history()
 
         # emit signal with results
+        self.last_operation = self.query_thread.op
         self.query_executed.emit(result, execution_time)
 
         # re-enable button
-        self.execute_btn.setEnabled(True)
-        self.execute_btn.setText("Execute Query")
-        self.query_thread = None
+        self._reset_execute_state()
 
     def _on_query_error(self, error_msg):
         """handle query execution error"""
-        QMessageBox.critical(self, "Query error", f"Error executing query:\n\n{error_msg}")
-        self.window().status_bar.showMessage("Query failed")
-        self.execute_btn.setEnabled(True)
-        self.execute_btn.setText("Execute Query")
-        self.query_thread = None
+        if self.cancel_reason:
+            #interrupted on purpose, no need for an error dialog
+            self.window().status_bar.showMessage(self.cancel_reason)
+        else:
+            QMessageBox.critical(self, "Query error", f"Error executing query:\n\n{error_msg}")
+            self.window().status_bar.showMessage("Query failed")
+        self._reset_execute_state()
+
+    def update_history_row_count(self, row_count):
+        """record the row count of the last query once it is known"""
+        if self.last_history_id is not None and row_count is not None:
+            self.query_history.update_row_count(self.last_history_id, row_count)
+
+    def _reload_history(self):
+        """reload the history list from the first page"""
+        self.history_list.clear()
+        self.history_exhausted = False
+        self._load_history_page()
+
+    def _load_history_page(self):
+        """append the next page of history entries for the current search and view"""
+        if self.history_exhausted:
+            return
+
+        offset = self.history_list.count()
+        slowest = self.history_view_combo.currentText() == "Slowest"
+        entries = self.query_history.search(
+            self.history_search.text(), self.HISTORY_PAGE_SIZE, offset, slowest=slowest
+        )
+        self.history_exhausted = len(entries) < self.HISTORY_PAGE_SIZE
+
+        for entry in entries:
+            query = " ".join(entry["query"].split())
+            item = QListWidgetItem(f"{query[:50]}..." if len(query) > 50 else query)
+            item.setData(Qt.ItemDataRole.UserRole, entry["query"])
+            item.setToolTip(self._history_tooltip(entry))
+            self.history_list.addItem(item)
+
+    def _history_tooltip(self, entry):
+        """execution statistics shown when hovering a history entry"""
+        executed_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["executed_at"]))
+        rows = f"{entry['row_count']:,}" if entry["row_count"] is not None else "unknown"
+        lines = [
+            entry["query"][:500],
+            "",
+            f"Executed: {executed_at}",
+            f"Time: {entry['execution_time']:.3f}s",
+            f"Rows: {rows}",
+        ]
+        if entry["bytes_scanned"] is not None:
+            lines.append(f"Scanned: {entry['bytes_scanned'] / 1024 ** 2:,.1f} MB")
+        return "\n".join(lines)
+
+    def _on_history_scrolled(self, value):
+        """load more history when the list is scrolled to the bottom"""
+        if value >= self.history_list.verticalScrollBar().maximum():
+            self._load_history_page()
 
     def _load_query_from_history(self, item):
         """load a query from history into the editor"""
-        index = self.history_list.row(item)
-        if 0 <= index < len(self.query_history):
-            self.query_text.setPlainText(self.query_history[index])
+        query = item.data(Qt.ItemDataRole.UserRole)
+        if query:
+            self.query_text.setPlainText(query)
 
     def _increase_font_size(self):
         """increase the sql editor font size"""
@@ -0,0 +1,125 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from src.database.result_set import ResultSet
+from src.utils.instrumentation import tracer
+
+
+class ArrowTableModel(QAbstractTableModel):
+    """
+    read-only table model backed by the arrow batches of a result set
+
+    cells are never materialized up front, the view only asks data() for the
+    rows it is painting, and those rows are converted to python values one
+    small block at a time. more batches are pulled from the engine through
+    canFetchMore/fetchMore as the view scrolls towards the end
+    """
+    BLOCK_SIZE = 256  # rows converted to python per block
+    MAX_CACHED_BLOCKS = 32  # keeps memory flat while scrolling
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._result: Optional[ResultSet] = None
+        self._columns: List[str] = []
+        self._offsets: List[int] = []  # first row of each fetched batch
+        self._rows = 0
+        self._blocks: OrderedDict = OrderedDict()  # (batch, block) -> list of column value lists
+
+    def set_result(self, result: Optional[ResultSet]):
+        """
+        replace the backing result set
+
+        args:
+            result: result set to display, or None to clear the model
+        """
+        self.beginResetModel()
+        self._result = result
+        self._columns = list(result.columns) if result is not None else []
+        self._offsets = []
+        self._rows = 0
+        self._blocks.clear()
+        if result is not None:
+            self._index_batches()
+        self.endResetModel()
+
+    @property
+    def columns(self) -> List[str]:
+        """column names of the backing result"""
+        return self._columns
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self._rows
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid() or self._result is None:
+            return False
+        return not self._result.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._result is None:
+            return
+
+        with tracer.span("fetch", "ui"):
+            self._result.fetch_next()
+        #fetch_next may append a second batch while confirming the end, insert every row that arrived
+        new_rows = sum(batch.num_rows for batch in self._result.batches[len(self._offsets):])
+        if new_rows == 0:
+            self._index_batches()
+            return
+
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + new_rows - 1)
+        self._index_batches()
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        row = index.row()
+        batch_index = bisect_right(self._offsets, row) - 1
+        block_index, offset = divmod(row - self._offsets[batch_index], self.BLOCK_SIZE)
+        block = self._get_block(batch_index, block_index)
+        return str(block[index.column()][offset])
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole) -> Any:
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            if 0 <= section < len(self._columns):
+                return self._columns[section]
+            return None
+        return str(section + 1)
+
+    def _index_batches(self):
+        """record row offsets for batches fetched since the last call"""
+        for batch in self._result.batches[len(self._offsets):]:
+            self._offsets.append(self._rows)
+            self._rows += batch.num_rows
+
+    def _get_block(self, batch_index: int, block_index: int) -> List[list]:
+        """convert one block of rows to python values, caching recent blocks"""
+        key = (batch_index, block_index)
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            return block
+
+        #slicing is zero-copy, only the block itself is converted
+        batch = self._result.batches[batch_index]
+        sliced = batch.slice(block_index * self.BLOCK_SIZE, self.BLOCK_SIZE)
+        block = [column.to_pylist() for column in sliced.columns]
+
+        self._blocks[key] = block
+        if len(self._blocks) > self.MAX_CACHED_BLOCKS:
+            self._blocks.popitem(last=False)
+        return block
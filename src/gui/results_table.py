@@ -1,17 +1,85 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
-    QLabel, QHBoxLayout, QPushButton, QFileDialog, QMessageBox
+    QWidget, QVBoxLayout, QTableView, QLabel, QDialog,
+    QHBoxLayout, QPushButton, QFileDialog, QMessageBox, QProgressDialog
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QEvent, QThread, QTimer, Qt, Signal
+import os
+import time
+
+from src.database.duckdb_manager import DuckDBManager
+from src.database.refine import can_refine, refine_query
+from src.gui.filter_bar import FilterBar
+from src.gui.jobs import JobWatcher
+from src.gui.results_model import ArrowTableModel
+from src.gui.dialogs.export_options import ExportOptionsDialog
+from src.gui.dialogs.polars_transform import PolarsTransformDialog
+from src.utils.instrumentation import tracer
+
+def with_extension(path: str, extension: str) -> str:
+    """
+    complete an export path's extension
+
+    args:
+        path: chosen file name
+        extension: full extension of the export, e.g. .csv.gz
+    returns:
+        path with the extension added when it has none, or lacks the compression suffix
+        (results.csv becomes results.csv.gz), other names are left as typed
+    """
+    name = os.path.basename(path).lower()
+    if name.endswith(extension):
+        return path
+    base = extension[:extension.index(".", 1)] if "." in extension[1:] else extension
+    if name.endswith(base):
+        return path + extension[len(base):]
+    if "." not in name:
+        return path + extension
+    return path
+
+class RowCountThread(QThread):
+    """background thread that counts a result without fetching it"""
+    counted = Signal(object, object)  # result, row count (None if unknown)
+    skipped = Signal(object)  # result too costly to count unasked
+
+    def __init__(self, result, force=False, parent=None):
+        super().__init__(parent)
+        self.result = result
+        self.force = force
+
+    def run(self):
+        """count rows in background, plain scans only unless forced"""
+        if self.force or self.result.is_plain_scan():
+            if not self.isInterruptionRequested():
+                self.counted.emit(self.result, self.result.count_rows())
+        else:
+            self.skipped.emit(self.result)
 
 class ResultsTable(QWidget):
     """table widge for displaying query results"""
-    MAX_DISPLAY_ROWS = 10000  # limit display to prevent UI freeze
+    RESIZE_SAMPLE_ROWS = 100  # rows inspected when sizing columns to content
+    PROGRESS_POLL_MS = 200  # export progress refresh interval
+    row_count_changed = Signal(object)  # total row count, None while unknown
+    rendered = Signal(object)  # tracer operation of results that were just painted
+    frame_registered = Signal(str)  # table name of a polars transform's output
+    refined = Signal(float)  # seconds a sort or filter took to show its first page
 
-    def __init__(self, parent=None):
+    def __init__(self, db_manager: DuckDBManager, parent=None):
         super().__init__(parent)
+        self.db_manager = db_manager
         self.current_results = None
-        self.full_result_count = 0
+        self.export_job = None
+        self.export_cursor = None
+        self.polars_job = None
+        self.export_progress = None
+        self.full_result_count = None
+        self.count_threads = []  # running row counts, deleted once they finish
+        self.counting = False
+        self.pending_render = None  # (operation, start) of results not painted yet
+        #sorting and filtering re-run the editor's query wrapped with ORDER BY / WHERE
+        self.base_query = None
+        self.sort = None  # (column, descending)
+        self.refine_job = None
+        self.refine_cursor = None
         self._init_ui()
 
     def _init_ui(self):
@@ -27,6 +95,12 @@ class ResultsTable(QWidget):
 
         header_layout.addStretch()
 
+        self.polars_btn = QPushButton("Send to Polars...")
+        self.polars_btn.setToolTip("Transform the results with a Polars expression and query the output as a table")
+        self.polars_btn.clicked.connect(self._send_to_polars)
+        self.polars_btn.setEnabled(False)
+        header_layout.addWidget(self.polars_btn)
+
         self.export_btn = QPushButton("Export Results...")
         self.export_btn.clicked.connect(self._export_results)
         self.export_btn.setEnabled(False)
@@ -34,109 +108,477 @@ class ResultsTable(QWidget):
 
         layout.addLayout(header_layout)
 
-        #results table
-        self.table = QTableWidget()
+        #results table, cells are formatted lazily by the model
+        self.model = ArrowTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setAlternatingRowColors(True)
+        header = self.table.horizontalHeader()
+        header.setResizeContentsPrecision(self.RESIZE_SAMPLE_ROWS)
+        #header clicks sort in the engine, not in the model
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self._on_header_clicked)
+        self.model.rowsInserted.connect(self._on_rows_fetched)
+        #the first paint after new results ends their render span
+        self.table.viewport().installEventFilter(self)
+
+        self.filter_bar = FilterBar(self.table, self)
+        self.filter_bar.filters_changed.connect(self._refine)
+        self.filter_bar.setVisible(False)
+        layout.addWidget(self.filter_bar)
         layout.addWidget(self.table)
 
         #info label
+        info_layout = QHBoxLayout()
         self.info_label = QLabel("No results")
         self.info_label.setStyleSheet("font-size: 11px; color: #888; padding: 5px;")
-        layout.addWidget(self.info_label)
+        info_layout.addWidget(self.info_label)
+        info_layout.addStretch()
+
+        #joins, aggregations and sorts are only counted on request, it runs them again in full
+        self.count_btn = QPushButton("Count Rows")
+        self.count_btn.setToolTip("Run the query again to count all of its rows")
+        self.count_btn.clicked.connect(lambda: self._count_rows(force=True))
+        self.count_btn.setVisible(False)
+        info_layout.addWidget(self.count_btn)
+        layout.addLayout(info_layout)
 
-    def display_results(self, result):
+    def display_results(self, result, op=None):
         """
         display query results in the table
 
         args:
-            result: duckdb query result object
+            result: streaming result set, only the first page needs to be fetched
+            op: tracer operation of the query, the model and render spans join it
+        """
+        self._cancel_refine()
+        self.base_query = result.query
+        self.sort = None
+        self._apply_sort_indicator()
+        refinable = result.returns_rows and can_refine(result.query)
+        self.filter_bar.set_columns(result.columns if refinable else [])
+        self.filter_bar.setVisible(refinable)
+        self._show_result(result, op)
+
+    @property
+    def is_refined(self) -> bool:
+        """whether the shown rows are a sorted or filtered version of the query's"""
+        return self.current_results is not None and self.current_results.query != self.base_query
+
+    def _show_result(self, result, op=None, resize=True):
+        """
+        put a result set in the table
+
+        args:
+            result: streaming result set
+            op: tracer operation of the query
+            resize: size the columns to the new rows, off for sorted or filtered rows of the same query
         """
         try:
-            #fetch all rows
-            rows = result.fetchall()
-            columns = [desc[0] for desc in result.description]
-
-            #store for export (all rows)
-            self.current_results = (rows, columns)
-            self.full_result_count = len(rows)
-
-            #limit displayed rows to prevent UI freeze
-            display_rows = rows[:self.MAX_DISPLAY_ROWS]
-            truncated = len(rows) > self.MAX_DISPLAY_ROWS
-
-            #show warning if truncated
-            if truncated:
-                QMessageBox.warning(
-                    self,
-                    "Large Result Set",
-                    f"Query returned {len(rows):,} rows.\n\n"
-                    f"Displaying first {self.MAX_DISPLAY_ROWS:,} rows to prevent UI freeze.\n\n"
-                    f"Use 'Export Results' to save all {len(rows):,} rows."
-                )
-
-            #update the table
-            self.table.clear()
-            self.table.setRowCount(len(display_rows))
-            self.table.setColumnCount(len(columns))
-            self.table.setHorizontalHeaderLabels(columns)
-
-            #populate table (limited rows)
-            for row_idx, row in enumerate(display_rows):
-                for col_idx, value in enumerate(row):
-                    item = QTableWidgetItem(str(value))
-                    item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                    self.table.setItem(row_idx, col_idx, item)
-
-            #resize colums to content
-            self.table.resizeColumnsToContents()
-
-            #update info
-            if truncated:
-                self.info_label.setText(
-                    f"Showing {len(display_rows):,} of {len(rows):,} row(s), {len(columns)} column(s)"
-                )
-            else:
-                self.info_label.setText(f"{len(rows):,} row(s), {len(columns)} column(s)")
-
-            self.export_btn.setEnabled(True)
+            #release the previous result before showing the new one
+            self._release_results()
+
+            self.current_results = result
+            self.full_result_count = result.total_rows
+
+            with tracer.span("model", "ui", op=op):
+                #the model pulls further batches on demand as the view scrolls
+                self.model.set_result(result)
+
+                #resize colums to content (sampled, see RESIZE_SAMPLE_ROWS)
+                if resize:
+                    self.table.resizeColumnsToContents()
+            self.pending_render = (op, tracer.now())
+
+            #count the full result on a side cursor when the first page didn't finish it
+            self.counting = False
+            if self.full_result_count is None:
+                self._count_rows()
+
+            self._update_info()
+            self.export_btn.setEnabled(result.returns_rows and self.export_job is None)
+            self.polars_btn.setEnabled(result.returns_rows and self.polars_job is None)
 
         except Exception as e:
             self.info_label.setText(f"Error displaying results: {str(e)}")
             self.export_btn.setEnabled(False)
+            self.polars_btn.setEnabled(False)
+
+    def _on_header_clicked(self, section):
+        """cycle a column through ascending, descending and the query's own order"""
+        if not self.filter_bar.columns:
+            return
+        column = self.model.columns[section]
+        if self.sort is None or self.sort[0] != column:
+            self.sort = (column, False)
+        elif not self.sort[1]:
+            self.sort = (column, True)
+        else:
+            self.sort = None
+        self._apply_sort_indicator()
+        self._refine()
+
+    def _apply_sort_indicator(self):
+        """show the current sort on the header"""
+        header = self.table.horizontalHeader()
+        if self.sort is None:
+            header.setSortIndicatorShown(False)
+            return
+        column, descending = self.sort
+        header.setSortIndicatorShown(True)
+        order = Qt.SortOrder.DescendingOrder if descending else Qt.SortOrder.AscendingOrder
+        header.setSortIndicator(self.model.columns.index(column), order)
+
+    def _refine(self):
+        """re-run the query with the current filters and sort applied by the engine"""
+        if self.base_query is None:
+            return
+        try:
+            query = refine_query(self.base_query, self.filter_bar.filters(), self.sort)
+        except ValueError as e:
+            QMessageBox.warning(self, "Sort and Filter", str(e))
+            return
+
+        #a newer sort or filter supersedes one still running
+        self._cancel_refine()
+        cursor = self.db_manager.cursor()
+        try:
+            future = self.db_manager.submit(self._run_refine, query, cursor)
+        except RuntimeError as e:
+            cursor.close()
+            QMessageBox.warning(self, "Busy", str(e))
+            return
+
+        self.refine_cursor = cursor
+        job = JobWatcher(future, self)
+        job.finished.connect(lambda outcome, job=job: self._on_refined(job, outcome))
+        job.error.connect(lambda error_msg, job=job: self._on_refine_error(job, error_msg))
+        self.refine_job = job
+        self.info_label.setText("Sorting and filtering...")
+        job.start()
+
+    def _run_refine(self, query, cursor):
+        """sort/filter job, runs on the db manager's worker pool"""
+        op = tracer.new_operation()
+        start_time = time.perf_counter()
+        with tracer.operation(op):
+            result = self.db_manager.execute_query(query, cursor=cursor)
+            try:
+                #first page only, the rest streams in as the view scrolls
+                with tracer.span("fetch", "query"):
+                    result.fetch_next()
+            except Exception:
+                result.close()
+                raise
+        return result, op, time.perf_counter() - start_time
+
+    def _cancel_refine(self):
+        """interrupt a sort or filter still running, its outcome is ignored"""
+        if self.refine_cursor is not None:
+            self.refine_cursor.interrupt()
+        self.refine_job = None
+        self.refine_cursor = None
+
+    def _on_refined(self, job, outcome):
+        """show sorted or filtered rows"""
+        result, op, seconds = outcome
+        if job is not self.refine_job:
+            result.close()
+            return
+        self.refine_job = None
+        self.refine_cursor = None
+        self._show_result(result, op, resize=False)
+        self._apply_sort_indicator()
+        self.refined.emit(seconds)
+
+    def _on_refine_error(self, job, error_msg):
+        """handle a failed sort or filter"""
+        if job is not self.refine_job:
+            return
+        self.refine_job = None
+        self.refine_cursor = None
+        self._update_info()
+        QMessageBox.warning(self, "Sort and Filter", f"Could not sort or filter the results:\n\n{error_msg}")
+
+    def eventFilter(self, obj, event):
+        """notice the first paint of new results"""
+        if event.type() == QEvent.Type.Paint and self.pending_render is not None:
+            #queued, so it runs once this paint has finished
+            QTimer.singleShot(0, self._end_render)
+        return super().eventFilter(obj, event)
+
+    def _end_render(self):
+        """record how long new results took to reach the screen"""
+        if self.pending_render is None:
+            return
+        op, start = self.pending_render
+        self.pending_render = None
+        tracer.record("render", start, tracer.now(), "ui", op)
+        self.rendered.emit(op)
+
+    def _count_rows(self, force=False):
+        """
+        count the current result on a side cursor
+
+        args:
+            force: count queries that aren't plain scans too, which runs them again
+        """
+        self.counting = True
+        count_thread = RowCountThread(self.current_results, force, self)
+        count_thread.counted.connect(self._on_row_count)
+        count_thread.skipped.connect(self._on_count_skipped)
+        count_thread.finished.connect(lambda count_thread=count_thread: self._on_count_thread_done(count_thread))
+        self.count_threads.append(count_thread)
+        count_thread.start()
+        self._update_info()
+
+    def _on_count_thread_done(self, count_thread):
+        """forget a finished row count thread"""
+        if count_thread in self.count_threads:
+            self.count_threads.remove(count_thread)
+        count_thread.deleteLater()
+
+    def _stop_count_threads(self):
+        """wait for running row counts, their results were closed so they end quickly"""
+        for count_thread in self.count_threads:
+            count_thread.requestInterruption()
+        for count_thread in self.count_threads:
+            count_thread.wait()
+
+    def _on_count_skipped(self, result):
+        """leave a costly result uncounted until the user asks"""
+        if result is not self.current_results:
+            return
+        self.counting = False
+        self._update_info()
+
+    def _on_row_count(self, result, row_count):
+        """handle the side-channel row count"""
+        if result is not self.current_results:
+            return
+        self.counting = False
+        self.full_result_count = row_count
+        self._update_info()
+        self.row_count_changed.emit(row_count)
+
+    def _on_rows_fetched(self):
+        """handle batches pulled in while scrolling"""
+        if self.full_result_count is None and self.current_results.total_rows is not None:
+            #the stream finished before the side count did
+            self.full_result_count = self.current_results.total_rows
+            self.row_count_changed.emit(self.full_result_count)
+        self._update_info()
+
+    def _update_info(self):
+        """update the info label with loaded and total rows"""
+        result = self.current_results
+        loaded = self.model.rowCount()
+        columns = self.model.columnCount()
+
+        self.count_btn.setVisible(
+            result is not None and result.returns_rows and self.full_result_count is None and not self.counting
+        )
+        if self.full_result_count is None:
+            total = "counting total..." if self.counting else "total unknown"
+            self.info_label.setText(f"Showing {loaded:,} row(s), {total}, {columns} column(s)")
+        elif loaded < self.full_result_count:
+            self.info_label.setText(
+                f"Showing {loaded:,} of {self.full_result_count:,} row(s), {columns} column(s) - scroll to load more"
+            )
+        elif result is not None and not result.returns_rows:
+            self.info_label.setText("Statement executed, no rows returned")
+        else:
+            self.info_label.setText(f"{self.full_result_count:,} row(s), {columns} column(s)")
+
+    def _release_results(self):
+        """close the current result set and its cursor, stale counts are ignored"""
+        if self.current_results is not None:
+            self.current_results.close()
 
     def _export_results(self):
-        """export current results to file"""
-        if not self.current_results:
-            return
-        
-        file_path, selected_filter = QFileDialog.getSaveFileName(
-            self,
-            "Export Results",
-            "",
-            "CSV Files (*.csv);;Parquet Files (*.parquet);;All Files (*)"
+        """export current results to file, re-running the query in the engine unless every row is fetched"""
+        if not self.current_results or not self.current_results.returns_rows:
+            return
+
+        options_dialog = ExportOptionsDialog(self.current_results.columns, self)
+        if options_dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        export_format = options_dialog.format
+        partition_by = options_dialog.partition_by
+
+        #partitioned output is a directory of files
+        if partition_by:
+            output_path = QFileDialog.getExistingDirectory(self, "Export Results To Directory")
+        else:
+            filters = {
+                "csv": "CSV Files",
+                "parquet": "Parquet Files",
+                "arrow": "Arrow Files",
+            }
+            extension = options_dialog.file_extension
+            output_path, _ = QFileDialog.getSaveFileName(
+                self,
+                "Export Results",
+                f"results{extension}",
+                f"{filters[export_format]} (*{extension});;All Files (*)"
+            )
+            if output_path:
+                output_path = with_extension(output_path, extension)
+
+        if not output_path:
+            return
+
+        options = {
+            "format": export_format,
+            "compression": options_dialog.compression,
+            "row_group_size": options_dialog.row_group_size,
+            "partition_by": partition_by,
+        }
+
+        #a fully fetched result is written from the batches the table already holds
+        if self.current_results.complete:
+            options["table"] = self.current_results.arrow()
+
+        #the export gets its own cursor so the ui can poll progress and interrupt it
+        self.export_cursor = self.db_manager.cursor()
+        try:
+            future = self.db_manager.submit(
+                self._run_export, self.current_results.query, output_path, options, self.export_cursor
+            )
+        except RuntimeError as e:
+            self.export_cursor.close()
+            QMessageBox.warning(self, "Busy", str(e))
+            return
+
+        self.export_btn.setEnabled(False)
+        self.export_job = JobWatcher(future, self)
+        self.export_job.finished.connect(self._on_export_finished)
+        self.export_job.error.connect(self._on_export_error)
+
+        #progress dialog polls the engine's progress for the export cursor
+        self.export_progress = QProgressDialog("Exporting results...", "Cancel", 0, 100, self)
+        self.export_progress.setWindowTitle("Export")
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.canceled.connect(self.export_cursor.interrupt)
+        self.export_timer = QTimer(self)
+        self.export_timer.timeout.connect(self._poll_export_progress)
+        self.export_timer.start(self.PROGRESS_POLL_MS)
+
+        self.export_job.start()
+
+    def _run_export(self, query, output_path, options, cursor):
+        """export job, runs on the db manager's worker pool"""
+        try:
+            start_time = time.perf_counter()
+            with tracer.operation():
+                self.db_manager.export_result(query, output_path, cursor=cursor, **options)
+            return output_path, time.perf_counter() - start_time
+        finally:
+            cursor.close()
+
+    def _poll_export_progress(self):
+        """update the progress dialog from the engine"""
+        if self.export_job is None:
+            return
+        try:
+            progress = self.export_cursor.query_progress()
+        except Exception:
+            return
+        #duckdb reports -1 until it has an estimate
+        if progress >= 0:
+            self.export_progress.setValue(int(progress))
+
+    def _end_export(self):
+        """tear down export progress ui"""
+        self.export_timer.stop()
+        self.export_progress.canceled.disconnect()
+        self.export_progress.close()
+        self.export_job = None
+        self.export_cursor = None
+        self.export_btn.setEnabled(self.current_results is not None and self.current_results.returns_rows)
+
+    def _on_export_finished(self, outcome):
+        """handle successful export"""
+        output_path, export_time = outcome
+        self._end_export()
+        QMessageBox.information(
+            self, "Export Successful", f"Results exported to:\n{output_path}\n\n({export_time:.2f}s)"
         )
 
-        if file_path:
-            try:
-                rows, columns = self.current_results
-
-                #simple csv export
-                # TODO: use duckdb export for better performance
-                import csv
-                with open(file_path, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(columns)
-                    writer.writerows(rows)
-
-                QMessageBox.information(self, "Export Successful", f"Results exported to:\n{file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Export Error", f"Error exporting results:\n\n{str(e)}")
-    
+    def _on_export_error(self, error_msg):
+        """handle export error"""
+        self._end_export()
+        QMessageBox.critical(self, "Export Error", f"Error exporting results:\n\n{error_msg}")
+
+    def _send_to_polars(self):
+        """transform the results with a polars expression on the worker pool"""
+        result = self.current_results
+        if not result or not result.returns_rows:
+            return
+
+        dialog = PolarsTransformDialog(result.columns, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        #reuse the fetched batches when they are the whole result, otherwise the job fetches it
+        table = result.arrow() if result.complete else None
+        try:
+            future = self.db_manager.submit(
+                self._run_polars, result.query, table, dialog.expression, dialog.table_name
+            )
+        except RuntimeError as e:
+            QMessageBox.warning(self, "Busy", str(e))
+            return
+
+        self.polars_btn.setEnabled(False)
+        self.window().status_bar.showMessage("Running Polars transform...")
+        self.polars_job = JobWatcher(future, self)
+        self.polars_job.finished.connect(self._on_polars_finished)
+        self.polars_job.error.connect(self._on_polars_error)
+        self.polars_job.start()
+
+    def _run_polars(self, query, table, expression, table_name):
+        """polars transform job, runs on the db manager's worker pool"""
+        start_time = time.perf_counter()
+        with tracer.operation():
+            if table is None:
+                result = self.db_manager.execute_query(query)
+                try:
+                    table = result.read_all()
+                finally:
+                    result.close()
+            self.db_manager.polars_transform(table, expression, table_name)
+        return table_name, time.perf_counter() - start_time
+
+    def _on_polars_finished(self, outcome):
+        """handle a registered polars output"""
+        table_name, transform_time = outcome
+        self.polars_job = None
+        self.polars_btn.setEnabled(self.current_results is not None and self.current_results.returns_rows)
+        self.window().status_bar.showMessage(f"Polars output registered as {table_name} ({transform_time:.2f}s)")
+        self.frame_registered.emit(table_name)
+
+    def _on_polars_error(self, error_msg):
+        """handle a failed polars transform"""
+        self.polars_job = None
+        self.polars_btn.setEnabled(self.current_results is not None and self.current_results.returns_rows)
+        QMessageBox.critical(self, "Polars Error", f"Error running the Polars transform:\n\n{error_msg}")
+
     def clear(self):
         """clear the results table"""
-        self.table.clear()
-        self.table.setRowCount(0)
-        self.table.setColumnCount(0)
+        self._cancel_refine()
+        self.base_query = None
+        self.sort = None
+        self._apply_sort_indicator()
+        self.filter_bar.set_columns([])
+        self.filter_bar.setVisible(False)
+        self._release_results()
+        self._stop_count_threads()
+        self.model.set_result(None)
         self.current_results = None
+        self.full_result_count = None
         self.info_label.setText("No results")
-        self.export_btn.setEnabled(False)
\ No newline at end of file
+        self.count_btn.setVisible(False)
+        self.export_btn.setEnabled(False)
+        self.polars_btn.setEnabled(False)
\ No newline at end of file
@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+from src.database.duckdb_manager import DuckDBManager, expand_source, is_glob, is_multi_file
+from src.database.remote import is_remote
+from src.gui.jobs import JobWatcher
+
+class SourceWatcher(QObject):
+    """watches the files behind loaded sources and refreshes them when they change"""
+    refreshed = Signal(str, str)  # table_name, outcome from DuckDBManager.refresh_source
+    error = Signal(str, str)  # table_name, error message
+    DEBOUNCE_MS = 1000  # wait for writers to settle before refreshing
+
+    def __init__(self, db_manager: DuckDBManager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.watched = {}  # table_name -> set of watched files and folders
+        self.pending = set()  # tables with changes not yet refreshed
+        self.jobs = {}  # table_name -> JobWatcher for refreshes in flight
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_path_changed)
+        self.watcher.directoryChanged.connect(self._on_path_changed)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.timeout.connect(self._refresh_pending)
+
+    def sync(self):
+        """watch the files of every loaded local source, and their folders for new files"""
+        self.watched = {}
+        for table_name, info in list(self.db_manager.sources.items()):
+            source = info["path"]
+            if is_remote(source):
+                continue
+            files = expand_source(source)
+            paths = set(files)
+            if is_multi_file(source):
+                paths |= self._folders(source, files)
+            self.watched[table_name] = paths
+
+        wanted = set().union(*self.watched.values()) if self.watched else set()
+        current = set(self.watcher.files()) | set(self.watcher.directories())
+        if current - wanted:
+            self.watcher.removePaths(list(current - wanted))
+        #files replaced by an atomic rename drop out of the watcher, adding them again is harmless
+        missing = [path for path in wanted - current if os.path.exists(path)]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def _folders(self, source, files):
+        """folders in which new files of a multi-file source can appear"""
+        if isinstance(source, (list, tuple)):
+            #a fixed list of files never gains members
+            return set()
+
+        if is_glob(source):
+            parts = Path(source).parts
+            root = Path(*[part for part in parts[:next(i for i, p in enumerate(parts) if is_glob(p))]])
+        else:
+            root = Path(source)
+
+        folders = {str(root)}
+        for path in files:
+            folder = Path(path).parent
+            #every level between the root and the file, so new partitions are noticed too
+            while folder != root and root in folder.parents:
+                folders.add(str(folder))
+                folder = folder.parent
+        return folders
+
+    def _on_path_changed(self, path):
+        """queue refreshes for the sources that use a changed path"""
+        for table_name, paths in self.watched.items():
+            if path in paths:
+                self.pending.add(table_name)
+        if self.pending:
+            self.debounce_timer.start(self.DEBOUNCE_MS)
+
+    def _refresh_pending(self):
+        """refresh changed sources on the db manager's worker pool"""
+        for table_name in list(self.pending):
+            if table_name in self.jobs or table_name not in self.db_manager.sources:
+                continue
+            try:
+                future = self.db_manager.submit(self.db_manager.refresh_source, table_name)
+            except RuntimeError:
+                #pool is busy, try again once the debounce interval has passed
+                self.debounce_timer.start(self.DEBOUNCE_MS)
+                continue
+            self.pending.discard(table_name)
+
+            job = JobWatcher(future, self)
+            job.finished.connect(lambda outcome, table_name=table_name: self._on_refreshed(table_name, outcome))
+            job.error.connect(lambda error_msg, table_name=table_name: self._on_refresh_error(table_name, error_msg))
+            self.jobs[table_name] = job
+            job.start()
+
+    def _on_refreshed(self, table_name, outcome):
+        """handle a finished refresh"""
+        self.jobs.pop(table_name, None)
+        self.sync()
+        if outcome != "unchanged":
+            self.refreshed.emit(table_name, outcome)
+        if self.pending:
+            self.debounce_timer.start(self.DEBOUNCE_MS)
+
+    def _on_refresh_error(self, table_name, error_msg):
+        """handle a failed refresh"""
+        self.jobs.pop(table_name, None)
+        self.sync()
+        self.error.emit(table_name, error_msg)
@@ -0,0 +1,195 @@
+"""
+lightweight tracing of where interactive latency goes
+
+spans are timed with the monotonic perf_counter_ns clock and grouped into
+operations (one query, load or export), so a query's parse/execute, fetch, model
+and render stages can be shown side by side. every span end also samples the
+process rss and duckdb's own memory use. spans export as chrome trace json,
+viewable in chrome://tracing or ui.perfetto.dev
+"""
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+MAX_SPANS = 10_000  # oldest spans are dropped beyond this
+
+def rss_bytes() -> Optional[int]:
+    """
+    current resident memory of the process
+
+    returns:
+        bytes, the peak instead of the current value where only that is available, or None
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #kilobytes on linux, bytes on macos
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class Tracer:
+    """collects spans from any thread"""
+    def __init__(self):
+        self.spans = deque(maxlen=MAX_SPANS)  # span dicts, oldest first
+        self.memory_probe: Optional[Callable[[], Optional[int]]] = None  # returns duckdb memory in bytes
+        self._origin = time.perf_counter_ns()
+        self._operations = itertools.count(1)
+        self._local = threading.local()  # operation of the code running on each thread
+        self._lock = threading.Lock()
+
+    def now(self) -> int:
+        """monotonic timestamp in nanoseconds, for spans recorded with record()"""
+        return time.perf_counter_ns()
+
+    def new_operation(self) -> int:
+        """id grouping the spans of one user action"""
+        return next(self._operations)
+
+    @contextmanager
+    def operation(self, op: Optional[int] = None):
+        """
+        make spans on this thread belong to an operation
+
+        args:
+            op: existing operation id, a new one if None
+        yields:
+            the operation id
+        """
+        op = op or self.new_operation()
+        previous = getattr(self._local, "op", None)
+        self._local.op = op
+        try:
+            yield op
+        finally:
+            self._local.op = previous
+
+    @contextmanager
+    def span(self, name: str, category: str = "app", op: Optional[int] = None, **args):
+        """
+        time a block of code
+
+        args:
+            name: stage name, e.g. 'execute'
+            category: 'query', 'load', 'export' or 'ui'
+            op: operation id, the thread's current operation if None
+            **args: extra details shown in the trace viewer
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns(), category, op, **args)
+
+    def record(self, name: str, start: int, end: int, category: str = "app",
+               op: Optional[int] = None, **args):
+        """
+        add a span measured by the caller, e.g. one that starts and ends in different callbacks
+
+        args:
+            name: stage name
+            start, end: timestamps from now()
+            category: span category
+            op: operation id, the thread's current operation if None
+            **args: extra details shown in the trace viewer
+        """
+        span = {
+            "name": name,
+            "category": category,
+            "op": op if op is not None else getattr(self._local, "op", None),
+            "start": start,
+            "end": end,
+            "thread": threading.get_ident(),
+            "thread_name": threading.current_thread().name,
+            "rss": rss_bytes(),
+            "duckdb_memory": self._probe_memory(),
+            "args": args,
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    def _probe_memory(self) -> Optional[int]:
+        """duckdb memory use from the probe, None without one or if it fails"""
+        if self.memory_probe is None:
+            return None
+        try:
+            return self.memory_probe()
+        except Exception:
+            return None
+
+    def operation_spans(self, op: int) -> List[Dict[str, Any]]:
+        """spans of one operation, in the order they ended"""
+        with self._lock:
+            return [span for span in self.spans if span["op"] == op]
+
+    def breakdown(self, op: int) -> List[tuple]:
+        """
+        time spent per stage of an operation
+
+        returns:
+            list of (stage name, seconds), stages that ran more than once are summed
+        """
+        totals: Dict[str, int] = {}
+        for span in self.operation_spans(op):
+            totals[span["name"]] = totals.get(span["name"], 0) + span["end"] - span["start"]
+        return [(name, ns / 1e9) for name, ns in totals.items()]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        the recorded spans in chrome's trace event format
+
+        returns:
+            dict with traceEvents, complete ('X') events for spans and counter
+            ('C') events for memory
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+
+        events = []
+        threads = {}
+        for span in spans:
+            threads[span["thread"]] = span["thread_name"]
+            ts = (span["start"] - self._origin) / 1000
+            args = dict(span["args"])
+            if span["op"] is not None:
+                args["op"] = span["op"]
+            events.append({
+                "name": span["name"], "cat": span["category"], "ph": "X", "pid": pid, "tid": span["thread"],
+                "ts": ts, "dur": (span["end"] - span["start"]) / 1000, "args": args,
+            })
+            memory = {key: value / 1024 ** 2 for key, value in
+                      (("rss_mb", span["rss"]), ("duckdb_mb", span["duckdb_memory"])) if value is not None}
+            if memory:
+                events.append({
+                    "name": "memory", "ph": "C", "pid": pid, "tid": span["thread"],
+                    "ts": (span["end"] - self._origin) / 1000, "args": memory,
+                })
+
+        for tid, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str):
+        """write chrome_trace() to a json file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def clear(self):
+        """drop all recorded spans"""
+        with self._lock:
+            self.spans.clear()
+
+#the process wide tracer, shared by the database layer, the gui and the cli
+tracer = Tracer()
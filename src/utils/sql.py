@@ -0,0 +1,7 @@
+def quote_identifier(name: str) -> str:
+    """quote a column or table name for use in sql"""
+    return '"' + name.replace('"', '""') + '"'
+
+def quote_literal(value: str) -> str:
+    """quote a string literal (paths, option values) for use in sql"""
+    return "'" + value.replace("'", "''") + "'"
@@ -0,0 +1,12 @@
+"""column profiles of tables and views"""
+import duckdb
+
+from src.database.profiler import profile_relation
+
+def test_distinct_count_never_exceeds_non_null_values():
+    cursor = duckdb.connect()
+    #hyperloglog estimates 9 distinct values for these 8 rows
+    cursor.execute("CREATE TABLE t AS SELECT (range * 7919) % 1000003 AS x FROM range(8)")
+    column, = profile_relation(cursor, "t")["columns"]
+    assert column["distinct"] == 8
+    cursor.close()
@@ -0,0 +1,36 @@
+"""caching of complete query results"""
+import pytest
+
+from src.database.duckdb_manager import DuckDBManager
+
+@pytest.fixture
+def manager(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text("region,amount\neast,1\nwest,2\n")
+    manager = DuckDBManager()
+    manager.load_file(str(path), "sales", mode="table")
+    yield manager
+    manager.close()
+
+def run_twice(manager, query):
+    """run a query to the end twice, returns whether the second run was served from the cache"""
+    manager.execute_query(query).read_all()
+    return manager.execute_query(query).from_cache
+
+def test_repeated_query_is_cached(manager):
+    assert run_twice(manager, "SELECT region, sum(amount) FROM sales GROUP BY region ORDER BY region")
+
+@pytest.mark.parametrize("query", [
+    "SELECT region, random() FROM sales",
+    "SELECT region, uuid() FROM sales",
+    "SELECT region, now() FROM sales",
+    "SELECT region, current_timestamp FROM sales",
+    "SELECT * FROM sales WHERE amount < (SELECT count(*) FROM range(5))",
+])
+def test_volatile_query_is_not_cached(manager, query):
+    assert not run_twice(manager, query)
+
+def test_query_reading_files_is_not_cached(manager, tmp_path):
+    other = tmp_path / "other.csv"
+    other.write_text("region\neast\n")
+    assert not run_twice(manager, f"SELECT * FROM sales JOIN read_csv('{other}') USING (region)")
@@ -0,0 +1,31 @@
+"""refreshing a loaded source after its files change"""
+import duckdb
+import pytest
+
+from src.database.duckdb_manager import DuckDBManager
+
+@pytest.fixture
+def manager():
+    manager = DuckDBManager(cache_bytes=0)
+    yield manager
+    manager.close()
+
+def test_failed_refresh_keeps_previous_rows(manager, tmp_path):
+    path = tmp_path / "sales.parquet"
+    duckdb.sql("SELECT range AS id FROM range(3)").write_parquet(str(path))
+    manager.load_file(str(path), "sales", mode="table")
+    #cached before the failed refresh, it must still match the table afterwards
+    assert manager.execute_query("SELECT count(*) FROM sales").read_all()[0][0].as_py() == 3
+
+    #a half-written file, a parquet table can only be reloaded in full
+    path.write_bytes(b"not a parquet file")
+    with pytest.raises(duckdb.Error):
+        manager.refresh_source("sales")
+
+    assert manager.list_tables() == ["sales"]
+    assert manager.execute_query("SELECT count(*) FROM sales").read_all()[0][0].as_py() == 3
+
+    #the next change is picked up as usual
+    duckdb.sql("SELECT range AS id FROM range(5)").write_parquet(str(path))
+    assert manager.refresh_source("sales") == "reloaded"
+    assert manager.execute_query("SELECT count(*) FROM sales").read_all()[0][0].as_py() == 5
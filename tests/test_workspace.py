@@ -0,0 +1,28 @@
+"""reopening a workspace and restoring its sources"""
+from src.database.duckdb_manager import DuckDBManager
+
+def test_restore_keeps_tables_of_missing_sources(tmp_path, monkeypatch):
+    workspace = str(tmp_path / "workspace.duckdb")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "kept.csv").write_text("x\n1\n2\n")
+    (tmp_path / "data" / "moved.csv").write_text("x\n1\n2\n")
+
+    #relative paths, as given to --load
+    monkeypatch.chdir(tmp_path)
+    manager = DuckDBManager(workspace)
+    manager.load_file("data/kept.csv", "kept", mode="table")
+    manager.load_file("data/moved.csv", "moved", mode="table")
+    manager.close()
+
+    (tmp_path / "data" / "moved.csv").unlink()
+    (tmp_path / "data" / "kept.csv").write_text("x\n1\n2\n3\n")
+    monkeypatch.chdir(tmp_path / "data")
+    manager = DuckDBManager(workspace)
+    try:
+        stale = manager.restore_workspace()
+        assert [source["table_name"] for source in stale] == ["kept"]
+        assert stale[0]["source"] == str(tmp_path / "data" / "kept.csv")
+        assert manager.missing_sources == ["moved"]
+        assert manager.execute_query("SELECT count(*) FROM moved").read_all()[0][0].as_py() == 2
+    finally:
+        manager.close()